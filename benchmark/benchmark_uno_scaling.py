@@ -0,0 +1,48 @@
+# runcmd: python benchmark/benchmark_uno_scaling.py [cnt_games]
+"""Measure the cost per move of random UNO games for growing table sizes."""
+import sys
+import time
+import random
+
+from server.py.uno import Uno, GameState, GamePhase, RandomPlayer, CNT_PLAYER_MIN, CNT_PLAYER_MAX, cnt_deck_for
+
+LIST_CNT_PLAYER = [CNT_PLAYER_MIN, 4, 8, 12, 16, CNT_PLAYER_MAX]
+MAX_MOVES = 2000
+
+
+def run_games(cnt_player: int, cnt_games: int) -> tuple[int, int, float]:
+    """Play random games and return (moves, finished games, seconds)."""
+    player = RandomPlayer()
+    cnt_moves = 0
+    cnt_finished = 0
+    seconds = 0.0
+    for _ in range(cnt_games):
+        game = Uno()
+        game.set_state(GameState(cnt_player=cnt_player))
+        start = time.perf_counter()
+        for _ in range(MAX_MOVES):
+            actions = game.get_list_action()
+            if not actions:
+                break
+            action = player.select_action(game.get_state(), actions)
+            if action is None:
+                break
+            game.apply_action(action)
+            cnt_moves += 1
+            if game.get_state().phase == GamePhase.FINISHED:
+                cnt_finished += 1
+                break
+        seconds += time.perf_counter() - start
+    return cnt_moves, cnt_finished, seconds
+
+
+if __name__ == "__main__":
+
+    CNT_GAMES = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    random.seed(1)
+
+    print('--- UNO scaling benchmark ---')
+    print(f'{"players":>8} {"decks":>6} {"games":>6} {"finished":>9} {"moves":>8} {"us/move":>9}')
+    for cnt in LIST_CNT_PLAYER:
+        moves, finished, secs = run_games(cnt, CNT_GAMES)
+        print(f'{cnt:>8} {cnt_deck_for(cnt):>6} {CNT_GAMES:>6} {finished:>9} {moves:>8} {secs / max(moves, 1) * 1e6:>9.1f}')
@@ -2,31 +2,37 @@ function Simulation(config) {
     this.config = config
     this.game = new Game(config.game_config);
     this.ws = null;
+    this.delta = new DeltaState();
+    this.list_state = [];  // received, not shown yet
+    this.timer = null;
     this.main();
 };
 Simulation.prototype.main = function(){
     this.init_websocket();
 };
 Simulation.prototype.init_websocket = function(){
-    this.ws = new WebSocket(this.config.ws_endpoint);
+    // the server plays the game at once and sends a second of playback per message; we set the pace
+    this.rate = Math.max(1, Math.round(1000 / this.config.delay_millis));
+    var url = this.config.ws_endpoint + '?rate=' + this.rate + (this.config.skip ? '&skip=1' : '');
+    this.ws = new WebSocket(url);
     this.ws.onopen = this.ws_onopen.bind(this);
     this.ws.onmessage = this.ws_onmessage.bind(this);
 }
 Simulation.prototype.ws_onopen = function(event) {
     this.add_log('> connected');
 };
-Simulation.prototype.ws_send = function(data) {
-    this.add_log('< '+data['type']);
-    this.ws.send(JSON.stringify(data))
-};
 Simulation.prototype.ws_onmessage = function(event) {
     var data = JSON.parse(event.data);
     this.add_log('> '+data.type);
     switch(data['type']) {
-        case 'update':
-    		this.add_log(data['state']);
-    		this.game.set_player_state(data['state']);
-    		this.apply_action(data['state']['selected_action']);
+        case 'frames':
+            for(var i = 0; i < data['frames'].length; i++) {
+                var state = this.delta.receive(data['frames'][i]);
+                if(state != null) {
+                    this.list_state.push(state);
+                }
+            }
+            this.play();
             break;
     }
 };
@@ -34,22 +40,16 @@ Simulation.prototype.add_log = function(msg) {
     //console.log(msg);
 };
 
-Simulation.prototype.apply_action = function(action) {
-	if(this.game.player_state.bool_game_finished) {
-		return;
-	}
-	if(action==null) {
-		this.send_action(action)
-	} else {
-	    setTimeout(this.send_action.bind(this, action), this.config.delay_millis);
-	}
-};
-Simulation.prototype.send_action = function(action) {
-	data = {
-        'type': 'action',
-        'action': action,
+Simulation.prototype.play = function() {
+    if(this.timer != null || this.list_state.length == 0) {
+        return;
     }
-    this.ws_send(data);
+    var state = this.list_state.shift();
+    this.add_log(state);
+    this.game.set_player_state(state);
+    this.timer = setTimeout(this.next_state.bind(this), this.config.delay_millis);
+};
+Simulation.prototype.next_state = function() {
+    this.timer = null;
+    this.play();
 };
-
-
@@ -3,34 +3,75 @@ function Singleplayer(config) {
     this.game = new Game(config.game_config);
     this.game.send_action_callback = this.send_action.bind(this);
     this.ws = null;
+    this.delta = new DeltaState();
     this.main();
 };
 Singleplayer.prototype.main = function(){
     this.init_websocket();
 };
 Singleplayer.prototype.init_websocket = function(){
-    this.ws = new WebSocket(this.config.ws_endpoint);
+    // rejoin our seat after a reconnect, or join the room of config.room_id (a shared link)
+    var url = this.config.ws_endpoint;
+    var room = JSON.parse(sessionStorage.getItem(this.config.ws_endpoint) || 'null');
+    if(room) {
+        url += '?room_id=' + encodeURIComponent(room['room_id']) + '&seat=' + room['idx_seat'];
+    } else if(this.config.room_id) {
+        url += '?room_id=' + encodeURIComponent(this.config.room_id);
+    }
+    // 'binary': true asks for MessagePack frames, only for endpoints that accept the msgpack subprotocol
+    this.ws = this.config.binary ? new WebSocket(url, [MSGPACK_SUBPROTOCOL]) : new WebSocket(url);
+    this.ws.binaryType = 'arraybuffer';
     this.ws.onopen = this.ws_onopen.bind(this);
     this.ws.onmessage = this.ws_onmessage.bind(this);
+    this.ws.onclose = this.ws_onclose.bind(this);
 }
 Singleplayer.prototype.ws_onopen = function(event) {
     this.add_log('> connected');
 };
+Singleplayer.prototype.ws_onclose = function(event) {
+    this.add_log('> closed '+event.code);
+    if(event.code == 4003) {
+        // our seat is taken by now: try once more for any free seat, a full room ends here
+        var had_seat = sessionStorage.getItem(this.config.ws_endpoint) != null;
+        sessionStorage.removeItem(this.config.ws_endpoint);
+        if(had_seat) {
+            setTimeout(this.init_websocket.bind(this), 1000);
+        }
+        return;
+    }
+    if(sessionStorage.getItem(this.config.ws_endpoint)) {
+        setTimeout(this.init_websocket.bind(this), 1000);
+    }
+};
 Singleplayer.prototype.ws_send = function(data) {
     this.add_log('< '+data['type']);
-    this.ws.send(JSON.stringify(data))
+    this.ws.send(this.ws.protocol == MSGPACK_SUBPROTOCOL ? msgpack_encode(data) : JSON.stringify(data));
 };
 Singleplayer.prototype.ws_onmessage = function(event) {
-    var data = JSON.parse(event.data);
+    var data = typeof event.data == 'string' ? JSON.parse(event.data) : msgpack_decode(event.data);
     this.add_log('> '+data.type);
     switch(data['type']) {
+        case 'room':
+            sessionStorage.setItem(this.config.ws_endpoint, JSON.stringify(data));
+            if(this.config.share_url) {
+                // the address bar now invites others into this room
+                history.replaceState(null, '', '?room_id=' + encodeURIComponent(data['room_id']));
+            }
+            break;
         case 'update':
-    		this.game.set_player_state(data['state']);
-    		//console.log(data['state']);
-    		/*if(data['state']['idx_player_active']==data['state']['idx_player_you'] && data['state']['list_action'].length==0) {
-    			this.send_action(null);
-    		}*/
-    		//this.apply_action(data['state']['selected_action']);
+        case 'patch':
+            var was_synced = this.delta.is_synced();
+            var state = this.delta.receive(data);
+            if(state == null) {
+                if(was_synced) {
+                    this.ws_send({'type': 'resync'});  // missed a message, ask for a full update
+                }
+                break;
+            }
+            if(state['phase'] == 'finished') {
+                sessionStorage.removeItem(this.config.ws_endpoint);
+            }
+    		this.game.set_player_state(state);
             break;
     }
 };
@@ -0,0 +1,58 @@
+// Client side of server/py/delta.py: 'update' messages carry the full state,
+// 'patch' messages the JSON-Patch ops (replace, add, remove) against the previous one.
+
+function delta_apply_patch(doc, ops) {
+    for(var i = 0; i < ops.length; i++) {
+        var op = ops[i];
+        if(op.path == '') {
+            doc = op.value;
+            continue;
+        }
+        var tokens = op.path.substring(1).split('/').map(function(token) {
+            return token.replace(/~1/g, '/').replace(/~0/g, '~');
+        });
+        var target = doc;
+        for(var j = 0; j < tokens.length - 1; j++) {
+            target = target[Array.isArray(target) ? parseInt(tokens[j]) : tokens[j]];
+        }
+        var last = tokens[tokens.length - 1];
+        if(Array.isArray(target)) {
+            var idx = last == '-' ? target.length : parseInt(last);
+            if(op.op == 'add') {
+                target.splice(idx, 0, op.value);
+            } else if(op.op == 'remove') {
+                target.splice(idx, 1);
+            } else {
+                target[idx] = op.value;
+            }
+        } else if(op.op == 'remove') {
+            delete target[last];
+        } else {
+            target[last] = op.value;
+        }
+    }
+    return doc;
+}
+
+// Keeps the last full state of one connection. receive() returns a copy of the new state
+// (games may change the object they render), or null if a message was missed and the
+// client has to send {'type': 'resync'} and wait for the next 'update'.
+function DeltaState() {
+    this.state = null;
+    this.seq = 0;
+}
+DeltaState.prototype.receive = function(data) {
+    if(data['type'] == 'update') {
+        this.state = data['state'];
+    } else if(this.state == null || data['seq'] != this.seq + 1) {
+        this.state = null;
+        return null;
+    } else {
+        this.state = delta_apply_patch(this.state, data['ops']);
+    }
+    this.seq = data['seq'];
+    return JSON.parse(JSON.stringify(this.state));
+};
+DeltaState.prototype.is_synced = function() {
+    return this.state != null;
+};
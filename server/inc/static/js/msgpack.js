@@ -0,0 +1,128 @@
+// MessagePack for the 'msgpack' websocket subprotocol, the counterpart of server/py/packing.py:
+// nil, bool, int, float, str, bin, array and map, no extension types.
+
+var MSGPACK_SUBPROTOCOL = 'msgpack';
+
+function msgpack_decode(buffer) {
+    var view = new DataView(buffer);
+    var bytes = new Uint8Array(buffer);
+    var decoder = new TextDecoder();
+    var pos = 0;
+
+    function sized(kind, size) {
+        var i, result;
+        if(kind == 'str' || kind == 'bin') {
+            var chunk = bytes.subarray(pos, pos + size);
+            pos += size;
+            return kind == 'str' ? decoder.decode(chunk) : chunk;
+        }
+        if(kind == 'array') {
+            result = new Array(size);
+            for(i = 0; i < size; i++) {
+                result[i] = next();
+            }
+            return result;
+        }
+        result = {};
+        for(i = 0; i < size; i++) {
+            var key = next();
+            result[key] = next();
+        }
+        return result;
+    }
+
+    function next() {
+        var code = bytes[pos++];
+        var value;
+        if(code <= 0x7f) return code;
+        if(code >= 0xe0) return code - 0x100;
+        if(code >= 0xa0 && code <= 0xbf) return sized('str', code & 0x1f);
+        if(code >= 0x90 && code <= 0x9f) return sized('array', code & 0x0f);
+        if(code >= 0x80 && code <= 0x8f) return sized('map', code & 0x0f);
+        switch(code) {
+            case 0xc0: return null;
+            case 0xc2: return false;
+            case 0xc3: return true;
+            case 0xca: value = view.getFloat32(pos); pos += 4; return value;
+            case 0xcb: value = view.getFloat64(pos); pos += 8; return value;
+            case 0xcc: value = view.getUint8(pos); pos += 1; return value;
+            case 0xcd: value = view.getUint16(pos); pos += 2; return value;
+            case 0xce: value = view.getUint32(pos); pos += 4; return value;
+            case 0xcf: value = Number(view.getBigUint64(pos)); pos += 8; return value;
+            case 0xd0: value = view.getInt8(pos); pos += 1; return value;
+            case 0xd1: value = view.getInt16(pos); pos += 2; return value;
+            case 0xd2: value = view.getInt32(pos); pos += 4; return value;
+            case 0xd3: value = Number(view.getBigInt64(pos)); pos += 8; return value;
+            case 0xc4: case 0xd9: value = view.getUint8(pos); pos += 1; return sized(code == 0xc4 ? 'bin' : 'str', value);
+            case 0xc5: case 0xda: value = view.getUint16(pos); pos += 2; return sized(code == 0xc5 ? 'bin' : 'str', value);
+            case 0xc6: case 0xdb: value = view.getUint32(pos); pos += 4; return sized(code == 0xc6 ? 'bin' : 'str', value);
+            case 0xdc: value = view.getUint16(pos); pos += 2; return sized('array', value);
+            case 0xdd: value = view.getUint32(pos); pos += 4; return sized('array', value);
+            case 0xde: value = view.getUint16(pos); pos += 2; return sized('map', value);
+            case 0xdf: value = view.getUint32(pos); pos += 4; return sized('map', value);
+        }
+        throw new Error('Unsupported MessagePack type 0x' + code.toString(16));
+    }
+
+    return next();
+}
+
+function msgpack_encode(value) {
+    var out = [];
+    var encoder = new TextEncoder();
+
+    function push_uint(code, size, n) {
+        out.push(code);
+        for(var shift = (size - 1) * 8; shift >= 0; shift -= 8) {
+            out.push(Math.floor(n / Math.pow(2, shift)) & 0xff);
+        }
+    }
+
+    function header(size, fix, fix_max, code8, code16, code32) {
+        if(size <= fix_max) out.push(fix | size);
+        else if(size <= 0xff && code8) push_uint(code8, 1, size);
+        else if(size <= 0xffff) push_uint(code16, 2, size);
+        else push_uint(code32, 4, size);
+    }
+
+    function next(value) {
+        var i;
+        if(value === null || value === undefined) {
+            out.push(0xc0);
+        } else if(value === true || value === false) {
+            out.push(value ? 0xc3 : 0xc2);
+        } else if(typeof value == 'number') {
+            if(Number.isInteger(value) && value >= 0 && value <= 0xffffffff) {
+                if(value <= 0x7f) out.push(value);
+                else if(value <= 0xff) push_uint(0xcc, 1, value);
+                else if(value <= 0xffff) push_uint(0xcd, 2, value);
+                else push_uint(0xce, 4, value);
+            } else if(Number.isInteger(value) && value < 0 && value >= -0x80000000) {
+                if(value >= -32) out.push(value & 0xff);
+                else push_uint(0xd2, 4, value >>> 0);
+            } else {
+                var buffer = new DataView(new ArrayBuffer(8));
+                buffer.setFloat64(0, value);
+                out.push(0xcb);
+                for(i = 0; i < 8; i++) out.push(buffer.getUint8(i));
+            }
+        } else if(typeof value == 'string') {
+            var data = encoder.encode(value);
+            header(data.length, 0xa0, 31, 0xd9, 0xda, 0xdb);
+            for(i = 0; i < data.length; i++) out.push(data[i]);
+        } else if(Array.isArray(value)) {
+            header(value.length, 0x90, 15, 0, 0xdc, 0xdd);
+            for(i = 0; i < value.length; i++) next(value[i]);
+        } else {
+            var keys = Object.keys(value).filter(function(key) { return value[key] !== undefined; });
+            header(keys.length, 0x80, 15, 0, 0xde, 0xdf);
+            for(i = 0; i < keys.length; i++) {
+                next(keys[i]);
+                next(value[keys[i]]);
+            }
+        }
+    }
+
+    next(value);
+    return new Uint8Array(out);
+}
@@ -0,0 +1,48 @@
+// Read-only view of a running game: connects to ws_endpoint?<id_param>=<the same parameter of this
+// page's url> and shows the public states (all hands face down) the server sends to every spectator.
+
+function Spectator(config) {
+    this.config = config;
+    this.game = new Game(config.game_config);
+    this.ws = null;
+    this.delta = new DeltaState();
+    this.init_websocket();
+};
+Spectator.prototype.init_websocket = function() {
+    var id = new URLSearchParams(window.location.search).get(this.config.id_param) || '';
+    var url = this.config.ws_endpoint + '?' + this.config.id_param + '=' + encodeURIComponent(id);
+    this.ws = this.config.binary ? new WebSocket(url, [MSGPACK_SUBPROTOCOL]) : new WebSocket(url);
+    this.ws.binaryType = 'arraybuffer';
+    this.ws.onmessage = this.ws_onmessage.bind(this);
+    this.ws.onclose = this.ws_onclose.bind(this);
+};
+Spectator.prototype.ws_onclose = function(event) {
+    // 1013: we fell behind (or the server is busy), a new connection starts from the latest state
+    if(event.code == 1013) {
+        this.delta = new DeltaState();
+        setTimeout(this.init_websocket.bind(this), 1000);
+    }
+};
+Spectator.prototype.ws_send = function(data) {
+    this.ws.send(this.ws.protocol == MSGPACK_SUBPROTOCOL ? msgpack_encode(data) : JSON.stringify(data));
+};
+Spectator.prototype.ws_onmessage = function(event) {
+    var data = typeof event.data == 'string' ? JSON.parse(event.data) : msgpack_decode(event.data);
+    if(data['type'] != 'update' && data['type'] != 'patch') {
+        return;
+    }
+    var was_synced = this.delta.is_synced();
+    var state = this.delta.receive(data);
+    if(state == null) {
+        if(was_synced) {
+            this.ws_send({'type': 'resync'});
+        }
+        return;
+    }
+    // hangman and uno name it set_state, battleship and dog set_player_state
+    if(this.game.set_player_state) {
+        this.game.set_player_state(state);
+    } else {
+        this.game.set_state(state);
+    }
+};
@@ -1,10 +1,13 @@
 
-# Example solution to check docker and main.py thingies 
+# Example solution to check docker and main.py thingies
 
-from typing import List, Optional, Dict
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+from functools import lru_cache
+from collections import Counter
 import random
 import string
 from enum import Enum
+import numpy as np
 from pydantic import BaseModel
 from colorama import init, Fore, Back, Style # type: ignore
 from server.py.game import Game, Player
@@ -55,6 +58,8 @@ class BattleshipGameState(BaseModel):
     phase: GamePhase = GamePhase.SETUP
     winner: Optional[int] = None
     players: List[PlayerState] = [PlayerState(name='Player1'), PlayerState(name='Player2')]
+    board_size: int = 10
+    cnt_ships: int = 5
 
     def all_ships_located(self) -> bool:
         for ship in self.players[self.idx_player_active].ships:
@@ -76,136 +81,383 @@ class BattleshipGameState(BaseModel):
             idx_player = (self.idx_player_active + 1) % 2
         return self.players[idx_player].shots
 
-    def check_if_finished(self) -> bool:
-        # Does the opponent player still have some ships left?
-        if not self.all_ships_located():
+
+BOARD_SIZE = 10
+CNT_SHIPS = 5
+MAX_PLACEMENT_TRIES = 32
+MAX_SHOOT_TRIES = 32
+
+
+def column_name(x: int) -> str:
+    """ Spreadsheet-style column name: 0 -> 'A', 25 -> 'Z', 26 -> 'AA', ... """
+    name = ''
+    x += 1
+    while x > 0:
+        x, rem = divmod(x - 1, 26)
+        name = string.ascii_uppercase[rem] + name
+    return name
+
+
+# Internally a location is the cell index row * board_size + column ('A1' is 0, 'B1' is 1, ...).
+# Names are only looked up in these tables when the pydantic models are filled.
+@lru_cache(maxsize=None)
+def get_location_names(board_size: int = BOARD_SIZE) -> Tuple[str, ...]:
+    columns = [column_name(x) for x in range(board_size)]
+    return tuple(x_name + str(y) for y in range(1, board_size + 1) for x_name in columns)
+
+
+@lru_cache(maxsize=None)
+def get_location_index(board_size: int = BOARD_SIZE) -> Dict[str, int]:
+    return {loc: idx for idx, loc in enumerate(get_location_names(board_size))}
+
+
+LIST_LOCATION = list(get_location_names(BOARD_SIZE))
+IDX_LOCATION = get_location_index(BOARD_SIZE)
+
+
+def location_to_index(location: str, board_size: int = BOARD_SIZE) -> int:
+    """ Bit index of a location like 'C7' (row-major, 'A1' is bit 0) """
+    try:
+        return get_location_index(board_size)[location]
+    except KeyError as e:
+        raise ValueError(f"Invalid location '{location}'") from e
+
+
+def locations_to_mask(locations: List[str], board_size: int = BOARD_SIZE) -> int:
+    mask = 0
+    for location in locations:
+        mask |= 1 << location_to_index(location, board_size)
+    return mask
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """ Indices of the set bits, lowest first """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+# pylint: disable = too-few-public-methods
+class PlayerBits:
+    """
+    Bit masks of one player: one mask per ship, the whole fleet, own shots and hits.
+    Hits taken per ship are counted as shots land, so sunk ships are known without rescanning.
+    """
+
+    __slots__ = ('board_size', 'ship_masks', 'ship_sizes', 'ship_hits', 'cell_ship', 'fleet', 'cnt_fleet', 'cnt_hit',
+                 'cnt_unlocated', 'shots', 'hits')
+
+    def __init__(self, player: PlayerState, board_size: int = BOARD_SIZE) -> None:
+        self.board_size = board_size
+        self.ship_masks: List[int] = []
+        self.ship_sizes: List[int] = []  # -1 while the ship isn't located
+        self.ship_hits: List[int] = []
+        self.cell_ship: Dict[int, int] = {}
+        self.fleet = 0
+        self.cnt_fleet = 0  # cells covered by ships
+        self.cnt_hit = 0    # of those, cells the enemy has shot
+        self.cnt_unlocated = 0
+        for ship in player.ships:
+            self.add_ship(ship.location)
+        self.shots = locations_to_mask(player.shots, board_size)
+        self.hits = locations_to_mask(player.successful_shots, board_size)
+
+    def add_ship(self, location: Optional[List[str]]) -> None:
+        self.ship_masks.append(0)
+        self.ship_sizes.append(-1)
+        self.ship_hits.append(0)
+        self.cnt_unlocated += 1
+        self.locate_ship(len(self.ship_masks) - 1, location)
+
+    def locate_ship(self, idx_ship: int, location: Optional[List[str]]) -> None:
+        if location is None:
+            return
+        if self.ship_sizes[idx_ship] < 0:
+            self.cnt_unlocated -= 1
+        old_mask = self.ship_masks[idx_ship]
+        for idx in iter_bits(old_mask):
+            del self.cell_ship[idx]
+        mask = locations_to_mask(location, self.board_size)
+        for idx in iter_bits(mask):
+            self.cell_ship[idx] = idx_ship
+        self.ship_masks[idx_ship] = mask
+        self.ship_sizes[idx_ship] = len(location)
+        self.fleet = (self.fleet & ~old_mask) | mask
+        self.cnt_fleet = len(self.cell_ship)
+
+    def count_hits(self, enemy_shots: int) -> None:
+        self.ship_hits = [(mask & enemy_shots).bit_count() for mask in self.ship_masks]
+        self.cnt_hit = (self.fleet & enemy_shots).bit_count()
+
+    def take_hit(self, idx: int) -> None:
+        """ Count a first shot on cell idx against the ship there """
+        self.ship_hits[self.cell_ship[idx]] += 1
+        self.cnt_hit += 1
+
+    def is_sunk(self, idx_ship: int) -> bool:
+        return self.ship_hits[idx_ship] == self.ship_sizes[idx_ship]
+
+
+class BitBoard:
+    """
+    Engine of a BattleshipGameState: ships, shots and hits are kept as integer bit masks.
+    The pydantic state stays the external view; it's only appended to, never rescanned.
+    is_current() tells whether the state was changed some other way since, without looking at the shots.
+    """
+
+    __slots__ = ('state', 'players', 'board_size', 'signature', 'views')
+
+    def __init__(self, state: BattleshipGameState) -> None:
+        self.state = state
+        self.board_size = state.board_size
+        self.players = [PlayerBits(player, state.board_size) for player in state.players]
+        for idx, bits in enumerate(self.players):
+            bits.count_hits(self.players[(idx + 1) % 2].shots)
+        self.signature = self.get_signature()
+        self.views: Dict[Tuple[int, bool], PlayerState] = {}  # (idx_player, masked): view, until the next move
+
+    def get_signature(self) -> Tuple[int, ...]:
+        """ Identity of the ship locations and shot lists and the lengths of the lists, O(ships) """
+        signature = [id(self.state.players), self.state.board_size]
+        for player in self.state.players:
+            signature += [id(player), id(player.ships), len(player.ships), id(player.shots), len(player.shots),
+                          id(player.successful_shots), len(player.successful_shots)]
+            signature += [id(ship.location) for ship in player.ships]
+        return tuple(signature)
+
+    def is_current(self) -> bool:
+        return self.get_signature() == self.signature
+
+    def is_finished(self) -> bool:
+        idx = self.state.idx_player_active
+        if self.players[idx].cnt_unlocated > 0:
             return False
-        shots = set(self.players[self.idx_player_active].shots)
-        for ship in self.players[(self.idx_player_active + 1) % 2].ships:
-            if ship.location is not None:
-                if len(set(ship.location).difference(shots)) > 0:
-                    return False
-        return True
+        enemy = self.players[(idx + 1) % 2]
+        return enemy.cnt_hit == enemy.cnt_fleet
+
+    def free_shots(self) -> int:
+        """ Mask of the locations the active player hasn't fired at yet """
+        return ((1 << self.board_size * self.board_size) - 1) & ~self.players[self.state.idx_player_active].shots
+
+    def is_shot(self, cell: int) -> bool:
+        return self.players[self.state.idx_player_active].shots >> cell & 1 == 1
+
+    def set_ship(self, action: BattleshipAction) -> None:
+        idx = self.state.idx_player_active
+        player = self.state.players[idx]
+        bits = self.players[idx]
+        for idx_ship, ship in enumerate(player.ships):
+            if ship.name == action.ship_name:
+                ship.location = action.location.copy()
+                bits.locate_ship(idx_ship, ship.location)
+                break
+        else:
+            player.ships.append(Ship(
+                name=action.ship_name if action.ship_name is not None else 'ship',
+                length=len(action.location),
+                location=action.location))
+            bits.add_ship(action.location)
+        bits.count_hits(self.players[(idx + 1) % 2].shots)
+        self.views.clear()
+        # both players have set all ship locations -> phase = running
+        if all(b.cnt_unlocated == 0 and len(b.ship_masks) >= self.state.cnt_ships for b in self.players):
+            self.state.phase = GamePhase.RUNNING
+
+    def shoot(self, action: BattleshipAction) -> None:
+        idx = self.state.idx_player_active
+        player = self.state.players[idx]
+        bits = self.players[idx]
+        enemy = self.players[(idx + 1) % 2]
+        cells = [location_to_index(location, self.board_size) for location in action.location]
+        for cell in cells:
+            if cell in enemy.cell_ship and not bits.shots >> cell & 1:
+                enemy.take_hit(cell)
+            bits.shots |= 1 << cell
+        player.shots.extend(action.location)
+        if cells[0] in enemy.cell_ship:
+            for cell in cells:
+                bits.hits |= 1 << cell
+            player.successful_shots.extend(action.location)
+        self.views.clear()
+
+    def get_view_player(self, idx_player: int, masked: bool) -> PlayerState:
+        """ Copy of idx_player for a view, masked as the enemy sees them: ships are shown once sunk.
+        Lists and ships are copied once per move, so changing a view never changes the game; the views
+        until the next move share the copy and are read-only """
+        view = self.views.get((idx_player, masked))
+        if view is None:
+            view = self.views[(idx_player, masked)] = self._copy_player(idx_player, masked)
+        return view
+
+    def _copy_player(self, idx_player: int, masked: bool) -> PlayerState:
+        player = self.state.players[idx_player]
+        bits = self.players[idx_player]
+        return PlayerState.model_construct(
+            name=player.name,
+            ships=[Ship.model_construct(name=ship.name, length=ship.length, location=None if ship.location is None else list(ship.location))
+                   for idx_ship, ship in enumerate(player.ships) if not masked or bits.is_sunk(idx_ship)],
+            shots=list(player.shots),
+            successful_shots=list(player.successful_shots))
+
+    def get_masked_state(self, idx_player: int) -> BattleshipGameState:
+        """ View of idx_player: the enemy's ships are shown once sunk; built without default models """
+        players = [self.get_view_player(idx_player, False), self.get_view_player((idx_player + 1) % 2, True)]
+        if idx_player == 1:
+            players.reverse()
+        return self._construct_state(players)
+
+    def get_public_state(self) -> BattleshipGameState:
+        """ View of a spectator: both fleets masked """
+        return self._construct_state([self.get_view_player(0, True), self.get_view_player(1, True)])
+
+    def _construct_state(self, players: List[PlayerState]) -> BattleshipGameState:
+        return BattleshipGameState.model_construct(
+            idx_player_active=self.state.idx_player_active,
+            phase=self.state.phase,
+            winner=self.state.winner,
+            players=players,
+            board_size=self.state.board_size,
+            cnt_ships=self.state.cnt_ships)
 
     def apply_action(self, action: BattleshipAction) -> None:
-        if action.action_type == 'set_ship':
-            existing_ship = False
-            for ship in self.get_player_ships(active_player=True):
-                if ship.name == action.ship_name:
-                    ship.location = action.location.copy()
-                    existing_ship = True
-                    break
-            if not existing_ship:
-                new_ship = Ship(
-                    name=action.ship_name if action.ship_name is not None else 'ship',
-                    length=len(action.location),
-                    location=action.location)
-                self.get_player_ships(active_player=True).append(new_ship)
-            # test if both player have set all ship locations -> phase = running
-            all_ships_located = True
-            for player in self.players:
-                for ship in player.ships:
-                    all_ships_located = all_ships_located and ship.location is not None
-                if len(player.ships) < 5:
-                    all_ships_located = False
-            if all_ships_located:
-                self.phase = GamePhase.RUNNING
+        if action.action_type == ActionType.SET_SHIP:
+            self.set_ship(action)
         else:
-            self.players[self.idx_player_active].shots.extend(action.location)
-            opponent_ship_locations = [
-                loc for ship in self.get_player_ships(False) if ship.location is not None for loc in ship.location]
-            if action.location[0] in opponent_ship_locations:
-                self.players[self.idx_player_active].successful_shots.extend(action.location)
-        if self.check_if_finished():
-            self.phase = GamePhase.FINISHED
-            self.winner = self.idx_player_active
+            self.shoot(action)
+        # only a shot can finish the game; with small fleets the enemy may not have located any ship yet
+        if action.action_type == ActionType.SHOOT and self.is_finished():
+            self.state.phase = GamePhase.FINISHED
+            self.state.winner = self.state.idx_player_active
         else:
-            self.idx_player_active = (self.idx_player_active + 1) % 2
-
-    def get_masked_state(self, idx_player: int) -> "BattleshipGameState":
-        other_player = (idx_player + 1) % 2
-        masked_state = BattleshipGameState()
-        masked_state.idx_player_active = self.idx_player_active
-        masked_state.winner = self.winner
-        masked_state.phase = self.phase
-        masked_state.players[idx_player] = self.players[idx_player]
-        masked_state.players[other_player].shots = self.players[other_player].shots
-        masked_state.players[other_player].successful_shots = self.players[other_player].successful_shots
-
-        # show ships that were sunk
-        masked_state.players[other_player].ships = []
-        for ship in self.players[other_player].ships:
-            if ship.location is not None:
-                cnt = 0
-                for shot in self.players[idx_player].successful_shots:
-                    if shot in ship.location:
-                        cnt += 1
-                if cnt == len(ship.location):
-                    masked_state.players[other_player].ships.append(ship)
+            self.state.idx_player_active = (self.state.idx_player_active + 1) % 2
+        self.signature = self.get_signature()
 
-        return masked_state
 
+class Placement(NamedTuple):
+    """ One way to put a ship on the board, as bit mask, cell indices and location names """
+    mask: int
+    cells: Tuple[int, ...]
+    locations: Tuple[str, ...]
 
-def get_possible_locations(ship_length: int, board_size: int) -> List[List[str]]:
+
+def get_placements(ship_length: int, board_size: int = BOARD_SIZE) -> Tuple[Placement, ...]:
+    """ All placements of a ship, built once per process and shared read-only by all games """
+    return _build_placements(ship_length, board_size)
+
+
+def cnt_placements(ship_length: int, board_size: int) -> int:
     if ship_length < 1:
         raise ValueError('Ship length has to be positive')
     if ship_length > board_size:
         raise ValueError(f"Ship of length {ship_length} is too large for board size {board_size}")
-    x_names = list(string.ascii_uppercase)[:board_size]
-    y_names = [str(y) for y in range(1, board_size + 1)]
-    options = []
-    # horizontal locations
-    for x_pos in range(board_size - ship_length + 1):
-        h_locations = [x_names[idx] for idx in range(x_pos, x_pos + ship_length)]
-        options.extend([[x_name + y_name for x_name in h_locations] for y_name in y_names])
-
-    if ship_length > 1:
+    cnt_horizontal = (board_size - ship_length + 1) * board_size
+    return cnt_horizontal * 2 if ship_length > 1 else cnt_horizontal
+
+
+def get_placement(ship_length: int, board_size: int, idx: int) -> Placement:
+    """ Placement number idx in the order of get_placements, computed without building the table """
+    cnt_horizontal = (board_size - ship_length + 1) * board_size
+    if idx < cnt_horizontal:
+        # horizontal locations
+        x_pos, y = divmod(idx, board_size)
+        cells = tuple(y * board_size + x for x in range(x_pos, x_pos + ship_length))
+    else:
         # vertical locations
-        for y_pos in range(board_size - ship_length + 1):
-            v_locations = [y_names[idx] for idx in range(y_pos, y_pos + ship_length)]
-            options.extend([[x_name + y_name for y_name in v_locations] for x_name in x_names])
-    return options
+        y_pos, x = divmod(idx - cnt_horizontal, board_size)
+        cells = tuple(y * board_size + x for y in range(y_pos, y_pos + ship_length))
+    names = get_location_names(board_size)
+    return Placement(sum(1 << cell for cell in cells), cells, tuple(names[cell] for cell in cells))
+
+
+@lru_cache(maxsize=None)
+def _build_placements(ship_length: int, board_size: int) -> Tuple[Placement, ...]:
+    return tuple(get_placement(ship_length, board_size, idx) for idx in range(cnt_placements(ship_length, board_size)))
+
+
+def get_possible_locations(ship_length: int, board_size: int) -> List[List[str]]:
+    return [list(placement.locations) for placement in get_placements(ship_length, board_size)]
 
 
 def print_player_board(ships: List[Ship], enemy_shots: List[str], board_size: int = 10) -> None:
-    x_coords = list(string.ascii_uppercase)[:board_size]
-    y_coords = [str(y) for y in range(1, board_size + 1)]
-    print("   " + "  ".join(x_coords) + " ")
-    ship_locations = [loc for ship in ships if ship.location is not None for loc in ship.location]
-    for y_coord in y_coords:
-        y_string = f"{y_coord:>2}"
-        for x_coord in x_coords:
-            coordinate = x_coord + y_coord
-            if coordinate in ship_locations:
-                if coordinate in enemy_shots:
+    width = len(str(board_size))
+    print(" " * width + "".join(f"{column_name(x):^3}" for x in range(board_size)))
+    ship_mask = locations_to_mask([loc for ship in ships if ship.location is not None for loc in ship.location], board_size)
+    shot_mask = locations_to_mask(enemy_shots, board_size)
+    for y in range(board_size):
+        y_string = f"{y + 1:>{width}}"
+        for cell in range(y * board_size, (y + 1) * board_size):
+            if ship_mask >> cell & 1:
+                if shot_mask >> cell & 1:
                     y_string += Fore.RED + Back.WHITE + Style.BRIGHT + " X " + Style.RESET_ALL
                 else:
                     y_string += Back.WHITE + " S " + Style.RESET_ALL
             else:
-                if coordinate in enemy_shots:
+                if shot_mask >> cell & 1:
                     y_string += Fore.CYAN + " O " + Style.RESET_ALL
                 else:
                     y_string += " - "
         print(y_string)
 
 
+def mask_to_array(mask: int, cnt_cell: int = BOARD_SIZE * BOARD_SIZE) -> np.ndarray:
+    """ 0/1 array with one entry per cell """
+    raw = np.frombuffer(mask.to_bytes((cnt_cell + 7) // 8, 'little'), dtype=np.uint8)
+    return np.unpackbits(raw, bitorder='little')[:cnt_cell]
+
+
+@lru_cache(maxsize=4096)
+def get_ship_action(ship_name: str, placement: Placement) -> BattleshipAction:
+    """ Shared set-ship action, never mutate """
+    return BattleshipAction(action_type=ActionType.SET_SHIP, ship_name=ship_name, location=list(placement.locations))
+
+
+@lru_cache(maxsize=None)
+def get_cover_index(board_size: int, length: int) -> Tuple[np.ndarray, np.ndarray]:
+    """ Cell c of a row is covered by the placements starting at lo[c] ... hi[c] - 1 """
+    cells = np.arange(board_size)
+    return np.maximum(0, cells - length + 1), np.minimum(cells, board_size - length) + 1
+
+
+@lru_cache(maxsize=None)
+def get_shoot_action(cell: int, board_size: int = BOARD_SIZE) -> BattleshipAction:
+    """ Shared shoot action, never mutate """
+    return BattleshipAction(action_type=ActionType.SHOOT, location=[get_location_names(board_size)[cell]])
+
+
 class Battleship(Game):
 
-    def __init__(self) -> None:
-        self.state = BattleshipGameState()
-        self.ship_locations: Dict[int, List[List[str]]] = {
-            2: get_possible_locations(2, 10),
-            3: get_possible_locations(3, 10),
-            4: get_possible_locations(4, 10),
-            5: get_possible_locations(5, 10)
-        }
-        self.shoot_locations: List[str] = [loc[0] for loc in get_possible_locations(1, 10)]
+    def __init__(self, board_size: int = BOARD_SIZE, fleet: Optional[List[Tuple[str, int]]] = None) -> None:
+        """ Standard 10x10 game, or a custom board (columns go on 'AA', 'AB', ... after 'Z') and fleet """
+        if board_size == BOARD_SIZE and fleet is None:
+            self.state = BattleshipGameState()
+        else:
+            if fleet is None:
+                fleet = [(ship.name, ship.length) for ship in PlayerState(name='').ships]
+            if any(length > board_size for _, length in fleet) or sum(length for _, length in fleet) > board_size ** 2:
+                raise ValueError(f"Fleet doesn't fit on a board of size {board_size}")
+            self.state = BattleshipGameState(
+                board_size=board_size,
+                cnt_ships=len(fleet),
+                players=[
+                    PlayerState(name=f'Player{idx + 1}', ships=[Ship(name=name, length=length) for name, length in fleet])
+                    for idx in range(2)
+                ])
+        self._board = BitBoard(self.state)
+
+    @property
+    def board(self) -> BitBoard:
+        """ The engine of the state, built again if the state was replaced or changed other than by apply_action """
+        if self._board.state is not self.state or not self._board.is_current():
+            self._board = BitBoard(self.state)
+        return self._board
 
     def get_state(self) -> BattleshipGameState:
         return self.state
 
     def set_state(self, state: BattleshipGameState) -> None:
         self.state = state
+        self._board = BitBoard(state)
 
     def print_state(self) -> None:
         #for idx in [0, 1]:
@@ -217,29 +469,71 @@ class Battleship(Game):
                 print(Fore.YELLOW + "Your turn!" + Style.RESET_ALL)
             print_player_board(
                 ships=self.state.players[idx].ships,
-                enemy_shots=self.state.players[(idx + 1) % 2].shots
+                enemy_shots=self.state.players[(idx + 1) % 2].shots,
+                board_size=self.state.board_size
                 )
             print("--------------------------------\n")
 
-    def get_ship_actions(self) -> List[BattleshipAction]:
-        busy_locations = set()
-        missing_ships = []
+    def get_next_ship(self) -> Optional[Ship]:
         for ship in self.state.get_player_ships(active_player=True):
             if ship.location is None:
-                missing_ships.append(ship)
-            else:
-                busy_locations.update(ship.location)
-        next_ship = missing_ships[0]
-        actions = [
-            BattleshipAction(action_type=ActionType.SET_SHIP, ship_name=next_ship.name, location=loc)
-            for loc in self.ship_locations[next_ship.length]
-            if len(set(loc).intersection(busy_locations)) == 0
-            ]
-        return actions
+                return ship
+        return None
+
+    def iter_legal_placements(self, ship_length: int) -> Iterator[Placement]:
+        """ Placements not overlapping the active player's ships, generated lazily """
+        occupied = self.board.players[self.state.idx_player_active].fleet
+        return (placement for placement in get_placements(ship_length, self.state.board_size) if placement.mask & occupied == 0)
+
+    def random_legal_placement(self, rng: random.Random) -> Optional[BattleshipAction]:
+        """ Set-ship action for the next ship at a random legal placement, without listing all of them """
+        ship = self.get_next_ship()
+        if ship is None:
+            return None
+        board_size = self.state.board_size
+        cnt = cnt_placements(ship.length, board_size)
+        occupied = self.board.players[self.state.idx_player_active].fleet
+        for _ in range(MAX_PLACEMENT_TRIES):
+            placement = get_placement(ship.length, board_size, rng.randrange(cnt))
+            if placement.mask & occupied == 0:
+                return get_ship_action(ship.name, placement)
+        legal = list(self.iter_legal_placements(ship.length))
+        if len(legal) == 0:
+            return None
+        return get_ship_action(ship.name, rng.choice(legal))
+
+    def get_ship_actions(self) -> List[BattleshipAction]:
+        ship = self.get_next_ship()
+        if ship is None:
+            return []
+        return [get_ship_action(ship.name, placement) for placement in self.iter_legal_placements(ship.length)]
+
+    def iter_shoot_actions(self) -> Iterator[BattleshipAction]:
+        """ Shoot actions for the cells not fired at yet, generated lazily """
+        board_size = self.state.board_size
+        return (get_shoot_action(cell, board_size) for cell in iter_bits(self.board.free_shots()))
+
+    def random_shoot_action(self, rng: random.Random) -> Optional[BattleshipAction]:
+        """ Shoot action at a random cell not fired at yet, without listing all of them """
+        if self.state.phase != GamePhase.RUNNING:
+            return None
+        board_size = self.state.board_size
+        board = self.board
+        for _ in range(MAX_SHOOT_TRIES):
+            cell = rng.randrange(board_size * board_size)
+            if not board.is_shot(cell):
+                return get_shoot_action(cell, board_size)
+        actions = self.get_shoot_actions()
+        return rng.choice(actions) if len(actions) > 0 else None
+
+    def random_action(self, rng: random.Random) -> Optional[BattleshipAction]:
+        """ A uniformly random legal action, as RandomPlayer picks it, without listing all actions """
+        if not self.state.all_ships_located():
+            return self.random_legal_placement(rng)
+        return self.random_shoot_action(rng)
 
     def get_shoot_actions(self) -> List[BattleshipAction]:
-        loc_options = set(self.shoot_locations).difference(set(self.state.get_player_shots(active_player=True)))
-        return [BattleshipAction(action_type=ActionType.SHOOT, location=[loc]) for loc in loc_options]
+        return list(self.iter_shoot_actions())
 
     def get_list_action(self) -> List[BattleshipAction]:
         if not self.state.all_ships_located():
@@ -249,15 +543,17 @@ class Battleship(Game):
         return self.get_shoot_actions()
 
     def apply_action(self, action: BattleshipAction) -> None:
-        self.state.apply_action(action)
+        self.board.apply_action(action)
 
     def get_player_view(self, idx_player: int) -> BattleshipGameState:
         if idx_player > 1:
             raise ValueError('There are only two players')
-        return self.state.get_masked_state(idx_player)
+        return self.board.get_masked_state(idx_player)
+
+    def get_public_view(self) -> BattleshipGameState:
+        return self.board.get_public_state()
 
 
-# pylint: disable = too-few-public-methods
 class RandomPlayer(Player):
 
     def select_action(self, state: BattleshipGameState, actions: List[BattleshipAction]) -> Optional[BattleshipAction]:
@@ -271,18 +567,18 @@ class NotSoRandomPlayer(Player):
 
     last_action = None
     last_successfull_action = None
+    board_size = BOARD_SIZE
 
     def get_dist(self, a: BattleshipAction, b: BattleshipAction) -> float:
-        a_x = ord(a.location[0][0])
-        a_y = int(a.location[0][1:])
-        b_x = ord(b.location[0][0])
-        b_y = int(b.location[0][1:])
+        a_y, a_x = divmod(location_to_index(a.location[0], self.board_size), self.board_size)
+        b_y, b_x = divmod(location_to_index(b.location[0], self.board_size), self.board_size)
         if a_x != b_x and a_y != b_y:
-            return 100
+            return 10 * self.board_size
         return abs(a_x - b_x) + abs(a_y - b_y)
 
     def select_action(self, state: BattleshipGameState, actions: List[BattleshipAction]) -> BattleshipAction:
         action_selected = None
+        self.board_size = state.board_size
         if state.phase == GamePhase.SETUP:
             if len(actions) > 0:
                 action_selected = random.choice(actions)
@@ -310,6 +606,77 @@ class NotSoRandomPlayer(Player):
         return action_selected
 
 
+class DensityPlayer(Player):
+    """
+    Hunt/target player: for every unshot cell, count the placements of the remaining ships that agree with the
+    known misses and sunk ships. Placements through unresolved hits are weighted up, the densest cell is fired at.
+    The enemy fleet is assumed to be the same as the own one.
+    """
+
+    TARGET_WEIGHT = 50.0
+
+    def __init__(self, rng: Optional[random.Random] = None) -> None:
+        self.rng = rng if rng is not None else random.Random(random.getrandbits(64))
+
+    @staticmethod
+    def get_sunk(state: BattleshipGameState) -> Tuple[int, List[int]]:
+        """ Mask of the sunk enemy ships and lengths of the ships still afloat """
+        sunk = 0
+        lengths = [ship.length for ship in state.players[state.idx_player_active].ships]
+        for ship in state.players[(state.idx_player_active + 1) % 2].ships:  # the masked view only shows sunk ships
+            if ship.location is not None:
+                sunk |= locations_to_mask(ship.location, state.board_size)
+                if ship.length in lengths:
+                    lengths.remove(ship.length)
+        return sunk, lengths
+
+    def get_cover(self, cum: np.ndarray, length: int) -> np.ndarray:
+        """
+        Weighted count of the placements through every cell, for rows (horizontal) and columns (vertical),
+        from the prefix sums of the blocked cells and open hits: a placement fits if its window holds no blocked
+        cell, and weighs more for every open hit it covers.
+        """
+        windows = cum[:, :, length:] - cum[:, :, :-length]
+        weights = (windows[0::2] == 0) * (1.0 + self.TARGET_WEIGHT * windows[1::2])
+        cum_weights = np.zeros((2, weights.shape[1], weights.shape[2] + 1), dtype=np.float32)
+        np.cumsum(weights, axis=2, out=cum_weights[:, :, 1:])
+        lo, hi = get_cover_index(weights.shape[1], length)
+        return cum_weights[:, :, hi] - cum_weights[:, :, lo]
+
+    def get_density(self, state: BattleshipGameState) -> np.ndarray:
+        board_size = state.board_size
+        cnt_cell = board_size * board_size
+        shots = locations_to_mask(state.players[state.idx_player_active].shots, board_size)
+        hits = locations_to_mask(state.players[state.idx_player_active].successful_shots, board_size)
+        sunk, lengths = self.get_sunk(state)
+        blocked = mask_to_array((shots & ~hits) | sunk, cnt_cell).reshape(board_size, board_size)
+        open_hits = mask_to_array(hits & ~sunk, cnt_cell).reshape(board_size, board_size)
+
+        # prefix sums along the rows, then along the columns
+        cum = np.zeros((4, board_size, board_size + 1), dtype=np.float32)
+        np.cumsum(np.stack([blocked, open_hits, blocked.T, open_hits.T]), axis=2, out=cum[:, :, 1:])
+        density = np.zeros((board_size, board_size), dtype=np.float32)
+        for length, cnt in Counter(lengths).items():
+            if length > board_size:
+                continue
+            cover = self.get_cover(cum, length)
+            density += cnt * cover[0]
+            if length > 1:
+                density += cnt * cover[1].T
+        density[blocked.astype(bool) | open_hits.astype(bool)] = -1.0
+        return density.reshape(cnt_cell)
+
+    def select_action(self, state: BattleshipGameState, actions: List[BattleshipAction]) -> Optional[BattleshipAction]:
+        if len(actions) == 0:
+            return None
+        if state.phase != GamePhase.RUNNING:
+            return self.rng.choice(actions)
+        density = self.get_density(state)
+        scores = density[[location_to_index(action.location[0], state.board_size) for action in actions]]
+        best = np.flatnonzero(scores == scores.max())
+        return actions[int(self.rng.choice(list(best)))]
+
+
 if __name__ == "__main__":
 
     game = Battleship()
@@ -350,4 +717,4 @@ if __name__ == "__main__":
             break
         act = smart_player.select_action(stat, game.get_list_action())
         game.apply_action(act)
-    #game.print_state()
\ No newline at end of file
+    #game.print_state()
@@ -0,0 +1,204 @@
+"""
+Battleship tournament: two players fight N games across a process pool.
+
+Every game has its own seed (base seed + game number), so a tournament is reproducible
+whatever the number of workers. Seats alternate: player A starts the even games.
+Reports win rate (Wilson interval), shots to win (normal interval) and decisions per second,
+and writes the games to CSV and the distributions to a matplotlib figure.
+
+    python server/py/battleship_tournament.py density notsorandom --games 400 --csv games.csv --plot games.png
+"""
+from typing import Dict, List, NamedTuple, Optional, Type
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import csv
+import math
+import random
+import time
+
+from server.py.game import Player, load_player_class
+from server.py.battleship import Battleship, GamePhase, RandomPlayer, NotSoRandomPlayer, DensityPlayer
+
+PLAYERS: Dict[str, Type[Player]] = {
+    'random': RandomPlayer,
+    'notsorandom': NotSoRandomPlayer,
+    'density': DensityPlayer,
+}
+MAX_TURNS = 100000
+Z_95 = 1.96
+
+
+def load_player(spec: str) -> Type[Player]:
+    return load_player_class(spec, PLAYERS)
+
+
+class GameResult(NamedTuple):
+    seed: int
+    idx_first: int              # 0 if player A started
+    winner: Optional[int]       # 0 = player A, 1 = player B, None if MAX_TURNS ran out
+    cnt_shots_winner: int
+    cnt_decisions: List[int]    # per player A, B
+    seconds: List[float]        # time spent in select_action per player A, B
+
+
+def is_random_player(player: Player) -> bool:
+    """ Players that pick uniformly among the legal actions, whose move can be drawn from the game lazily """
+    return type(player).select_action is RandomPlayer.select_action
+
+
+def play_game(spec_a: str, spec_b: str, seed: int, board_size: int = 10) -> GameResult:
+    random.seed(seed)
+    rng = random.Random(seed)
+    players = [load_player(spec_a)(), load_player(spec_b)()]
+    game = Battleship(board_size=board_size)
+    state = game.get_state()
+    idx_first = seed % 2
+    state.idx_player_active = idx_first
+    cnt_decisions = [0, 0]
+    seconds = [0.0, 0.0]
+
+    for _ in range(MAX_TURNS):
+        if state.phase == GamePhase.FINISHED:
+            break
+        idx = state.idx_player_active
+        if is_random_player(players[idx]):
+            start = time.perf_counter()
+            action = game.random_action(rng)  # on large boards, listing every free cell would dominate the turn
+        else:
+            view_and_actions = (game.get_player_view(idx), game.get_list_action())
+            start = time.perf_counter()  # only the decision, not the engine preparing its input
+            action = players[idx].select_action(*view_and_actions)
+        seconds[idx] += time.perf_counter() - start
+        cnt_decisions[idx] += 1
+        if action is None:
+            break  # no legal move left
+        game.apply_action(action)
+
+    if state.phase != GamePhase.FINISHED or state.winner is None:
+        return GameResult(seed, idx_first, None, 0, cnt_decisions, seconds)
+    return GameResult(seed, idx_first, state.winner, len(state.players[state.winner].shots), cnt_decisions, seconds)
+
+
+def run_tournament(spec_a: str, spec_b: str, cnt_games: int, seed: int = 0, board_size: int = 10,  # pylint: disable = too-many-arguments
+                   cnt_workers: Optional[int] = None) -> List[GameResult]:
+    load_player(spec_a)  # fail early, not in the workers
+    load_player(spec_b)
+    seeds = [seed + idx for idx in range(cnt_games)]
+    with ProcessPoolExecutor(cnt_workers) as pool:
+        results = pool.map(play_game, [spec_a] * cnt_games, [spec_b] * cnt_games, seeds, [board_size] * cnt_games,
+                           chunksize=max(1, cnt_games // 64))
+        return list(results)
+
+
+def wilson_interval(cnt_success: int, cnt: int, z: float = Z_95) -> tuple[float, float]:
+    if cnt == 0:
+        return 0.0, 1.0
+    p = cnt_success / cnt
+    denominator = 1 + z * z / cnt
+    centre = (p + z * z / (2 * cnt)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / cnt + z * z / (4 * cnt * cnt)) / denominator
+    return centre - margin, centre + margin
+
+
+def mean_interval(values: List[int], z: float = Z_95) -> tuple[float, float, float]:
+    """ Mean and normal-approximation interval """
+    if len(values) == 0:
+        return math.nan, math.nan, math.nan
+    mean = sum(values) / len(values)
+    if len(values) == 1:
+        return mean, mean, mean
+    std = math.sqrt(sum((v - mean) ** 2 for v in values) / (len(values) - 1))
+    margin = z * std / math.sqrt(len(values))
+    return mean, mean - margin, mean + margin
+
+
+def summarize(results: List[GameResult], names: List[str]) -> List[Dict[str, float | str]]:
+    rows: List[Dict[str, float | str]] = []
+    cnt = len(results)
+    for idx, name in enumerate(names):
+        wins = [r for r in results if r.winner == idx]
+        low, high = wilson_interval(len(wins), cnt)
+        mean, mean_low, mean_high = mean_interval([r.cnt_shots_winner for r in wins])
+        decisions = sum(r.cnt_decisions[idx] for r in results)
+        seconds = sum(r.seconds[idx] for r in results)
+        rows.append({
+            'player': name,
+            'games': cnt,
+            'wins': len(wins),
+            'win_rate': len(wins) / cnt if cnt else math.nan,
+            'win_rate_low': low,
+            'win_rate_high': high,
+            'shots_to_win': mean,
+            'shots_to_win_low': mean_low,
+            'shots_to_win_high': mean_high,
+            'decisions_per_sec': decisions / seconds if seconds > 0 else math.inf,
+        })
+    return rows
+
+
+def write_csv(path: str, results: List[GameResult], names: List[str]) -> None:
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(['seed', 'first', 'winner', 'shots_winner',
+                         f'decisions_{names[0]}', f'decisions_{names[1]}', f'seconds_{names[0]}', f'seconds_{names[1]}'])
+        for r in results:
+            writer.writerow([r.seed, names[r.idx_first], '' if r.winner is None else names[r.winner], r.cnt_shots_winner,
+                             *r.cnt_decisions, *r.seconds])
+
+
+def write_plot(path: str, results: List[GameResult], names: List[str]) -> None:
+    import matplotlib  # pylint: disable = import-outside-toplevel
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt  # pylint: disable = import-outside-toplevel
+
+    summary = summarize(results, names)
+    fig, (ax_win, ax_shots) = plt.subplots(1, 2, figsize=(11, 4))
+    rates = [float(row['win_rate']) for row in summary]
+    errors = [[rate - float(row['win_rate_low']) for rate, row in zip(rates, summary)],
+              [float(row['win_rate_high']) - rate for rate, row in zip(rates, summary)]]
+    ax_win.bar(names, rates, yerr=errors, capsize=6, color=['tab:blue', 'tab:orange'])
+    ax_win.set_ylim(0, 1)
+    ax_win.set_ylabel('win rate (95% CI)')
+    for idx, name in enumerate(names):
+        shots = [r.cnt_shots_winner for r in results if r.winner == idx]
+        if shots:
+            ax_shots.hist(shots, bins=30, alpha=0.6, label=name)
+    ax_shots.set_xlabel('shots to win')
+    ax_shots.set_ylabel('games')
+    ax_shots.legend()
+    fig.suptitle(f'{names[0]} vs {names[1]}, {len(results)} games')
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Battleship tournament between two players')
+    parser.add_argument('player_a', help=f"one of {sorted(PLAYERS)} or 'module:Class'")
+    parser.add_argument('player_b', help=f"one of {sorted(PLAYERS)} or 'module:Class'")
+    parser.add_argument('--games', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--board-size', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--csv', default=None, help='write one row per game')
+    parser.add_argument('--plot', default=None, help='write win rates and shots to win as image')
+    args = parser.parse_args()
+
+    list_name = [args.player_a, args.player_b]
+    if list_name[0] == list_name[1]:
+        list_name = [f'{list_name[0]}_a', f'{list_name[1]}_b']
+    time_start = time.perf_counter()
+    list_result = run_tournament(args.player_a, args.player_b, args.games, args.seed, args.board_size, args.workers)
+    time_total = time.perf_counter() - time_start
+
+    print(f'{args.games} games in {time_total:.1f}s ({args.games / time_total:.1f} games/s)')
+    for row in summarize(list_result, list_name):
+        print(f"{row['player']:>14}: wins {row['wins']:>5} "
+              f"rate {row['win_rate']:.3f} [{row['win_rate_low']:.3f}, {row['win_rate_high']:.3f}]  "
+              f"shots to win {row['shots_to_win']:6.2f} [{row['shots_to_win_low']:.2f}, {row['shots_to_win_high']:.2f}]  "
+              f"decisions/s {row['decisions_per_sec']:,.0f}")
+    if args.csv:
+        write_csv(args.csv, list_result, list_name)
+    if args.plot:
+        write_plot(args.plot, list_result, list_name)
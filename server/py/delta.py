@@ -0,0 +1,124 @@
+"""
+JSON-Patch style deltas between consecutive state messages of one websocket client.
+
+DeltaEncoder remembers the last state dict sent to its client and turns the next one into
+{'type': 'patch', 'seq': n, 'ops': [...]}. Every `snapshot_every` messages, after reset() (the
+client asked for a resync) or when a patch has more than `max_ops` ops, it sends the full state as
+{'type': 'update', 'seq': n, 'state': {...}}, the message clients already understand.
+The client applies patches in order and asks for a resync when a sequence number is missing.
+
+Ops follow RFC 6902 (replace, add, remove with JSON pointers). Lists are diffed after cutting
+their common head and tail, so playing one card out of a hand is one 'remove'. Values are compared
+with ==, so 1, 1.0 and True count as unchanged; fine for the typed fields of our game states.
+"""
+from typing import Any, Dict, List, Optional
+
+SNAPSHOT_EVERY = 100
+MAX_OPS = 64
+
+Op = Dict[str, Any]
+
+
+def escape(key: Any) -> str:
+    return str(key).replace('~', '~0').replace('/', '~1')
+
+
+def unescape(token: str) -> str:
+    return token.replace('~1', '/').replace('~0', '~')
+
+
+def diff(old: Any, new: Any, path: str = '') -> List[Op]:
+    """ Ops that turn old into new """
+    if old is new:
+        return []
+    if type(old) is not type(new):  # pylint: disable = unidiomatic-typecheck
+        return [{'op': 'replace', 'path': path, 'value': new}]
+    if isinstance(old, dict):
+        ops: List[Op] = []
+        for key, value in old.items():
+            if key not in new:
+                ops.append({'op': 'remove', 'path': f'{path}/{escape(key)}'})
+            elif value is not new[key] and value != new[key]:
+                ops.extend(diff(value, new[key], f'{path}/{escape(key)}'))
+        for key, value in new.items():
+            if key not in old:
+                ops.append({'op': 'add', 'path': f'{path}/{escape(key)}', 'value': value})
+        return ops
+    if isinstance(old, list):
+        return diff_list(old, new, path)
+    if old != new:
+        return [{'op': 'replace', 'path': path, 'value': new}]
+    return []
+
+
+def diff_list(old: List[Any], new: List[Any], path: str) -> List[Op]:
+    cnt_min = min(len(old), len(new))
+    head = 0
+    while head < cnt_min and old[head] == new[head]:
+        head += 1
+    tail = 0
+    while tail < cnt_min - head and old[-1 - tail] == new[-1 - tail]:
+        tail += 1
+    cnt_old, cnt_new = len(old) - head - tail, len(new) - head - tail
+    ops: List[Op] = []
+    for idx in range(head, head + min(cnt_old, cnt_new)):
+        ops.extend(diff(old[idx], new[idx], f'{path}/{idx}'))
+    idx = head + min(cnt_old, cnt_new)
+    for _ in range(cnt_old - cnt_new):
+        ops.append({'op': 'remove', 'path': f'{path}/{idx}'})
+    for offset in range(cnt_new - cnt_old):
+        ops.append({'op': 'add', 'path': f'{path}/{idx + offset}', 'value': new[idx + offset]})
+    if len(ops) > 1 and len(ops) >= len(new):
+        return [{'op': 'replace', 'path': path, 'value': new}]  # e.g. list_action emptied after a move
+    return ops
+
+
+def apply_patch(doc: Any, ops: List[Op]) -> Any:
+    """ Apply ops in place where possible and return the document (a root 'replace' makes a new one) """
+    for op in ops:
+        if op['path'] == '':
+            doc = op['value']
+            continue
+        *parents, last = [unescape(token) for token in op['path'][1:].split('/')]
+        target = doc
+        for token in parents:
+            target = target[int(token)] if isinstance(target, list) else target[token]
+        if isinstance(target, list):
+            idx = len(target) if last == '-' else int(last)
+            if op['op'] == 'add':
+                target.insert(idx, op['value'])
+            elif op['op'] == 'remove':
+                del target[idx]
+            else:
+                target[idx] = op['value']
+        elif op['op'] == 'remove':
+            del target[last]
+        else:
+            target[last] = op['value']
+    return doc
+
+
+class DeltaEncoder:
+
+    def __init__(self, snapshot_every: int = SNAPSHOT_EVERY, max_ops: int = MAX_OPS) -> None:
+        self.snapshot_every = snapshot_every
+        self.max_ops = max_ops
+        self.seq = 0
+        self.last: Optional[Dict[str, Any]] = None
+        self.cnt_since_snapshot = 0
+
+    def reset(self) -> None:
+        """ The next message is a snapshot """
+        self.last = None
+
+    def encode(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """ The message for state; the encoder keeps state, so do not modify it afterwards """
+        self.seq += 1
+        last, self.last = self.last, state
+        if last is not None and self.cnt_since_snapshot < self.snapshot_every:
+            ops = diff(last, state)
+            if len(ops) <= self.max_ops:
+                self.cnt_since_snapshot += 1
+                return {'type': 'patch', 'seq': self.seq, 'ops': ops}
+        self.cnt_since_snapshot = 0
+        return {'type': 'update', 'seq': self.seq, 'state': state}
@@ -89,6 +89,9 @@ class GameState(BaseModel):
     steps_remaining_for_7: int = 7
 
 
+CARD_HIDDEN = Card(suit='', rank='BCK')  # drawn as the back of a card by the client
+
+
 class Dog(Game):
     KENNEL_POSITIONS = [
         [64, 65, 66, 67],
@@ -166,7 +169,14 @@ class Dog(Game):
         pass
 
     def get_player_view(self, idx_player: int) -> GameState:
-        return self.state
+        # other hands and the draw pile face down, new lists so the real state stays untouched
+        return self.state.model_copy(update={
+            'list_player': [
+                player if idx == idx_player else PlayerState(name=player.name, list_card=[CARD_HIDDEN] * len(player.list_card), list_marble=player.list_marble)
+                for idx, player in enumerate(self.state.list_player)
+            ],
+            'list_card_draw': [CARD_HIDDEN] * len(self.state.list_card_draw),
+        })
 
     def get_list_action(self) -> List[Action]:
         actions: List[Action] = []
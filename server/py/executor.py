@@ -0,0 +1,107 @@
+"""
+Run game engine and bot calls off the asyncio event loop.
+
+An EngineExecutor owns `cnt_workers` single-worker pools. Calls for the same key (the game id)
+always go to the same worker, so they run one after another in submission order and a game
+object is never used by two threads at once. One expensive call only delays the sessions that
+share its worker, not the event loop.
+
+mode='thread' runs the callable as is. mode='process' pickles the callable and its arguments to
+a worker process and the result back: use it for side-effect free calls like a bot's
+select_action(view, actions), not for methods that change a game living in this process.
+
+select_action() runs a bot's decision. In process mode the bot goes to the worker and comes back with
+the action, so what the bot changes on itself (its rng, what it remembers of earlier moves) is kept.
+
+At most `max_pending` calls may be queued or running, more are rejected with ExecutorBusy.
+A call that does not finish within `timeout` seconds raises ExecutorTimeout; it keeps its
+slot until it actually finishes, so stuck calls still count against max_pending.
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+import asyncio
+import zlib
+
+T = TypeVar('T')
+
+EXECUTOR_MODES = ('thread', 'process')
+
+
+def _select_action(player: Any, state: Any, actions: List[Any]) -> Tuple[Any, Any]:
+    return player.select_action(state, actions), player
+
+
+class ExecutorBusy(RuntimeError):
+    pass
+
+
+class ExecutorTimeout(TimeoutError):
+    pass
+
+
+class EngineExecutor:
+
+    def __init__(self, mode: str = 'thread', cnt_workers: int = 4, max_pending: int = 256, timeout: Optional[float] = 10.0) -> None:
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Unknown executor mode '{mode}', use one of {EXECUTOR_MODES}")
+        if cnt_workers < 1 or max_pending < 1:
+            raise ValueError("cnt_workers and max_pending must be positive")
+        self.mode = mode
+        self.timeout = timeout
+        self.max_pending = max_pending
+        self.workers: List[Executor] = [self._new_worker() for _ in range(cnt_workers)]
+        self.cnt_pending = 0
+        self.cnt_done = 0
+        self.cnt_rejected = 0
+        self.cnt_timeout = 0
+
+    def _new_worker(self) -> Executor:
+        if self.mode == 'process':
+            return ProcessPoolExecutor(max_workers=1)
+        return ThreadPoolExecutor(max_workers=1, thread_name_prefix='engine')
+
+    def get_worker(self, key: str) -> Executor:
+        return self.workers[zlib.crc32(key.encode()) % len(self.workers)]
+
+    async def run(self, key: str, fn: Callable[..., T], *args: Any, timeout: Optional[float] = None) -> T:
+        """ fn(*args) on the worker of key, waiting at most timeout (default: self.timeout) seconds """
+        if self.cnt_pending >= self.max_pending:
+            self.cnt_rejected += 1
+            raise ExecutorBusy(f"{self.cnt_pending} engine calls pending")
+        loop = asyncio.get_running_loop()
+        future: Future = self.get_worker(key).submit(fn, *args)
+        self.cnt_pending += 1
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release))
+        seconds = self.timeout if timeout is None else timeout
+        try:
+            result: T = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), seconds)
+        except asyncio.TimeoutError as error:
+            self.cnt_timeout += 1
+            raise ExecutorTimeout(f"Engine call {getattr(fn, '__qualname__', fn)} took longer than {seconds}s") from error
+        return result
+
+    async def select_action(self, key: str, player: Any, state: Any, actions: List[Any]) -> Any:
+        """ player.select_action(state, actions) on the worker of key """
+        if self.mode != 'process':
+            return await self.run(key, player.select_action, state, actions)
+        action, player_after = await self.run(key, _select_action, player, state, actions)
+        vars(player).update(vars(player_after))
+        return action
+
+    def _release(self) -> None:
+        self.cnt_pending -= 1
+        self.cnt_done += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'mode': self.mode,
+            'workers': len(self.workers),
+            'pending': self.cnt_pending,
+            'done': self.cnt_done,
+            'rejected': self.cnt_rejected,
+            'timeout': self.cnt_timeout,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        for worker in self.workers:
+            worker.shutdown(wait=wait, cancel_futures=True)
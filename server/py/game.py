@@ -1,5 +1,6 @@
-from typing import List, Any
+from typing import Any, Dict, List, Type
 from abc import ABCMeta, abstractmethod
+import importlib
 
 GameState = Any
 GameAction = Any
@@ -37,6 +38,10 @@ class Game(metaclass=ABCMeta):
         """ Get the masked state for the active player (e.g. the oppontent's cards are face down)"""
         pass
 
+    def get_public_view(self) -> GameState:
+        """ Get the state as spectators see it, masked for every player (no player has index -1) """
+        return self.get_player_view(-1)
+
 
 class Player(metaclass=ABCMeta):
 
@@ -44,3 +49,14 @@ class Player(metaclass=ABCMeta):
     def select_action(self, state: GameState, actions: List[GameAction]) -> GameAction:
         """ Given masked game state and possible actions, select the next action """
         pass
+
+
+def load_player_class(spec: str, players: Dict[str, Type[Player]]) -> Type[Player]:
+    """ A name from players or 'package.module:ClassName' for bots living elsewhere (used by the CLI tools) """
+    if spec in players:
+        return players[spec]
+    if ':' not in spec:
+        raise ValueError(f"Unknown player '{spec}', use one of {sorted(players)} or 'module:Class'")
+    module_name, class_name = spec.split(':', 1)
+    player: Type[Player] = getattr(importlib.import_module(module_name), class_name)
+    return player
@@ -1,12 +1,14 @@
 # Example solution to test docker thingies
 
 
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 import string
 import random
 from enum import Enum
-from pydantic import BaseModel, field_validator
+import numpy as np
+from pydantic import BaseModel, PrivateAttr, field_validator
 from server.py.game import Game, Player
+from server.py.word_corpus import get_corpus, normalize
 
 
 class GuessLetterAction(BaseModel):
@@ -24,12 +26,63 @@ class GamePhase(str, Enum):
     FINISHED = 'finished'      # when the game is finished
 
 
+MAX_INCORRECT = 7  # one more distinct wrong letter loses the game
+MAX_PATTERN_LENGTH = 52  # position bitmasks of longer words do not fit a float64 mantissa
+LETTER_BIT = {letter: 1 << idx for idx, letter in enumerate(string.ascii_uppercase)}
+LIST_ACTION = tuple(GuessLetterAction(letter=letter) for letter in string.ascii_uppercase)  # shared, do not modify
+
+
+# pylint: disable = too-few-public-methods
+class GuessTracker:
+    """ Guessed letters as bitmask, revealed positions and distinct wrong letters of one word """
+    __slots__ = ('word', 'positions', 'masked', 'cnt_hidden', 'guessed', 'guessed_other', 'cnt_incorrect', 'cnt_guess')
+
+    def __init__(self, word: str) -> None:
+        self.word = word
+        self.positions: Dict[str, List[int]] = {}
+        for idx, letter in enumerate(word):
+            self.positions.setdefault(letter, []).append(idx)
+        self.masked = ['_'] * len(word)
+        self.cnt_hidden = len(word)
+        self.guessed = 0
+        self.guessed_other: Set[str] = set()  # guesses outside A-Z
+        self.cnt_incorrect = 0
+        self.cnt_guess = 0
+
+    def add(self, letter: str) -> bool:
+        """ Count one guess, True if it is not in the word """
+        self.cnt_guess += 1
+        bit = LETTER_BIT.get(letter, 0)
+        if bit == 0:
+            if letter in self.guessed_other:
+                return letter not in self.positions
+            self.guessed_other.add(letter)
+        elif self.guessed & bit:
+            return letter not in self.positions
+        self.guessed |= bit
+        positions = self.positions.get(letter)
+        if positions is None:
+            self.cnt_incorrect += 1
+            return True
+        for idx in positions:
+            self.masked[idx] = letter
+        self.cnt_hidden -= len(positions)
+        return False
+
+
 class HangmanGameState(BaseModel):
+    """
+    The pydantic fields are the public view. apply_action keeps them up to date together with a
+    GuessTracker, so a guess costs O(1) plus the positions it reveals. The tracker follows the
+    fields by itself when word_to_guess is replaced or guesses is reset; guesses is append-only otherwise.
+    """
     word_to_guess: str = ""
     phase: GamePhase = GamePhase.SETUP
     guesses: List[str] = []
     incorrect_guesses: List[str] = []
 
+    _tracker: Optional[GuessTracker] = PrivateAttr(default=None)
+
     @field_validator("word_to_guess")
     @classmethod
     def uppercase(cls, value: str) -> str:
@@ -38,28 +91,41 @@ class HangmanGameState(BaseModel):
     def updateincorrect_guesses(self) -> None:
         self.incorrect_guesses = [letter for letter in self.guesses if letter not in self.word_to_guess]
 
+    def get_tracker(self) -> GuessTracker:
+        """ The tracker, brought up to date with the fields """
+        tracker = self._tracker
+        guesses = self.guesses
+        if tracker is None or tracker.word != self.word_to_guess or tracker.cnt_guess > len(guesses):
+            tracker = self._tracker = GuessTracker(self.word_to_guess)
+            self.updateincorrect_guesses()
+        while tracker.cnt_guess < len(guesses):
+            tracker.add(guesses[tracker.cnt_guess])
+        return tracker
+
     def get_masked_state(self) -> "HangmanGameState":
         if self.phase == GamePhase.FINISHED:
             masked_word = self.word_to_guess
         else:
-            masked_word = ''.join([letter if letter in self.guesses else '_' for letter in self.word_to_guess])
-        return HangmanGameState(
+            masked_word = ''.join(self.get_tracker().masked)
+        return HangmanGameState.model_construct(
             word_to_guess=masked_word,
             phase=self.phase,
-            guesses=self.guesses,
-            incorrect_guesses=self.incorrect_guesses
+            guesses=list(self.guesses),
+            incorrect_guesses=list(self.incorrect_guesses)
         )
 
     def check_if_finished(self) -> None:
-        if len(set(self.word_to_guess).difference(set(self.guesses))) == 0:
-            self.phase = GamePhase.FINISHED
-        if len(set(self.guesses).difference(set(self.word_to_guess))) > 7:
+        tracker = self.get_tracker()
+        if tracker.cnt_hidden == 0 or tracker.cnt_incorrect > MAX_INCORRECT:
             self.phase = GamePhase.FINISHED
 
     def apply_action(self, action: GuessLetterAction) -> None:
+        tracker = self.get_tracker()
         self.guesses.append(action.letter)
-        self.updateincorrect_guesses()
-        self.check_if_finished()
+        if tracker.add(action.letter):
+            self.incorrect_guesses.append(action.letter)
+        if tracker.cnt_hidden == 0 or tracker.cnt_incorrect > MAX_INCORRECT:
+            self.phase = GamePhase.FINISHED
 
 
 class Hangman(Game):
@@ -110,8 +176,8 @@ class Hangman(Game):
     def get_list_action(self) -> List[GuessLetterAction]:
         if self.state.phase == GamePhase.FINISHED:
             return []
-        all_letters = string.ascii_uppercase
-        return [GuessLetterAction(letter=letter) for letter in all_letters if letter not in self.state.guesses]
+        guessed = self.state.get_tracker().guessed
+        return [action for idx, action in enumerate(LIST_ACTION) if not guessed >> idx & 1]
 
     def apply_action(self, action: GuessLetterAction) -> None:
         if self.state.phase == GamePhase.FINISHED:
@@ -145,6 +211,114 @@ class StructuredPlayer(Player):
         return actions[0]
 
 
+class WordIndex:
+    """ Words grouped by length as arrays of letter codes (0-25) and 26-bit letter masks """
+
+    def __init__(self, words: Iterable[str]) -> None:
+        by_length: Dict[int, List[str]] = {}
+        for word in dict.fromkeys(normalize(word) for word in words):
+            if word:
+                by_length.setdefault(len(word), []).append(word)
+        self.words: Dict[int, List[str]] = by_length
+        self.codes: Dict[int, np.ndarray] = {}
+        self.masks: Dict[int, np.ndarray] = {}
+        for length, list_word in by_length.items():
+            codes = np.frombuffer(''.join(list_word).encode('ascii'), dtype=np.uint8).reshape(-1, length) - ord('A')
+            self.codes[length] = codes
+            self.masks[length] = np.bitwise_or.reduce(np.left_shift(1, codes.astype(np.int32)), axis=1)
+
+    def candidates(self, length: int) -> np.ndarray:
+        return np.arange(len(self.words.get(length, [])))
+
+    def filter(self, length: int, candidates: np.ndarray, letter: str, positions: List[int]) -> np.ndarray:
+        """ Keep the candidates that have the guessed letter exactly at the revealed positions """
+        if len(candidates) == 0:
+            return candidates
+        code = ord(letter) - ord('A')
+        present = (self.masks[length][candidates] & (1 << code)) != 0
+        if len(positions) == 0:
+            kept: np.ndarray = candidates[~present]
+            return kept
+        candidates = candidates[present]
+        expected = np.zeros(length, dtype=bool)
+        expected[positions] = True
+        kept = candidates[((self.codes[length][candidates] == code) == expected).all(axis=1)]
+        return kept
+
+    def score_letters(self, length: int, candidates: np.ndarray, letters: str) -> Dict[str, float]:
+        """ Expected information (bits) of guessing each letter, the word being uniform over the candidates """
+        codes = self.codes[length][candidates]
+        cnt = len(candidates)
+        if length <= MAX_PATTERN_LENGTH:
+            # patterns[i, code]: bits of the positions where candidate i has the letter
+            weights = np.broadcast_to(np.exp2(np.arange(length)), codes.shape)
+            patterns = np.bincount((np.arange(cnt)[:, None] * 26 + codes).ravel(), weights.ravel(), cnt * 26).reshape(cnt, 26)
+        else:
+            patterns = np.stack([np.unique(codes == code, axis=0, return_inverse=True)[1].ravel() for code in range(26)], axis=1)
+            patterns[(self.masks[length][candidates, None] >> np.arange(26)) & 1 == 0] = -1
+        # group equal patterns per letter: sort each column, number the runs and count their sizes
+        ordered = np.sort(patterns, axis=0)
+        starts = np.ones(ordered.shape, dtype=bool)
+        starts[1:] = ordered[1:] != ordered[:-1]
+        run = np.cumsum(starts, axis=0) - 1 + np.arange(26) * cnt
+        sizes = np.bincount(run.ravel(), minlength=26 * cnt).reshape(26, cnt)
+        entropy = np.log2(cnt) - (sizes * np.log2(np.maximum(sizes, 1))).sum(axis=1) / cnt
+        # the share of candidates containing the letter breaks ties: fewer wrong guesses
+        cnt_present = (patterns > 0).sum(axis=0) if length <= MAX_PATTERN_LENGTH else (patterns >= 0).sum(axis=0)
+        scores = entropy + 1e-9 * cnt_present
+        return {letter: float(scores[ord(letter) - ord('A')]) for letter in letters}
+
+
+# pylint: disable = too-few-public-methods
+class SolverPlayer(Player):
+    """ Tracks the dictionary words consistent with the view and guesses the most informative letter """
+    MEMO_MIN_CANDIDATES = 8  # candidates and decision of larger nodes are shared between games
+
+    def __init__(self, words: Optional[Iterable[str]] = None) -> None:
+        self.index = WordIndex(get_corpus().words if words is None else words)
+        self.memo: Dict[Tuple[str, str], Tuple[np.ndarray, str]] = {}
+        self.masked_word = ''
+        self.guesses: List[str] = []
+        self.candidates = self.index.candidates(0)
+
+    def update_candidates(self, state: HangmanGameState) -> None:
+        length = len(state.word_to_guess)
+        if length != len(self.masked_word) or state.guesses[:len(self.guesses)] != self.guesses \
+                or any(old not in ('_', new) for old, new in zip(self.masked_word, state.word_to_guess)):
+            self.guesses = []
+            self.candidates = self.index.candidates(length)
+        for letter in state.guesses[len(self.guesses):]:
+            positions = [idx for idx, char in enumerate(state.word_to_guess) if char == letter]
+            self.candidates = self.index.filter(length, self.candidates, letter, positions)
+        self.masked_word = state.word_to_guess
+        self.guesses = list(state.guesses)
+
+    def select_action(self, state: HangmanGameState, actions: List[GuessLetterAction]) -> Optional[GuessLetterAction]:
+        if len(actions) == 0:
+            return None
+        action_by_letter = {action.letter: action for action in actions}
+        key = (state.word_to_guess, ''.join(sorted(state.guesses)))
+        node = self.memo.get(key)
+        if node is not None and node[1] in action_by_letter:
+            self.candidates, letter = node
+            self.masked_word = state.word_to_guess
+            self.guesses = list(state.guesses)
+            return action_by_letter[letter]
+
+        self.update_candidates(state)
+        if len(self.candidates) == 0:  # word not in the dictionary
+            for letter in StructuredPlayer.perfect_order:
+                if letter in action_by_letter:
+                    return action_by_letter[letter]
+            return actions[0]
+
+        scores = self.index.score_letters(len(state.word_to_guess), self.candidates, ''.join(action_by_letter))
+        letter = max(scores, key=scores.__getitem__)
+        if len(self.candidates) >= self.MEMO_MIN_CANDIDATES:
+            self.memo[key] = (self.candidates, letter)
+        return action_by_letter[letter]
+
+
 if __name__ == "__main__":
 
     game = Hangman()
@@ -193,4 +367,4 @@ if __name__ == "__main__":
 #             game.apply_action(selected_action)
 #             game.print_state()  # Update and print game state after the guess
 #         else:
-#             print(f"Invalid guess '{guess}'. Try again.")
\ No newline at end of file
+#             print(f"Invalid guess '{guess}'. Try again.")
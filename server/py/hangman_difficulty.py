@@ -0,0 +1,119 @@
+"""
+Hangman difficulty of every word in a word list for one player.
+
+The words are split into chunks and played in a process pool. Every worker builds its player once
+(the SolverPlayer indexes the word list) and reuses one Hangman game for all its words. Word number i
+is played with random.seed(seed + i), so the results do not depend on the number of workers.
+
+    python server/py/hangman_difficulty.py solver --words words.txt --csv difficulty.csv
+"""
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Type
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import csv
+import random
+import time
+
+from server.py.game import Player, load_player_class
+from server.py.hangman import Hangman, HangmanGameState, GamePhase, MAX_INCORRECT, RandomPlayer, StructuredPlayer, SolverPlayer
+from server.py.word_corpus import get_corpus, load_words, normalize
+
+PLAYERS: Dict[str, Type[Player]] = {
+    'random': RandomPlayer,
+    'structured': StructuredPlayer,
+    'solver': SolverPlayer,
+}
+CHUNK_SIZE = 512
+
+
+def load_player(spec: str) -> Type[Player]:
+    return load_player_class(spec, PLAYERS)
+
+
+def make_player(spec: str, words: Sequence[str]) -> Player:
+    """ Players that know the dictionary (SolverPlayer) get the word list """
+    cls = load_player(spec)
+    if issubclass(cls, SolverPlayer):
+        return cls(words)
+    return cls()
+
+
+class WordResult(NamedTuple):
+    word: str
+    cnt_guess: int
+    cnt_incorrect: int  # distinct wrong letters
+    won: bool
+    seconds: float
+
+
+def play_word(game: Hangman, player: Player, word: str) -> WordResult:
+    start = time.perf_counter()
+    game.set_state(HangmanGameState(word_to_guess=word))
+    state = game.get_state()
+    while state.phase != GamePhase.FINISHED:
+        game.apply_action(player.select_action(game.get_player_view(0), game.get_list_action()))
+    cnt_incorrect = len(set(state.incorrect_guesses))
+    return WordResult(word, len(state.guesses), cnt_incorrect, cnt_incorrect <= MAX_INCORRECT, time.perf_counter() - start)
+
+
+_WORKER: Dict[str, Tuple[Hangman, Player]] = {}
+
+
+def _init_worker(spec: str, words: Sequence[str]) -> None:
+    _WORKER['default'] = (Hangman(), make_player(spec, words))
+
+
+def _play_chunk(offset: int, words: Sequence[str], seed: int) -> List[WordResult]:
+    game, player = _WORKER['default']
+    results = []
+    for idx, word in enumerate(words):
+        random.seed(seed + offset + idx)
+        results.append(play_word(game, player, word))
+    return results
+
+
+def run_benchmark(spec: str, words: Sequence[str], seed: int = 0, cnt_workers: Optional[int] = None,
+                  chunk_size: int = CHUNK_SIZE) -> List[WordResult]:
+    """ Results in the order of words; words are expected normalized (A-Z) """
+    load_player(spec)  # fail early, not in the workers
+    offsets = list(range(0, len(words), chunk_size))
+    chunks = [words[offset:offset + chunk_size] for offset in offsets]
+    results: List[WordResult] = []
+    with ProcessPoolExecutor(cnt_workers, initializer=_init_worker, initargs=(spec, list(words))) as pool:
+        for chunk in pool.map(_play_chunk, offsets, chunks, [seed] * len(chunks)):
+            results.extend(chunk)
+    return results
+
+
+def write_csv(path: str, results: List[WordResult]) -> None:
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(['word', 'guesses', 'incorrect', 'won', 'seconds'])
+        for r in results:
+            writer.writerow([r.word, r.cnt_guess, r.cnt_incorrect, int(r.won), f'{r.seconds:.6f}'])
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Play Hangman against every word of a word list')
+    parser.add_argument('player', help=f"one of {sorted(PLAYERS)} or 'module:Class'")
+    parser.add_argument('--words', default=None, help='JSON list or one word per line, default: the Hangman word corpus')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--csv', default=None, help='write one row per word')
+    args = parser.parse_args()
+
+    list_word = list(dict.fromkeys(normalize(w) for w in load_words(args.words))) if args.words else list(get_corpus().words)
+    list_word = [w for w in list_word if w]
+    time_start = time.perf_counter()
+    list_result = run_benchmark(args.player, list_word, args.seed, args.workers)
+    time_total = time.perf_counter() - time_start
+
+    cnt_won = sum(r.won for r in list_result)
+    print(f'{len(list_result)} words in {time_total:.1f}s ({len(list_result) / time_total:,.0f} words/s)')
+    print(f'won {cnt_won} ({cnt_won / len(list_result):.1%}), '
+          f'mean guesses {sum(r.cnt_guess for r in list_result) / len(list_result):.2f}, '
+          f'mean wrong letters {sum(r.cnt_incorrect for r in list_result) / len(list_result):.2f}')
+    print('hardest:', ' '.join(r.word for r in sorted(list_result, key=lambda r: (-r.cnt_incorrect, -r.cnt_guess, r.word))[:10]))
+    if args.csv:
+        write_csv(args.csv, list_result)
@@ -1,15 +1,25 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
 from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
-import json
-import asyncio
+import os
+import random
 
 import server.py.hangman as hangman
+import server.py.word_corpus as word_corpus
 import server.py.battleship as battleship
-
-import random
+import server.py.uno as uno
+import server.py.dog as dog
+from server.py.game import Game
+from server.py.sessions import GameSession, SessionRegistry, get_state_size
+from server.py.executor import EngineExecutor, ExecutorBusy, ExecutorTimeout
+from server.py.delta import DeltaEncoder
+from server.py.serialize import accept, dump_view, receive_message, send_message
+from server.py.rooms import GameRoom, RoomRegistry
+from server.py.spectators import Spectator, SpectatorHub, dump_public_view
+from server.py.simulation import Simulation
 
 app = FastAPI()
 
@@ -17,6 +27,131 @@ app.mount("/inc/static", StaticFiles(directory="server/inc/static"), name="stati
 
 templates = Jinja2Templates(directory="server/inc/templates")
 
+word_corpus.get_corpus()  # load the Hangman words once at startup, not per connection
+
+sessions = SessionRegistry()
+
+
+async def open_session(websocket: WebSocket, kind: str, new_game: Callable[[], Game],
+                       new_context: Optional[Callable[[], Dict[str, Any]]] = None) -> GameSession:
+    """ Resume the game of ?game_id=... or start a new one, and tell the client its game id """
+    session = sessions.resume(websocket.query_params.get('game_id'), kind)
+    resumed = session is not None
+    if session is None:
+        session = sessions.create(kind, new_game(), **(new_context() if new_context is not None else {}))
+    previous = sessions.attach(session, websocket)
+    if previous is not None:
+        try:
+            await previous.close(code=4000)  # the client reconnected, this connection is stale
+        except RuntimeError:
+            pass
+    await send_message(websocket, {'type': 'session', 'game_id': session.game_id, 'resumed': resumed})
+    return session
+
+
+# engine calls change the game in this process: threads, one worker per game id
+engine = EngineExecutor('thread', cnt_workers=int(os.environ.get('ENGINE_WORKERS', 4)),
+                        max_pending=int(os.environ.get('ENGINE_MAX_PENDING', 1024)),
+                        timeout=float(os.environ.get('ENGINE_TIMEOUT', 5)))
+# bot decisions only read the game view: BOT_EXECUTOR=process moves them to other cores
+bots = EngineExecutor(os.environ.get('BOT_EXECUTOR', 'thread'), cnt_workers=int(os.environ.get('BOT_WORKERS', 2)),
+                      max_pending=int(os.environ.get('BOT_MAX_PENDING', 256)),
+                      timeout=float(os.environ.get('BOT_TIMEOUT', 10)))
+
+
+def get_view(game: Game, idx_player: int) -> Tuple[Any, List[Any]]:
+    return game.get_player_view(idx_player), game.get_list_action()
+
+
+async def engine_view(key: str, game: Game, idx_player: int) -> Tuple[Any, List[Any]]:
+    """ Player view and action list, computed off the event loop """
+    return await engine.run(key, get_view, game, idx_player)
+
+
+async def engine_apply(key: str, game: Game, action: Any) -> None:
+    await engine.run(key, game.apply_action, action)
+
+
+async def close_session(session: GameSession, websocket: WebSocket) -> None:
+    """ Detach the connection; the state is measured on the game's engine worker, after the calls still queued there """
+    size: Optional[int] = None  # only used if this was the last connection
+    try:
+        if session.cnt_connection == 1 and session.game_id in sessions.sessions:
+            size = 0  # if the engine is busy or the handler is cancelled: counted when the next connection leaves
+            size = await engine.run(session.game_id, get_state_size, session)
+    except (ExecutorBusy, ExecutorTimeout):
+        pass
+    finally:
+        sessions.detach(session, websocket, size)
+
+
+async def bot_select(key: str, player: Any, state: Any, list_action: List[Any]) -> Any:
+    """ The bot's action, a random one if the bot does not decide in time """
+    try:
+        return await bots.select_action(key, player, state, list_action)
+    except ExecutorTimeout:
+        return random.choice(list_action) if len(list_action) > 0 else None
+
+
+async def play_bot(session: GameSession, websocket: WebSocket, encoder: DeltaEncoder, idx_player: int, idx_player_you: int) -> None:
+    """ The session bot's move for idx_player, then the client's view of it. The move is left to the
+    new connection if the client resumed meanwhile; the loop of the stale one checks that and ends """
+    state, list_action = await engine_view(session.game_id, session.game, idx_player)
+    action = await bot_select(session.game_id, session.context['player'], state, list_action)
+    if session.connection is not websocket:
+        return
+    if action is not None:
+        await engine_apply(session.game_id, session.game, action)
+    state = await engine.run(session.game_id, session.game.get_player_view, idx_player_you)
+    await send_message(websocket, encoder.encode(dump_view(state, idx_player_you, [])))
+
+
+async def publish(session: GameSession) -> None:
+    """ Show the session's spectators its current state, dumped once for all of them """
+    if len(session.spectators) > 0:
+        session.spectators.publish(await engine.run(session.game_id, dump_public_view, session.game))
+
+
+async def follow(websocket: WebSocket, hub: SpectatorHub, spectator: Spectator) -> None:
+    """ Spectators only ever ask for a snapshot, until they disconnect """
+    try:
+        while True:
+            data = await receive_message(websocket)
+            if data['type'] == 'resync':
+                hub.resync(spectator)
+    except WebSocketDisconnect:
+        pass
+
+
+async def spectate_session(websocket: WebSocket, kind: str) -> None:
+    # e.g. /uno/spectate/ws?game_id=... watches the game of the id a player got in its 'session' message
+    await accept(websocket)
+    session = sessions.get(websocket.query_params.get('game_id'), kind)
+    if session is None:
+        await websocket.close(code=4004)  # unknown or finished game
+        return
+    hub = session.spectators
+    try:
+        if len(hub) == 0:
+            hub.publish(await engine.run(session.game_id, dump_public_view, session.game))
+    except (ExecutorBusy, ExecutorTimeout):
+        await websocket.close(code=1013)  # the engine is busy or too slow, try again later
+        return
+    spectator = hub.join(websocket)
+    try:
+        await follow(websocket, hub, spectator)
+    finally:
+        hub.leave(spectator)
+
+
+def spectate_page(request: Request, game: str, id_param: str):
+    return templates.TemplateResponse("game/spectate.html", {"request": request, "game": game, "id_param": id_param})
+
+
+@app.get("/sessions/stats")
+async def sessions_stats():
+    return {**sessions.stats(), 'engine': engine.stats(), 'bots': bots.stats(), 'dog_rooms': dog_rooms.stats()}
+
 
 @app.get("/", response_class=HTMLResponse)
 async def get(request: Request):
@@ -29,61 +164,69 @@ async def get(request: Request):
 async def hangman_singleplayer(request: Request):
     return templates.TemplateResponse("game/hangman/singleplayer_local.html", {"request": request})
 
+def new_hangman_game() -> hangman.Hangman:
+    game = hangman.Hangman()
+    word_to_guess = word_corpus.get_corpus().random_word()
+    state = hangman.HangmanGameState(word_to_guess=word_to_guess, phase=hangman.GamePhase.RUNNING, guesses=[], incorrect_guesses=[])
+    game.set_state(state)
+    return game
+
+
 @app.websocket("/hangman/singleplayer/ws")
 async def hangman_singleplayer_ws(websocket: WebSocket):
-    await websocket.accept()
+    await accept(websocket)
 
     idx_player_you = 0
+    session = await open_session(websocket, 'hangman', new_hangman_game)
+    encoder = DeltaEncoder()  # sends patches against the last state this connection got
 
     try:
 
-        game = hangman.Hangman()
-
-        words = []
-        with open('server/py/hangman_words.json') as fin:
-            words = json.load(fin)
-        word_to_guess = random.choice(words)
-
-        state = hangman.HangmanGameState(word_to_guess=word_to_guess, phase=hangman.GamePhase.RUNNING, guesses=[], incorrect_guesses=[])
-        game.set_state(state)
+        game = session.game
 
         while True:
 
-            state = game.get_player_view(idx_player_you)
-
             game.print_state()
+            await publish(session)
 
-            state = game.get_player_view(idx_player_you)
-            list_action = game.get_list_action()
-            dict_state = state.model_dump()
-            dict_state['idx_player_you'] = idx_player_you
-            dict_state['list_action'] = [action.model_dump() for action in list_action]
-            data = {'type': 'update', 'state': dict_state}
-            await websocket.send_json(data)
+            state, list_action = await engine_view(session.game_id, game, idx_player_you)
+            dict_state = dump_view(state, idx_player_you, list_action)
+            await send_message(websocket, encoder.encode(dict_state))
 
             if state.phase == hangman.GamePhase.FINISHED:
+                sessions.remove(session.game_id)
                 break
 
             if len(list_action) == 0:
-                game.apply_action(None)
+                await engine_apply(session.game_id, game, None)
             else:
-                data = await websocket.receive_json()
+                data = await receive_message(websocket)
+                if session.connection is not websocket:
+                    break  # resumed on another connection
+                sessions.touch(session)
                 if data['type'] == 'action':
                     action = hangman.GuessLetterAction.model_validate(data['action'])
-                    game.apply_action(action)
+                    await engine_apply(session.game_id, game, action)
                     print(action)
-
-            continue
-            state = game.get_player_view(idx_player_you)
-            dict_state = state.model_dump()
-            dict_state['idx_player_you'] = idx_player_you
-            dict_state['list_action'] = []
-
-            data = {'type': 'update', 'state': dict_state}
-            await websocket.send_json(data)
+                elif data['type'] == 'resync':
+                    encoder.reset()
 
     except WebSocketDisconnect:
         print('DISCONNECTED')
+    except (ExecutorBusy, ExecutorTimeout):
+        await websocket.close(code=1013)  # the engine is busy or too slow, try again later
+    finally:
+        await close_session(session, websocket)
+
+
+@app.get("/hangman/spectate", response_class=HTMLResponse)
+async def hangman_spectate(request: Request):
+    return spectate_page(request, 'hangman', 'game_id')
+
+
+@app.websocket("/hangman/spectate/ws")
+async def hangman_spectate_ws(websocket: WebSocket):
+    await spectate_session(websocket, 'hangman')
 
 
 # ----- Battleship -----
@@ -93,42 +236,37 @@ async def battleship_simulation(request: Request):
     return templates.TemplateResponse("game/battleship/simulation.html", {"request": request})
 
 
+SIMULATION_RATE = 10         # frames per second a client plays back if it does not ask for a rate
+SIMULATION_MAX_RATE = 1000
+
+
 @app.websocket("/battleship/simulation/ws")
 async def battleship_simulation_ws(websocket: WebSocket):
-    await websocket.accept()
+    # the game runs at full speed, the client paces the playback:
+    # ?rate=20 sends 20 frames (a second of playback) per message, ?skip=1 only the final state
+    await accept(websocket)
 
-    idx_player_you = 0
+    key = str(id(websocket))
+    param_rate = websocket.query_params.get('rate', '')
+    rate = min(max(int(param_rate), 1), SIMULATION_MAX_RATE) if param_rate.isdigit() else SIMULATION_RATE
+    simulation = Simulation(battleship.Battleship(), [battleship.RandomPlayer(), battleship.RandomPlayer()])
 
     try:
-        game = battleship.Battleship()
-        player = battleship.RandomPlayer()
-
-        while True:
-
-            state = game.get_state()
-            list_action = game.get_list_action()
-            action = None
-            if len(list_action) > 0:
-                action = player.select_action(state, list_action)
-
-            dict_state = state.model_dump()
-            dict_state['idx_player_you'] = idx_player_you
-            dict_state['list_action'] = []
-            dict_state['selected_action'] = None if action is None else action.model_dump()
-            data = {'type': 'update', 'state': dict_state}
-            await websocket.send_json(data)
 
-            if state.phase == battleship.GamePhase.FINISHED:
-                break
+        if websocket.query_params.get('skip'):
+            frames = [await engine.run(key, simulation.skip)]
+            await send_message(websocket, {'type': 'frames', 'rate': rate, 'frames': frames})
 
-            data = await websocket.receive_json()
+        while not simulation.finished:
+            frames = await engine.run(key, simulation.next_batch, rate)
+            await send_message(websocket, {'type': 'frames', 'rate': rate, 'frames': frames})
 
-            if data['type'] == 'action':
-                action = battleship.BattleshipAction.model_validate(data['action'])
-                game.apply_action(action)
+        await websocket.close()
 
     except WebSocketDisconnect:
         print('DISCONNECTED')
+    except (ExecutorBusy, ExecutorTimeout):
+        await websocket.close(code=1013)  # the engine is busy or too slow, try again later
 
 
 @app.get("/battleship/singleplayer", response_class=HTMLResponse)
@@ -138,67 +276,71 @@ async def battleship_singleplayer(request: Request):
 
 @app.websocket("/battleship/singleplayer/ws")
 async def battleship_singleplayer_ws(websocket: WebSocket):
-    await websocket.accept()
+    await accept(websocket)
 
     idx_player_you = 0
+    session = await open_session(websocket, 'battleship', battleship.Battleship, lambda: {'player': battleship.DensityPlayer()})
+    encoder = DeltaEncoder()
 
     try:
 
-        game = battleship.Battleship()
-        player = battleship.RandomPlayer()
+        game = session.game
 
-        while True:
+        while session.connection is websocket:  # until resumed on another connection
 
+            await publish(session)
             state = game.get_state()
             if state.phase == battleship.GamePhase.FINISHED:
+                sessions.remove(session.game_id)
                 break
 
             #game.print_state()
 
             if state.idx_player_active == idx_player_you:
 
-                state = game.get_player_view(idx_player_you)
-                list_action = game.get_list_action()
-                dict_state = state.model_dump()
-                dict_state['idx_player_you'] = idx_player_you
-                dict_state['list_action'] = [action.model_dump() for action in list_action]
-                data = {'type': 'update', 'state': dict_state}
-                await websocket.send_json(data)
+                state, list_action = await engine_view(session.game_id, game, idx_player_you)
+                dict_state = dump_view(state, idx_player_you, list_action)
+                await send_message(websocket, encoder.encode(dict_state))
 
                 if len(list_action) == 0:
-                    game.apply_action(None)
+                    await engine_apply(session.game_id, game, None)
                 else:
-                    data = await websocket.receive_json()
+                    data = await receive_message(websocket)
+                    if session.connection is not websocket:
+                        break  # resumed on another connection
+                    sessions.touch(session)
                     if data['type'] == 'action':
                         action = battleship.BattleshipAction.model_validate(data['action'])
-                        game.apply_action(action)
+                        await engine_apply(session.game_id, game, action)
                         print(action)
+                    elif data['type'] == 'resync':
+                        encoder.reset()
 
-                state = game.get_player_view(idx_player_you)
-                dict_state = state.model_dump()
-                dict_state['idx_player_you'] = idx_player_you
-                dict_state['list_action'] = []
+                state = await engine.run(session.game_id, game.get_player_view, idx_player_you)
+                dict_state = dump_view(state, idx_player_you, [])
 
-                data = {'type': 'update', 'state': dict_state}
-                await websocket.send_json(data)
+                await send_message(websocket, encoder.encode(dict_state))
 
             else:
 
-                state = game.get_player_view(state.idx_player_active)
-                list_action = game.get_list_action()
-                action = player.select_action(state, list_action)
-                if action is not None:
-                    await asyncio.sleep(1)
-                game.apply_action(action)
-                state = game.get_player_view(idx_player_you)
-                dict_state = state.model_dump()
-                dict_state['idx_player_you'] = idx_player_you
-                dict_state['list_action'] = []
-                data = {'type': 'update', 'state': dict_state}
-                await websocket.send_json(data)
+                await play_bot(session, websocket, encoder, state.idx_player_active, idx_player_you)
 
     except WebSocketDisconnect:
         print('DISCONNECTED')
+    except (ExecutorBusy, ExecutorTimeout):
+        await websocket.close(code=1013)  # the engine is busy or too slow, try again later
+    finally:
+        await close_session(session, websocket)
+
+
+@app.get("/battleship/spectate", response_class=HTMLResponse)
+async def battleship_spectate(request: Request):
+    return spectate_page(request, 'battleship', 'game_id')
+
+
+@app.websocket("/battleship/spectate/ws")
+async def battleship_spectate_ws(websocket: WebSocket):
+    await spectate_session(websocket, 'battleship')
 
 
 # ----- UNO -----
@@ -210,7 +352,7 @@ async def uno_simulation(request: Request):
 
 @app.websocket("/uno/simulation/ws")
 async def uno_simulation_ws(websocket: WebSocket):
-    await websocket.accept()
+    await accept(websocket)
 
     try:
 
@@ -227,7 +369,7 @@ async def uno_singleplayer(request: Request):
 
 @app.websocket("/uno/singleplayer/ws")
 async def uno_singleplayer_ws(websocket: WebSocket):
-    await websocket.accept()
+    await accept(websocket)
 
     try:
 
@@ -237,103 +379,122 @@ async def uno_singleplayer_ws(websocket: WebSocket):
         print('DISCONNECTED')
 
 
-@app.websocket("/uno/random_player/ws")
-async def uno_random_player_ws(websocket: WebSocket):
-    await websocket.accept()
+UNO_PLAYERS = {
+    'random': uno.RandomPlayer,
+    'heuristic': uno.HeuristicPlayer,
+    'sampling': uno.SamplingPlayer,
+}
 
-    try:
 
-        pass
-
-    except WebSocketDisconnect:
-        print('DISCONNECTED')
+@app.get("/uno/random_player", response_class=HTMLResponse)
+async def uno_random_player(request: Request):
+    return templates.TemplateResponse("game/uno/random_player.html", {"request": request})
 
 
-# ----- Dog ----- Initial version, commented out to try Marcel's implementation
-
-
-# @app.get("/dog/simulation/", response_class=HTMLResponse)
-# async def dog_simulation(request: Request):
-#     return templates.TemplateResponse("game/dog/simulation.html", {"request": request})
+@app.websocket("/uno/random_player/ws")
+async def uno_random_player_ws(websocket: WebSocket):
+    await accept(websocket)
 
+    idx_player_you = 0
 
-# @app.websocket("/dog/simulation/ws")
-# async def dog_simulation_ws(websocket: WebSocket):
-#     await websocket.accept()
+    def new_game() -> uno.Uno:
+        # e.g. /uno/random_player/ws?player=heuristic&cnt_player=4
+        param_cnt_player = websocket.query_params.get('cnt_player', '')
+        cnt_player = min(max(int(param_cnt_player), uno.CNT_PLAYER_MIN), uno.CNT_PLAYER_MAX) if param_cnt_player.isdigit() else 2
+        game = uno.Uno()
+        game.set_state(uno.GameState(cnt_player=cnt_player))
+        return game
 
-#     try:
+    def new_context() -> Dict[str, Any]:
+        return {'player': UNO_PLAYERS.get(websocket.query_params.get('player', 'sampling'), uno.SamplingPlayer)()}
 
-#         pass
+    session = await open_session(websocket, 'uno', new_game, new_context)
+    encoder = DeltaEncoder()
 
-#     except WebSocketDisconnect:
-#         print('DISCONNECTED')
+    try:
 
+        game = session.game
 
-# @app.get("/dog/singleplayer", response_class=HTMLResponse)
-# async def dog_singleplayer(request: Request):
-#     return templates.TemplateResponse("game/dog/singleplayer.html", {"request": request})
+        while session.connection is websocket:  # until resumed on another connection
 
+            await publish(session)
+            state = game.get_state()
 
-# @app.websocket("/dog/singleplayer/ws")
-# async def dog_singleplayer_ws(websocket: WebSocket):
-#     await websocket.accept()
+            if state.phase == uno.GamePhase.FINISHED or state.idx_player_active == idx_player_you:
 
-#     try:
+                state, list_action = await engine_view(session.game_id, game, idx_player_you)
+                dict_state = dump_view(state, idx_player_you, list_action)
+                await send_message(websocket, encoder.encode(dict_state))
 
-#         pass
+                if state.phase == uno.GamePhase.FINISHED:
+                    sessions.remove(session.game_id)
+                    break
 
-#     except WebSocketDisconnect:
-#         print('DISCONNECTED')
+                data = await receive_message(websocket)
+                if session.connection is not websocket:
+                    break  # resumed on another connection
+                sessions.touch(session)
+                if data['type'] == 'action':
+                    action = uno.Action.model_validate(data['action'])
+                    if action in list_action:
+                        await engine_apply(session.game_id, game, action)
+                elif data['type'] == 'resync':
+                    encoder.reset()
 
+            else:
 
-# @app.websocket("/dog/random_player/ws")
-# async def dog_random_player_ws(websocket: WebSocket):
-#     await websocket.accept()
+                await play_bot(session, websocket, encoder, state.idx_player_active, idx_player_you)
 
-#     try:
+    except WebSocketDisconnect:
+        print('DISCONNECTED')
+    except (ExecutorBusy, ExecutorTimeout):
+        await websocket.close(code=1013)  # the engine is busy or too slow, try again later
+    finally:
+        await close_session(session, websocket)
 
-#         pass
 
-#     except WebSocketDisconnect:
-#         print('DISCONNECTED')
+@app.get("/uno/spectate", response_class=HTMLResponse)
+async def uno_spectate(request: Request):
+    return spectate_page(request, 'uno', 'game_id')
 
 
+@app.websocket("/uno/spectate/ws")
+async def uno_spectate_ws(websocket: WebSocket):
+    await spectate_session(websocket, 'uno')
 
 
-# ----- Dog ----- Marcel's Dog --  Should should be redone, because even for uno it shows something and for dog — nothing
+# ----- Dog -----
 
+# seats without a client are played by bots, a client joining takes over a bot's seat
+dog_rooms = RoomRegistry()
+DOG_BOT_DELAY = float(os.environ.get('DOG_BOT_DELAY', 0.5))
+DOG_TURN_TIMEOUT = float(os.environ.get('DOG_TURN_TIMEOUT', 120))
 
-@app.get("/dog/simulation/", response_class=HTMLResponse)
-async def dog_simulation(request: Request):
-    return templates.TemplateResponse("game/dog/simulation.html", {"request": request})
 
+def new_dog_room() -> GameRoom:
+    return dog_rooms.create('dog', dog.Dog(), [dog.RandomPlayer() for _ in range(4)], engine=engine, bot_executor=bots,
+                            bot_delay=DOG_BOT_DELAY, turn_timeout=DOG_TURN_TIMEOUT)
 
-@app.websocket("/dog/simulation/ws")
-async def dog_simulation_ws(websocket: WebSocket):
-    await websocket.accept()
 
+async def play_in_room(websocket: WebSocket, room: GameRoom, idx_seat: Optional[int]) -> None:
+    joined = await room.join(websocket, idx_seat)
+    if joined is None:
+        await websocket.close(code=4003)  # seat taken or room full
+        return
+    idx_seat, connection = joined
     try:
-        # Initialize or retrieve game state for simulation
-        game = dog_game.DogGame()  # Create an instance of the game
-        game_state = game.initialize_game()  # Initialize the game
-
         while True:
-            # Receive player actions (e.g., play a card, move a marble)
-            message = await websocket.receive_text()  # Receive message from client
-            action = json.loads(message)  # Deserialize JSON action
-
-            # Process the action (move a marble, play a card, etc.)
-            updated_state = game.process_action(action, game_state)
-
-            # Send updated game state back to the client
-            await websocket.send_text(json.dumps(updated_state))  # Send updated state
-
-            if game.check_game_over(updated_state):
-                break  # End the game if a player has won
-
+            data = await receive_message(websocket)
+            if data['type'] == 'action' and data.get('action') is not None:
+                room.submit(idx_seat, dog.Action.model_validate(data['action']))
+            elif data['type'] == 'resync':
+                await room.resync(idx_seat, connection)
     except WebSocketDisconnect:
         print('DISCONNECTED')
-
+    finally:
+        room.leave(idx_seat, connection)
+        if room.finished and not room.is_attended():
+            dog_rooms.remove(room.room_id)
 
 
 @app.get("/dog/singleplayer", response_class=HTMLResponse)
@@ -341,57 +502,49 @@ async def dog_singleplayer(request: Request):
     return templates.TemplateResponse("game/dog/singleplayer.html", {"request": request})
 
 
-@app.websocket("/dog/singleplayer/ws")
-async def dog_singleplayer_ws(websocket: WebSocket):
-    await websocket.accept()
-
-    try:
-        # Initialize the game for singleplayer mode
-        game = dog_game.DogGame()
-        game_state = game.initialize_singleplayer_game()  # Initialize for single player
-
-        while True:
-            # Receive player's move (e.g., move a marble, play a card)
-            message = await websocket.receive_text()
-            action = json.loads(message)  # Deserialize action
-
-            # Process the player's action (move a marble or play a card)
-            updated_game_state = game.process_singleplayer_action(action, game_state)
-
-            # Send the updated game state to the client
-            await websocket.send_text(json.dumps(updated_game_state))
-
-            if game.check_game_over(updated_game_state):
-                break  # End the game if player has finished
-
-    except WebSocketDisconnect:
-        print('DISCONNECTED')
-
+@app.get("/dog/room", response_class=HTMLResponse)
+async def dog_room(request: Request):
+    return templates.TemplateResponse("game/dog/room.html", {"request": request})
 
 
-@app.websocket("/dog/random_player/ws")
-async def dog_random_player_ws(websocket: WebSocket):
-    await websocket.accept()
-
+@app.websocket("/dog/room/ws")
+async def dog_room_ws(websocket: WebSocket):
+    # /dog/room/ws starts a new room, ?room_id=...&seat=... joins (or rejoins) one
+    await accept(websocket)
     try:
-        # Initialize the game and set up the random player
-        game = dog_game.DogGame()
-        game_state = game.initialize_singleplayer_game()
-        random_player = RandomPlayer()  # Assume you have a RandomPlayer class
-
-        while True:
-            # Random player selects an action
-            action = random_player.select_action(game_state, game.get_possible_actions(game_state))
-
-            # Process the action selected by the random player
-            updated_game_state = game.process_action(action, game_state)
-
-            # Send the updated state back to the client
-            await websocket.send_text(json.dumps(updated_game_state))
+        room = dog_rooms.get(websocket.query_params.get('room_id'), 'dog') or new_dog_room()
+        seat = websocket.query_params.get('seat', '')
+        await play_in_room(websocket, room, int(seat) if seat.isdigit() else None)
+    except (ExecutorBusy, ExecutorTimeout):
+        await websocket.close(code=1013)  # the engine is busy or too slow, try again later
+
+
+@app.get("/dog/spectate", response_class=HTMLResponse)
+async def dog_spectate(request: Request):
+    return spectate_page(request, 'dog', 'room_id')
+
+
+@app.websocket("/dog/spectate/ws")
+async def dog_spectate_ws(websocket: WebSocket):
+    # /dog/spectate/ws?room_id=... watches a room, any number of spectators per room
+    await accept(websocket)
+    room = dog_rooms.get(websocket.query_params.get('room_id'), 'dog')
+    if room is None:
+        await websocket.close(code=4004)  # unknown or finished room
+        return
+    try:
+        spectator = await room.watch(websocket)
+    except (ExecutorBusy, ExecutorTimeout):
+        await websocket.close(code=1013)  # the engine is busy or too slow, try again later
+        return
+    try:
+        await follow(websocket, room.spectators, spectator)
+    finally:
+        room.unwatch(spectator)
+        if room.finished and not room.is_attended():
+            dog_rooms.remove(room.room_id)
 
-            # End the game if the game over condition is met
-            if game.check_game_over(updated_game_state):
-                break
 
-    except WebSocketDisconnect:
-        print('DISCONNECTED')
+@app.websocket("/dog/singleplayer/ws")
+async def dog_singleplayer_ws(websocket: WebSocket):
+    await dog_room_ws(websocket)
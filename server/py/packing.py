@@ -0,0 +1,200 @@
+"""
+MessagePack (https://msgpack.org) encoding of websocket messages, for clients that negotiate the
+'msgpack' subprotocol.
+
+Messages are JSON-like values (dicts, lists, str, int, float, bool, None), so only that part of the
+format is written here, plus bin for bytes; there are no extension types. Any MessagePack library
+reads what pack() writes, and unpack() reads everything such a library writes for these values.
+
+Short strings, mostly the same few dict keys and enum values in every message, are encoded once and
+kept in a bounded cache.
+
+unpack() reads what clients send, so it rejects arrays and maps nested deeper than MAX_DEPTH with
+UnpackError instead of running into the recursion limit.
+"""
+from typing import Any, Callable, Dict, Sequence, Tuple
+import struct
+
+STR_CACHE_MAX_LENGTH = 32
+STR_CACHE_SIZE = 4096
+MAX_DEPTH = 32  # messages are a handful of levels deep
+
+_STR_CACHE: Dict[str, bytes] = {}
+
+
+class UnpackError(ValueError):
+    pass
+
+
+def pack(obj: Any) -> bytes:
+    out = bytearray()
+    _pack(obj, out)
+    return bytes(out)
+
+
+def _pack_header(out: bytearray, size: int, fix: int, fix_max: int, codes: Tuple[int, int, int]) -> None:
+    if size <= fix_max:
+        out.append(fix | size)
+    elif size <= 0xff and codes[0]:
+        out += struct.pack('>BB', codes[0], size)
+    elif size <= 0xffff:
+        out += struct.pack('>BH', codes[1], size)
+    else:
+        out += struct.pack('>BI', codes[2], size)
+
+
+def _pack_str(obj: str, out: bytearray) -> None:
+    packed = _STR_CACHE.get(obj)
+    if packed is None:
+        data = obj.encode()
+        header = bytearray()
+        _pack_header(header, len(data), 0xa0, 31, (0xd9, 0xda, 0xdb))
+        packed = bytes(header) + data
+        if len(obj) <= STR_CACHE_MAX_LENGTH and len(_STR_CACHE) < STR_CACHE_SIZE:
+            _STR_CACHE[obj] = packed
+    out += packed
+
+
+def _pack_int(obj: int, out: bytearray) -> None:
+    if 0 <= obj <= 0x7f:
+        out.append(obj)
+    elif -32 <= obj < 0:
+        out.append(obj & 0xff)
+    elif obj > 0:
+        for code, fmt, limit in ((0xcc, '>BB', 0xff), (0xcd, '>BH', 0xffff), (0xce, '>BI', 0xffffffff), (0xcf, '>BQ', 0xffffffffffffffff)):
+            if obj <= limit:
+                out += struct.pack(fmt, code, obj)
+                return
+        raise OverflowError(f"{obj} does not fit into 64 bits")
+    else:
+        for code, fmt, limit in ((0xd0, '>Bb', 0x80), (0xd1, '>Bh', 0x8000), (0xd2, '>Bi', 0x80000000), (0xd3, '>Bq', 0x8000000000000000)):
+            if -obj <= limit:
+                out += struct.pack(fmt, code, obj)
+                return
+        raise OverflowError(f"{obj} does not fit into 64 bits")
+
+
+def _pack_none(obj: None, out: bytearray) -> None:  # pylint: disable = unused-argument
+    out.append(0xc0)
+
+
+def _pack_bool(obj: bool, out: bytearray) -> None:
+    out.append(0xc3 if obj else 0xc2)
+
+
+def _pack_float(obj: float, out: bytearray) -> None:
+    out += struct.pack('>Bd', 0xcb, obj)
+
+
+def _pack_bin(obj: bytes, out: bytearray) -> None:
+    _pack_header(out, len(obj), 0, -1, (0xc4, 0xc5, 0xc6))
+    out += obj
+
+
+def _pack_dict(obj: Dict[Any, Any], out: bytearray) -> None:
+    _pack_header(out, len(obj), 0x80, 15, (0, 0xde, 0xdf))
+    for key, value in obj.items():
+        packed = _STR_CACHE.get(key)  # the keys are mostly the same few strings
+        if packed is None:
+            _pack(key, out)
+        else:
+            out += packed
+        _PACKERS.get(type(value), _pack)(value, out)
+
+
+def _pack_list(obj: Sequence[Any], out: bytearray) -> None:
+    _pack_header(out, len(obj), 0x90, 15, (0, 0xdc, 0xdd))
+    for item in obj:
+        _PACKERS.get(type(item), _pack)(item, out)
+
+
+# exact type: packer, so packing a value is one dict lookup instead of a chain of isinstance checks
+_PACKERS: Dict[type, Callable[[Any, bytearray], None]] = {
+    str: _pack_str, int: _pack_int, bool: _pack_bool, type(None): _pack_none, float: _pack_float,
+    dict: _pack_dict, list: _pack_list, tuple: _pack_list, bytes: _pack_bin, bytearray: _pack_bin,
+}
+
+
+def _pack(obj: Any, out: bytearray) -> None:
+    """ Any value, subclasses (str enums, ...) included """
+    packer = _PACKERS.get(type(obj))
+    if packer is None:
+        for cls in (bool, str, int, float, dict, list, tuple, bytes, bytearray):
+            if isinstance(obj, cls):
+                packer = _PACKERS[cls]
+                break
+        else:
+            raise TypeError(f"Cannot pack {type(obj).__name__}")
+    packer(obj, out)
+
+
+def unpack(data: bytes) -> Any:
+    try:
+        obj, pos = _unpack(memoryview(data), 0, 0)
+    except (IndexError, TypeError, struct.error, UnicodeDecodeError) as error:
+        raise UnpackError(f"Truncated or invalid MessagePack data: {error}") from error
+    if pos != len(data):
+        raise UnpackError(f"{len(data) - pos} bytes after the packed value")
+    return obj
+
+
+# code: (struct format, size) of the fixed size values
+_FIXED = {
+    0xca: ('>f', 4), 0xcb: ('>d', 8),
+    0xcc: ('>B', 1), 0xcd: ('>H', 2), 0xce: ('>I', 4), 0xcf: ('>Q', 8),
+    0xd0: ('>b', 1), 0xd1: ('>h', 2), 0xd2: ('>i', 4), 0xd3: ('>q', 8),
+}
+# code: (kind, struct format of the length, its size)
+_SIZED = {
+    0xc4: ('bin', '>B', 1), 0xc5: ('bin', '>H', 2), 0xc6: ('bin', '>I', 4),
+    0xd9: ('str', '>B', 1), 0xda: ('str', '>H', 2), 0xdb: ('str', '>I', 4),
+    0xdc: ('array', '>H', 2), 0xdd: ('array', '>I', 4),
+    0xde: ('map', '>H', 2), 0xdf: ('map', '>I', 4),
+}
+
+
+def _unpack(data: memoryview, pos: int, depth: int) -> Tuple[Any, int]:  # pylint: disable = too-many-return-statements
+    code = data[pos]
+    pos += 1
+    if code <= 0x7f:
+        return code, pos
+    if code >= 0xe0:
+        return code - 0x100, pos
+    if 0xa0 <= code <= 0xbf:
+        return _unpack_sized('str', code & 0x1f, data, pos, depth)
+    if 0x90 <= code <= 0x9f:
+        return _unpack_sized('array', code & 0x0f, data, pos, depth)
+    if 0x80 <= code <= 0x8f:
+        return _unpack_sized('map', code & 0x0f, data, pos, depth)
+    if code == 0xc0:
+        return None, pos
+    if code in (0xc2, 0xc3):
+        return code == 0xc3, pos
+    if code in _FIXED:
+        fmt, size = _FIXED[code]
+        return struct.unpack_from(fmt, data, pos)[0], pos + size
+    if code in _SIZED:
+        kind, fmt, size = _SIZED[code]
+        return _unpack_sized(kind, struct.unpack_from(fmt, data, pos)[0], data, pos + size, depth)
+    raise UnpackError(f"Unsupported MessagePack type 0x{code:02x}")
+
+
+def _unpack_sized(kind: str, size: int, data: memoryview, pos: int, depth: int) -> Tuple[Any, int]:
+    if kind in ('str', 'bin'):
+        if pos + size > len(data):
+            raise IndexError("string out of range")
+        chunk = data[pos:pos + size]
+        return (str(chunk, 'utf-8') if kind == 'str' else bytes(chunk)), pos + size
+    if depth >= MAX_DEPTH:
+        raise UnpackError(f"Arrays and maps nested deeper than {MAX_DEPTH} levels")
+    if kind == 'array':
+        items = []
+        for _ in range(size):
+            item, pos = _unpack(data, pos, depth + 1)
+            items.append(item)
+        return items, pos
+    result = {}
+    for _ in range(size):
+        key, pos = _unpack(data, pos, depth + 1)
+        result[key], pos = _unpack(data, pos, depth + 1)
+    return result, pos
@@ -0,0 +1,371 @@
+"""
+Game rooms: several websocket clients play one game, each in its own seat.
+
+A GameRoom owns a game and one seat per player. A seat without a connection is played by its bot,
+so a room runs with any mix of humans and bots, and a human can take over a bot's seat (or hand it
+back by leaving) while the game runs. The room task drives the game: it pushes every connected
+seat its own masked view, gets the active seat's action (from the bot, or from the client, with
+the bot stepping in if the client leaves or does not answer within `turn_timeout`) and applies it.
+
+Pushing a view never waits for a client. Every connection has its own sender task and a queue of
+at most `max_queue` messages; when a slow client's queue is full, the queued messages are dropped
+and the next state goes out as a snapshot (its delta encoder is reset), so the client jumps to the
+latest state instead of replaying every move. A laggy player only delays themselves.
+
+Spectators watch a room through its SpectatorHub, which gets the public view once per move. A room
+with spectators keeps running even if all its seats are played by bots.
+
+A room whose engine fails (an engine call raises or times out) cannot go on: it ends and closes its
+players and spectators with 1011.
+
+Rooms without players or spectators pause and are evicted after `ttl` seconds, finished rooms as
+soon as their last client left, the same way SessionRegistry treats single player games. A room
+tells its registry when its last client left or a first one came, so the registry keeps the rooms
+nobody is in by last access and eviction stops at the first one that stays.
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar, Union
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import asyncio
+import random
+import secrets
+import time
+
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+from server.py.game import Game, Player
+from server.py.delta import DeltaEncoder
+from server.py.executor import EngineExecutor, ExecutorBusy, ExecutorTimeout
+from server.py.serialize import dump_view, send_message
+from server.py.spectators import Spectator, SpectatorHub, dump_public_view
+
+T = TypeVar('T')
+
+MAX_QUEUE = 32
+ROOM_TTL = 30 * 60
+MAX_ROOMS = 10000
+BUSY_RETRY = 0.1
+CLOSE_FAILED = 1011
+
+
+class Connection:
+    """ The websocket of one seat and the queue of messages its sender task still has to send """
+
+    def __init__(self, websocket: WebSocket, max_queue: int = MAX_QUEUE) -> None:
+        self.websocket = websocket
+        self.max_queue = max_queue
+        self.encoder = DeltaEncoder()
+        self.queue: 'asyncio.Queue[Union[Dict[str, Any], int]]' = asyncio.Queue()  # a close code ends the queue
+        self.cnt_dropped = 0
+        self.task = asyncio.create_task(self._send_loop())
+
+    def push(self, message: Dict[str, Any]) -> None:
+        self.queue.put_nowait(message)
+
+    def push_state(self, dict_state: Dict[str, Any]) -> None:
+        if self.queue.qsize() >= self.max_queue:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+                self.cnt_dropped += 1
+            self.encoder.reset()
+        self.push(self.encoder.encode(dict_state))
+
+    def finish(self, code: int = 1000) -> None:
+        """ Close the websocket once everything queued so far is sent """
+        self.queue.put_nowait(code)
+
+    def close(self) -> None:
+        self.task.cancel()
+
+    async def _send_loop(self) -> None:
+        try:
+            while True:
+                message = await self.queue.get()
+                if isinstance(message, int):
+                    await self.websocket.close(code=message)
+                    return
+                await send_message(self.websocket, message)
+        except (WebSocketDisconnect, RuntimeError, OSError):
+            pass  # the client is gone, its receiving side cleans up
+
+
+@dataclass
+class Seat:
+    bot: Player
+    connection: Optional[Connection] = None
+
+
+class GameRoom:  # pylint: disable = too-many-instance-attributes
+
+    def __init__(self, room_id: str, kind: str, game: Game, bots: List[Player],  # pylint: disable = too-many-arguments
+                 engine: Optional[EngineExecutor] = None, bot_executor: Optional[EngineExecutor] = None,
+                 bot_delay: float = 0.0, turn_timeout: Optional[float] = None, max_queue: int = MAX_QUEUE,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self.room_id = room_id
+        self.kind = kind
+        self.game = game
+        self.seats = [Seat(bot) for bot in bots]
+        self.engine = engine
+        self.bot_executor = bot_executor
+        self.bot_delay = bot_delay
+        self.turn_timeout = turn_timeout
+        self.max_queue = max_queue
+        self.clock = clock
+        self.last_access = clock()
+        self.on_access: Optional[Callable[['GameRoom'], None]] = None  # RoomRegistry.touch_room
+        self.idx_active: Optional[int] = None
+        self.list_action: List[Any] = []
+        self.pending: Optional['asyncio.Future[Any]'] = None  # the action the active human is asked for
+        self.spectators = SpectatorHub()
+        self.attended = asyncio.Event()
+        self.finished = False
+        self.close_code = 1000  # CLOSE_FAILED once the engine failed
+        self.cnt_move = 0
+        self.task: Optional['asyncio.Task[None]'] = None
+
+    def start(self) -> None:
+        self.task = asyncio.create_task(self.run())
+
+    def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+        for seat in self.seats:
+            if seat.connection is not None:
+                seat.connection.close()
+        self.spectators.close()
+
+    def is_attended(self) -> bool:
+        return any(seat.connection is not None for seat in self.seats) or len(self.spectators) > 0
+
+    async def call(self, fn: Callable[..., T], *args: Any) -> T:
+        """ fn(*args) on the room's engine worker, so game calls never overlap """
+        if self.engine is None:
+            return fn(*args)
+        return await self.engine.run(self.room_id, fn, *args)
+
+    def prepare_turn(self) -> Tuple[int, List[Any], bool]:
+        state = self.game.get_state()
+        if state.phase == 'finished':
+            return state.idx_player_active, [], True
+        return state.idx_player_active, self.game.get_list_action(), False
+
+    def dump_views(self, list_idx_seat: List[int]) -> List[Dict[str, Any]]:
+        return [dump_view(self.game.get_player_view(idx), idx, self.list_action if idx == self.idx_active else [])
+                for idx in list_idx_seat]
+
+    async def broadcast(self) -> None:
+        list_idx_seat = [idx for idx, seat in enumerate(self.seats) if seat.connection is not None]
+        if list_idx_seat:
+            list_dict_state = await self.call(self.dump_views, list_idx_seat)
+            for idx, dict_state in zip(list_idx_seat, list_dict_state):
+                connection = self.seats[idx].connection
+                if connection is not None:
+                    connection.push_state(dict_state)
+        if len(self.spectators) > 0:
+            self.spectators.publish(await self.call(dump_public_view, self.game))
+
+    async def run(self) -> None:
+        try:
+            while not self.finished:
+                await self.attended.wait()
+                try:
+                    await self.step()
+                except ExecutorBusy:
+                    await asyncio.sleep(BUSY_RETRY)
+            await self.broadcast()
+        except Exception as error:  # pylint: disable = broad-exception-caught
+            print(f'Room {self.room_id} failed: {error!r}')
+            self.finished = True
+            self.close_code = CLOSE_FAILED
+        for seat in self.seats:
+            if seat.connection is not None:
+                seat.connection.finish(self.close_code)
+        self.spectators.finish(self.close_code)
+
+    async def step(self) -> None:
+        idx_active, self.list_action, self.finished = await self.call(self.prepare_turn)
+        self.idx_active = idx_active
+        if self.finished:
+            return
+        await self.broadcast()
+        action = None
+        if self.list_action:
+            if self.seats[idx_active].connection is not None:
+                action = await self.wait_for_human()
+            if action is None:
+                action = await self.get_bot_action(idx_active)
+        await self.apply(action)
+        self.cnt_move += 1
+
+    async def apply(self, action: Any) -> None:
+        """ Retries only this call while the engine is busy, so the move is not chosen (or asked for) again """
+        while True:
+            try:
+                await self.call(self.game.apply_action, action)
+                return
+            except ExecutorBusy:
+                await asyncio.sleep(BUSY_RETRY)
+
+    async def wait_for_human(self) -> Any:
+        """ The client's action, None if it left or did not answer in time """
+        self.pending = asyncio.get_running_loop().create_future()
+        try:
+            return await asyncio.wait_for(self.pending, self.turn_timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            self.pending = None
+
+    async def get_bot_action(self, idx_seat: int) -> Any:
+        await asyncio.sleep(self.bot_delay)  # also lets other rooms run between bot moves
+        bot = self.seats[idx_seat].bot
+        view = await self.call(self.game.get_player_view, idx_seat)
+        if self.bot_executor is None:
+            return bot.select_action(view, self.list_action)
+        try:
+            return await self.bot_executor.select_action(self.room_id, bot, view, self.list_action)
+        except ExecutorTimeout:
+            return random.choice(self.list_action)
+
+    async def join(self, websocket: WebSocket, idx_seat: Optional[int] = None) -> Optional[Tuple[int, Connection]]:
+        """ Seat the client in idx_seat or the first seat a bot plays, None if there is none """
+        list_idx_free = [idx for idx, seat in enumerate(self.seats) if seat.connection is None]
+        if idx_seat is None and list_idx_free:
+            idx_seat = list_idx_free[0]
+        if idx_seat not in list_idx_free:
+            return None
+        connection = Connection(websocket, self.max_queue)
+        self.seats[idx_seat].connection = connection
+        self.touch()
+        connection.push({'type': 'room', 'room_id': self.room_id, 'idx_seat': idx_seat})
+        if self.finished or self.attended.is_set():
+            await self.resync(idx_seat, connection)
+        self.attended.set()
+        return idx_seat, connection
+
+    async def resync(self, idx_seat: int, connection: Connection) -> None:
+        """ Send the seat's current view as a snapshot """
+        connection.encoder.reset()
+        connection.push_state((await self.call(self.dump_views, [idx_seat]))[0])
+        if self.finished:
+            connection.finish(self.close_code)
+
+    def submit(self, idx_seat: int, action: Any) -> bool:
+        """ The client's action, ignored unless it is its turn and the action is allowed """
+        if self.pending is None or self.pending.done() or idx_seat != self.idx_active or action not in self.list_action:
+            return False
+        self.pending.set_result(action)
+        return True
+
+    def leave(self, idx_seat: int, connection: Connection) -> None:
+        seat = self.seats[idx_seat]
+        if seat.connection is not connection:
+            return
+        seat.connection = None
+        connection.close()
+        if idx_seat == self.idx_active and self.pending is not None and not self.pending.done():
+            self.pending.set_result(None)  # the bot plays this turn
+        self._check_attended()
+
+    async def watch(self, websocket: WebSocket) -> Spectator:
+        if len(self.spectators) == 0:
+            self.spectators.publish(await self.call(dump_public_view, self.game))
+        spectator = self.spectators.join(websocket)
+        self.touch()
+        self.attended.set()
+        return spectator
+
+    def unwatch(self, spectator: Spectator) -> None:
+        self.spectators.leave(spectator)
+        self._check_attended()
+
+    def _check_attended(self) -> None:
+        if not self.is_attended():
+            self.attended.clear()
+            self.touch()
+
+    def touch(self) -> None:
+        self.last_access = self.clock()
+        if self.on_access is not None:
+            self.on_access(self)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'humans': sum(seat.connection is not None for seat in self.seats),
+            'moves': self.cnt_move,
+            'dropped': sum(seat.connection.cnt_dropped for seat in self.seats if seat.connection is not None),
+            'spectators': len(self.spectators),
+        }
+
+
+@dataclass
+class RoomRegistry:  # pylint: disable = too-many-instance-attributes
+    ttl: float = ROOM_TTL
+    max_rooms: int = MAX_ROOMS
+    clock: Callable[[], float] = time.monotonic
+    rooms: Dict[str, GameRoom] = field(default_factory=dict)
+    idle: 'OrderedDict[str, GameRoom]' = field(default_factory=OrderedDict)  # rooms nobody is in, least recently used first
+    cnt_created: int = 0
+    cnt_evicted: int = 0
+
+    def create(self, kind: str, game: Game, bots: List[Player], **options: Any) -> GameRoom:
+        """ A new running room, options are passed on to GameRoom """
+        self.evict()
+        room_id = secrets.token_urlsafe(12)
+        room = GameRoom(room_id, kind, game, bots, clock=self.clock, **options)
+        self.rooms[room_id] = room
+        self.idle[room_id] = room
+        room.on_access = self.touch_room
+        self.cnt_created += 1
+        room.start()
+        return room
+
+    def get(self, room_id: Optional[str], kind: str) -> Optional[GameRoom]:
+        self.evict()
+        room = self.rooms.get(room_id) if room_id else None
+        if room is not None and room.finished and not room.is_attended():
+            self.remove(room.room_id)  # its last client left
+            self.cnt_evicted += 1
+            return None
+        if room is None or room.kind != kind:
+            return None
+        return room
+
+    def touch_room(self, room: GameRoom) -> None:
+        """ The room was joined or left: only rooms nobody is in wait for eviction, in order of last access """
+        if room.room_id not in self.rooms:
+            return
+        if room.is_attended():
+            self.idle.pop(room.room_id, None)
+        else:
+            self.idle[room.room_id] = room
+            self.idle.move_to_end(room.room_id)
+
+    def remove(self, room_id: str) -> None:
+        self.idle.pop(room_id, None)
+        room = self.rooms.pop(room_id, None)
+        if room is not None:
+            room.stop()
+
+    def evict(self) -> int:
+        """ Drop the rooms nobody is in that expired, and the least recently used ones over max_rooms """
+        cnt_before = len(self.rooms)
+        deadline = self.clock() - self.ttl
+        while self.idle:
+            room = next(iter(self.idle.values()))
+            if room.last_access > deadline and len(self.rooms) <= self.max_rooms:
+                break  # the rest was used more recently
+            self.remove(room.room_id)
+        cnt_evicted = cnt_before - len(self.rooms)
+        self.cnt_evicted += cnt_evicted
+        return cnt_evicted
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'live': len(self.rooms),
+            'attended': sum(room.is_attended() for room in self.rooms.values()),
+            'humans': sum(room.stats()['humans'] for room in self.rooms.values()),
+            'spectators': sum(len(room.spectators) for room in self.rooms.values()),
+            'created': self.cnt_created,
+            'evicted': self.cnt_evicted,
+        }
@@ -0,0 +1,119 @@
+"""
+Serialization of the state messages sent over the game websockets.
+
+States and actions are dumped with mode='json', so enums become plain strings: pydantic_core renders
+such dicts to JSON several times faster than the stdlib json used by WebSocket.send_json, which
+send_message replaces. Action lists go through one cached TypeAdapter per action class instead of a
+model_dump per action.
+
+Clients that open the websocket with the 'msgpack' subprotocol get MessagePack binary frames
+(server/py/packing.py) and send their actions the same way; JSON text frames stay the default.
+A client message that cannot be decoded, or is not an object with a 'type', closes the websocket
+with 1007 (invalid payload data).
+
+Fields named in capitals (LIST_CARD, LIST_COLOR, CNT_HAND_CARDS, ...) are game constants: they are
+dumped from the first state of a class and the same objects are put into every message, which also
+lets the delta encoder skip them by identity.
+"""
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Type, Union
+from functools import lru_cache
+import json
+
+import pydantic_core
+from pydantic import BaseModel, TypeAdapter
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+from server.py.packing import pack, unpack
+
+SUBPROTOCOL_MSGPACK = 'msgpack'
+CLOSE_INVALID = 1007
+
+
+@lru_cache(maxsize=None)
+def get_constant_fields(cls: Type[BaseModel]) -> FrozenSet[str]:
+    return frozenset(name for name in cls.model_fields if name.isupper())
+
+
+_CONSTANTS: Dict[Type[BaseModel], Dict[str, Any]] = {}
+
+
+def get_constants(state: BaseModel) -> Dict[str, Any]:
+    """ The dumped constant fields of the state's class, shared by all messages, do not modify """
+    cls = type(state)
+    if cls not in _CONSTANTS:
+        _CONSTANTS[cls] = state.model_dump(mode='json', include=set(get_constant_fields(cls)))
+    return _CONSTANTS[cls]
+
+
+@lru_cache(maxsize=None)
+def get_action_adapter(cls: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[cls])  # type: ignore[valid-type]
+
+
+def dump_actions(list_action: Sequence[BaseModel]) -> List[Dict[str, Any]]:
+    if len(list_action) == 0:
+        return []
+    actions: List[Dict[str, Any]] = get_action_adapter(type(list_action[0])).dump_python(list_action, mode='json')
+    return actions
+
+
+def dump_state(state: BaseModel) -> Dict[str, Any]:
+    constants = get_constant_fields(type(state))
+    if not constants:
+        return state.model_dump(mode='json')
+    dict_state = get_constants(state).copy()
+    dict_state.update(state.model_dump(mode='json', exclude=set(constants)))
+    return dict_state
+
+
+def dump_view(state: BaseModel, idx_player_you: int, list_action: Sequence[BaseModel]) -> Dict[str, Any]:
+    """ The 'state' of an update message: player view, the receiving seat and its actions """
+    dict_state = dump_state(state)
+    dict_state['idx_player_you'] = idx_player_you
+    dict_state['list_action'] = dump_actions(list_action)
+    return dict_state
+
+
+def to_text(message: Any) -> str:
+    return pydantic_core.to_json(message).decode()
+
+
+def get_subprotocol(websocket: WebSocket) -> Optional[str]:
+    """ The subprotocol the server picks from the ones the client offered, None for JSON """
+    return SUBPROTOCOL_MSGPACK if SUBPROTOCOL_MSGPACK in websocket.scope.get('subprotocols', ()) else None
+
+
+async def accept(websocket: WebSocket) -> None:
+    await websocket.accept(subprotocol=get_subprotocol(websocket))
+
+
+def render(message: Any, subprotocol: Optional[str]) -> Union[str, bytes]:
+    """ The frame of message for a websocket of this subprotocol """
+    return pack(message) if subprotocol == SUBPROTOCOL_MSGPACK else to_text(message)
+
+
+async def send_frame(websocket: WebSocket, frame: Union[str, bytes]) -> None:
+    if isinstance(frame, bytes):
+        await websocket.send_bytes(frame)
+    else:
+        await websocket.send_text(frame)
+
+
+async def send_message(websocket: WebSocket, message: Any) -> None:
+    await send_frame(websocket, render(message, get_subprotocol(websocket)))
+
+
+async def receive_message(websocket: WebSocket) -> Dict[str, Any]:
+    """ The next message of the client, as text (JSON) or binary (MessagePack) frame.
+    Raises WebSocketDisconnect once the client left or was closed for sending garbage """
+    message = await websocket.receive()
+    if message['type'] == 'websocket.disconnect':
+        raise WebSocketDisconnect(message.get('code', 1000), message.get('reason'))
+    try:
+        data = unpack(message['bytes']) if message.get('bytes') is not None else json.loads(message['text'])
+    except (ValueError, RecursionError):  # UnpackError and JSONDecodeError are ValueErrors
+        data = None
+    if not isinstance(data, dict) or 'type' not in data:
+        await websocket.close(code=CLOSE_INVALID)
+        raise WebSocketDisconnect(CLOSE_INVALID, 'invalid message')
+    return data
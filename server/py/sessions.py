@@ -0,0 +1,136 @@
+"""
+Registry of running websocket games, so a client that reconnects with its game id resumes its game.
+
+Sessions are kept in least-recently-used order. Idle sessions (no connection attached) are evicted
+when they were not used for `ttl` seconds, and the least recently used idle ones go first when there
+are more than `max_sessions` or their serialized states add up to more than `max_bytes`.
+Eviction runs on every create/resume, so there is no background task to manage.
+"""
+from typing import Any, Callable, Dict, Optional
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import secrets
+import time
+
+from server.py.game import Game
+from server.py.spectators import SpectatorHub
+
+SESSION_TTL = 30 * 60
+MAX_SESSIONS = 10000
+MAX_BYTES = 256 * 1024 * 1024
+
+
+@dataclass
+class GameSession:
+    game_id: str
+    kind: str                   # e.g. 'battleship', a game id only resumes a session of its kind
+    game: Game
+    context: Dict[str, Any]     # bots and anything else the endpoint keeps between connections
+    last_access: float
+    connection: Any = None      # the websocket currently playing this session
+    cnt_connection: int = 0
+    size: int = 0               # bytes of the serialized state, measured when the last connection left
+    spectators: SpectatorHub = field(default_factory=SpectatorHub)
+
+    def is_attached(self) -> bool:
+        return self.cnt_connection > 0
+
+
+def get_state_size(session: GameSession) -> int:
+    return len(session.game.get_state().model_dump_json())
+
+
+@dataclass
+class SessionRegistry:
+    ttl: float = SESSION_TTL
+    max_sessions: int = MAX_SESSIONS
+    max_bytes: int = MAX_BYTES
+    clock: Callable[[], float] = time.monotonic
+    sessions: 'OrderedDict[str, GameSession]' = field(default_factory=OrderedDict)
+    cnt_bytes: int = 0
+    cnt_created: int = 0
+    cnt_resumed: int = 0
+    cnt_evicted: int = 0
+
+    def create(self, kind: str, game: Game, **context: Any) -> GameSession:
+        self.evict()
+        game_id = secrets.token_urlsafe(12)
+        session = GameSession(game_id, kind, game, context, self.clock())
+        self.sessions[game_id] = session
+        self.cnt_created += 1
+        return session
+
+    def resume(self, game_id: Optional[str], kind: str) -> Optional[GameSession]:
+        """ The session of this kind, None if unknown or already evicted """
+        self.evict()
+        session = self.sessions.get(game_id) if game_id else None
+        if session is None or session.kind != kind:
+            return None
+        self.touch(session)
+        self.cnt_resumed += 1
+        return session
+
+    def get(self, game_id: Optional[str], kind: str) -> Optional[GameSession]:
+        """ The session of this kind to watch, without counting it as used """
+        session = self.sessions.get(game_id) if game_id else None
+        return session if session is not None and session.kind == kind else None
+
+    def touch(self, session: GameSession) -> None:
+        session.last_access = self.clock()
+        self.sessions.move_to_end(session.game_id)
+
+    def attach(self, session: GameSession, connection: Any) -> Any:
+        """ Returns the connection that played the session so far, it should be closed """
+        previous = session.connection
+        session.connection = connection
+        session.cnt_connection += 1
+        self.cnt_bytes -= session.size
+        session.size = 0
+        self.touch(session)
+        return previous
+
+    def detach(self, session: GameSession, connection: Any, size: Optional[int] = None) -> None:
+        """ size: get_state_size(session), if the caller measured it where no engine call changes the game meanwhile """
+        session.cnt_connection -= 1
+        if session.connection is connection:
+            session.connection = None
+        if session.game_id in self.sessions and not session.is_attached():
+            session.size = get_state_size(session) if size is None else size
+            self.cnt_bytes += session.size
+            self.touch(session)
+
+    def remove(self, game_id: str) -> None:
+        session = self.sessions.pop(game_id, None)
+        if session is not None:
+            self.cnt_bytes -= session.size
+            session.spectators.finish()
+
+    def evict(self) -> int:
+        """ Drop expired and, over the limits, least recently used idle sessions """
+        cnt_before = len(self.sessions)
+        deadline = self.clock() - self.ttl
+        for session in list(self.sessions.values()):
+            if session.last_access > deadline:
+                break  # the rest was used more recently
+            if not session.is_attached():
+                self.remove(session.game_id)
+        if len(self.sessions) > self.max_sessions or self.cnt_bytes > self.max_bytes:
+            for session in list(self.sessions.values()):
+                if len(self.sessions) <= self.max_sessions and self.cnt_bytes <= self.max_bytes:
+                    break
+                if not session.is_attached():
+                    self.remove(session.game_id)
+        cnt_evicted = cnt_before - len(self.sessions)
+        self.cnt_evicted += cnt_evicted
+        return cnt_evicted
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'live': len(self.sessions),
+            'attached': sum(session.is_attached() for session in self.sessions.values()),
+            'bytes': self.cnt_bytes,
+            'created': self.cnt_created,
+            'resumed': self.cnt_resumed,
+            'evicted': self.cnt_evicted,
+            'spectators': sum(len(session.spectators) for session in self.sessions.values()),
+        }
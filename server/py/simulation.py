@@ -0,0 +1,68 @@
+"""
+Fast-forward simulations: the server plays a whole game of bots at full speed and streams the states
+in batches, the client plays them back at its own pace.
+
+A frame is the complete state before a move, with the move as 'selected_action' so the client can
+animate it; the last frame is the final state. Frames go through a DeltaEncoder, so after the first
+one a frame is a patch. skip() plays to the end without dumping the states in between, for clients
+that only want the result.
+"""
+from typing import Any, Dict, List
+
+from server.py.game import Game, Player
+from server.py.delta import DeltaEncoder
+from server.py.serialize import dump_view
+
+MAX_FRAMES = 10000  # a game that does not finish is cut off
+
+
+class Simulation:
+
+    def __init__(self, game: Game, players: List[Player], idx_player_you: int = 0, max_frames: int = MAX_FRAMES) -> None:
+        self.game = game
+        self.players = players
+        self.idx_player_you = idx_player_you
+        self.max_frames = max_frames
+        self.encoder = DeltaEncoder()
+        self.cnt_frame = 0
+        self.finished = False
+
+    def select_action(self) -> Any:
+        """ The active bot's move, None once the game is over (or stuck) """
+        state = self.game.get_state()
+        if state.phase == 'finished' or self.cnt_frame >= self.max_frames - 1:
+            return None
+        list_action = self.game.get_list_action()
+        if len(list_action) == 0:
+            return None
+        return self.players[state.idx_player_active].select_action(state, list_action)
+
+    def next_frame(self) -> Dict[str, Any]:
+        """ The message of the current state and the move made from it, which is applied """
+        action = self.select_action()
+        dict_state = dump_view(self.game.get_state(), self.idx_player_you, [])
+        dict_state['selected_action'] = None if action is None else action.model_dump(mode='json')
+        self.cnt_frame += 1
+        if action is None:
+            self.finished = True
+        else:
+            self.game.apply_action(action)
+        return self.encoder.encode(dict_state)
+
+    def next_batch(self, cnt_frame: int) -> List[Dict[str, Any]]:
+        """ Up to cnt_frame messages, fewer at the end of the game """
+        frames: List[Dict[str, Any]] = []
+        while len(frames) < cnt_frame and not self.finished:
+            frames.append(self.next_frame())
+        return frames
+
+    def skip(self) -> Dict[str, Any]:
+        """ Play to the end, the message of the final state """
+        while not self.finished:
+            action = self.select_action()
+            if action is None:
+                break
+            self.game.apply_action(action)
+            self.cnt_frame += 1
+        self.encoder.reset()
+        return self.next_frame()
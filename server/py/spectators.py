@@ -0,0 +1,169 @@
+"""
+Spectators: any number of read-only websockets watching one table.
+
+The table publishes its public view (every player's hidden cards and ships masked) after a state
+change. That view is dumped once, one DeltaEncoder shared by all spectators turns it into a message,
+and the message is rendered once per wire format (JSON text, MessagePack bytes). Every spectator's
+queue gets a reference to the same frame, so nothing is dumped or serialized per spectator.
+
+A spectator that joins late or asks for a resync gets the latest state as a snapshot frame, which is
+rendered once as well and shared until the state changes.
+
+Publishing never waits for a spectator: one whose queue already holds `max_queue` frames is dropped
+and closed with 1013 (try again later); reconnecting starts over from a snapshot.
+"""
+from typing import Any, Dict, Optional, Set, Union
+import asyncio
+
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+from server.py.game import Game
+from server.py.delta import DeltaEncoder
+from server.py.serialize import dump_view, get_subprotocol, render, send_frame
+
+MAX_QUEUE = 64
+CLOSE_TOO_SLOW = 1013
+IDX_SPECTATOR = -1  # idx_player_you of spectator views, no seat
+
+Frame = Union[str, bytes]
+
+
+def dump_public_view(game: Game) -> Dict[str, Any]:
+    return dump_view(game.get_public_view(), IDX_SPECTATOR, [])
+
+
+class Frames:
+    """ One message, rendered at most once per subprotocol """
+
+    def __init__(self, message: Dict[str, Any]) -> None:
+        self.message = message
+        self.rendered: Dict[Optional[str], Frame] = {}
+
+    def get(self, subprotocol: Optional[str]) -> Frame:
+        frame = self.rendered.get(subprotocol)
+        if frame is None:
+            frame = self.rendered[subprotocol] = render(self.message, subprotocol)
+        return frame
+
+
+class Spectator:
+    """ The websocket of one spectator and the frames its sender task still has to send """
+
+    def __init__(self, websocket: WebSocket, max_queue: int = MAX_QUEUE) -> None:
+        self.websocket = websocket
+        self.subprotocol = get_subprotocol(websocket)
+        self.max_queue = max_queue
+        self.queue: 'asyncio.Queue[Union[Frame, int]]' = asyncio.Queue()  # a close code ends the queue
+        self.task = asyncio.create_task(self._send_loop())
+
+    def push(self, frames: Frames) -> bool:
+        """ False if the spectator is too slow to take another frame """
+        if self.queue.qsize() >= self.max_queue:
+            return False
+        self.queue.put_nowait(frames.get(self.subprotocol))
+        return True
+
+    def finish(self, code: int = 1000) -> None:
+        """ Close the websocket once everything queued so far is sent """
+        self.queue.put_nowait(code)
+
+    def drop(self, code: int) -> None:
+        """ Close the websocket after the frame being sent, discarding the queued ones """
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.finish(code)
+
+    def close(self) -> None:
+        self.task.cancel()
+
+    async def _send_loop(self) -> None:
+        try:
+            while True:
+                frame = await self.queue.get()
+                if isinstance(frame, int):
+                    await self.websocket.close(code=frame)
+                    return
+                await send_frame(self.websocket, frame)
+        except (WebSocketDisconnect, RuntimeError, OSError):
+            pass  # the spectator is gone, its receiving side cleans up
+
+
+class SpectatorHub:
+    """ The spectators of one table """
+
+    def __init__(self, max_queue: int = MAX_QUEUE) -> None:
+        self.max_queue = max_queue
+        self.spectators: Set[Spectator] = set()
+        self.encoder = DeltaEncoder()
+        self.dict_state: Optional[Dict[str, Any]] = None  # the public view published last
+        self.snapshot: Optional[Frames] = None            # dict_state as update message
+        self.finished = False
+        self.close_code = 1000
+        self.cnt_published = 0
+        self.cnt_dropped = 0
+
+    def __len__(self) -> int:
+        return len(self.spectators)
+
+    def publish(self, dict_state: Dict[str, Any]) -> None:
+        """ Send the new public view to every spectator; the hub keeps it, do not modify it afterwards.
+        Tables skip publishing while nobody watches, so publish the current view before the first join """
+        if dict_state == self.dict_state:
+            return
+        self.dict_state = dict_state
+        self.snapshot = None
+        if not self.spectators:
+            return  # the next spectator starts from a snapshot
+        frames = Frames(self.encoder.encode(dict_state))
+        if frames.message['type'] == 'update':
+            self.snapshot = frames
+        self.cnt_published += 1
+        for spectator in list(self.spectators):
+            if not spectator.push(frames):
+                self.drop(spectator)
+
+    def get_snapshot(self) -> Optional[Frames]:
+        if self.snapshot is None and self.dict_state is not None:
+            if self.encoder.last is self.dict_state:
+                self.snapshot = Frames({'type': 'update', 'seq': self.encoder.seq, 'state': self.dict_state})
+            else:  # nobody watched the last changes, the encoder starts over
+                self.encoder.reset()
+                self.snapshot = Frames(self.encoder.encode(self.dict_state))
+        return self.snapshot
+
+    def join(self, websocket: WebSocket) -> Spectator:
+        spectator = Spectator(websocket, self.max_queue)
+        self.spectators.add(spectator)
+        self.resync(spectator)
+        if self.finished:
+            spectator.finish(self.close_code)
+        return spectator
+
+    def resync(self, spectator: Spectator) -> None:
+        """ Send the latest public view as a snapshot """
+        snapshot = self.get_snapshot()
+        if snapshot is not None and spectator in self.spectators and not spectator.push(snapshot):
+            self.drop(spectator)
+
+    def leave(self, spectator: Spectator) -> None:
+        self.spectators.discard(spectator)
+        spectator.close()
+
+    def drop(self, spectator: Spectator) -> None:
+        self.spectators.discard(spectator)
+        self.cnt_dropped += 1
+        spectator.drop(CLOSE_TOO_SLOW)
+
+    def finish(self, code: int = 1000) -> None:
+        """ The game is over: close every spectator once it got the final state """
+        self.finished = True
+        self.close_code = code
+        for spectator in self.spectators:
+            spectator.finish(code)
+
+    def close(self) -> None:
+        for spectator in self.spectators:
+            spectator.close()
+
+    def stats(self) -> Dict[str, int]:
+        return {'spectators': len(self.spectators), 'published': self.cnt_published, 'dropped': self.cnt_dropped}
@@ -1,17 +1,23 @@
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 from enum import Enum
+from dataclasses import dataclass
+from functools import lru_cache
 import random
+import time
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 from server.py.game import Game, Player
 
 # Disable complexity and style warnings that we can't fix without changing logic
 # pylint: disable=too-many-instance-attributes,too-many-locals,too-many-return-statements
 # pylint: disable=too-many-branches,too-many-statements,too-many-nested-blocks,too-few-public-methods
+# pylint: disable=unused-argument
 
 class Card(BaseModel):
     """Represents a UNO card with optional color, number, and/or symbol."""
+    model_config = ConfigDict(frozen=True)  # cards are shared between piles, hands and cached actions
+
     color: Optional[str] = None
     number: Optional[int] = None
     symbol: Optional[str] = None
@@ -19,6 +25,8 @@ class Card(BaseModel):
 
 class Action(BaseModel):
     """Represents an action that a player can take in the UNO game."""
+    model_config = ConfigDict(frozen=True)  # interned by _new_action and shared by all games
+
     card: Optional[Card] = None
     color: Optional[str] = None
     draw: Optional[int] = None
@@ -28,21 +36,7 @@ class Action(BaseModel):
         """Compare actions for sorting purposes."""
         if not isinstance(other, Action):
             return NotImplemented
-        return (
-            (self.card.color if self.card and self.card.color else '',
-             self.card.number if self.card and self.card.number is not None else -1,
-             self.card.symbol if self.card and self.card.symbol else '',
-             self.color if self.color else '',
-             self.draw if self.draw else 0,
-             self.uno)
-            <
-            (other.card.color if other.card and other.card.color else '',
-             other.card.number if other.card and other.card.number is not None else -1,
-             other.card.symbol if other.card and other.card.symbol else '',
-             other.color if other.color else '',
-             other.draw if other.draw else 0,
-             other.uno)
-        )
+        return _action_sort_key(self) < _action_sort_key(other)
 
 
 class PlayerState(BaseModel):
@@ -77,11 +71,317 @@ class GameState(BaseModel):
     has_drawn: bool = False
 
 
+class RuleSet(BaseModel):
+    """House rules of an UNO table, compiled once into dispatch tables."""
+    model_config = ConfigDict(frozen=True)
+
+    stacking: bool = True   # a draw2 may be stacked onto cards still to be drawn
+    jump_in: bool = False   # a card identical to the top discard may be played out of turn
+
+
+LIST_WILD_COLOR = ['red', 'green', 'yellow', 'blue']
+CARD_HIDDEN = Card()  # a face down card, neither color, number nor symbol
+_DRAW_SYMBOLS = ('draw2', 'wilddraw4')
+_LIST_CARD_SYMBOL: List[Optional[str]] = [None, 'skip', 'reverse', 'draw2', 'wild', 'wilddraw4']
+
+CNT_CARD_DECK = 108
+CNT_PLAYER_MIN = 2
+CNT_PLAYER_MAX = 20
+
+# pending draw levels: nothing to draw, a single draw2 pending, draw cards stacked up
+PENDING_NONE, PENDING_SINGLE, PENDING_STACKED = 0, 1, 2
+
+
+@dataclass
+class _TurnContext:
+    """Facts about the active player's turn shared by all action expanders."""
+    playable: List[Card]
+    cnt_to_draw: int
+    normal_playable_exists: bool
+
+
+_Expander = Callable[[Card, _TurnContext], List[Action]]
+_Finisher = Callable[[List[Action], _TurnContext], None]
+_Effect = Callable[[GameState], None]
+_JumpIn = Callable[[GameState, int], List[Action]]
+
+
+def _action_sort_key(action: Action) -> Tuple[str, int, str, str, int, bool]:
+    card = action.card
+    return (
+        card.color if card and card.color else '',
+        card.number if card and card.number is not None else -1,
+        card.symbol if card and card.symbol else '',
+        action.color if action.color else '',
+        action.draw if action.draw else 0,
+        action.uno
+    )
+
+
+# Actions are interned by value and shared by all games; they are frozen, like their cards
+_CardKey = Tuple[Optional[str], Optional[int], Optional[str]]
+_ActionKey = Tuple[Optional[str], Optional[int], Optional[str], Optional[str], Optional[int], bool]
+_ACTION_CACHE: Dict[_ActionKey, Action] = {}
+
+
+def _card_key(card: Card) -> _CardKey:
+    return (card.color, card.number, card.symbol)
+
+
+def _new_action(card: Optional[Card] = None, color: Optional[str] = None,
+                draw: Optional[int] = None, uno: bool = False) -> Action:
+    key: _ActionKey
+    if card is None:
+        key = (None, None, None, color, draw, uno)
+    else:
+        key = (*_card_key(card), color, draw, uno)
+    action = _ACTION_CACHE.get(key)
+    if action is None:
+        card_copy = None if card is None else Card(color=card.color, number=card.number, symbol=card.symbol)
+        action = _ACTION_CACHE[key] = Action(card=card_copy, color=color, draw=draw, uno=uno)
+    return action
+
+
+def _pending_level(cnt_to_draw: int) -> int:
+    if cnt_to_draw <= 0:
+        return PENDING_NONE
+    return PENDING_SINGLE if cnt_to_draw <= 2 else PENDING_STACKED
+
+
+# --- action expanders: one playable card -> its actions ---
+
+def _expand_plain(card: Card, ctx: _TurnContext) -> List[Action]:
+    return [_new_action(card, card.color if card.color else 'any')]
+
+
+def _expand_draw2(card: Card, ctx: _TurnContext) -> List[Action]:
+    return [_new_action(card, card.color if card.color else 'any', 2)]
+
+
+def _expand_wild(card: Card, ctx: _TurnContext) -> List[Action]:
+    return [_new_action(card, color) for color in LIST_WILD_COLOR]
+
+
+def _expand_wilddraw4(card: Card, ctx: _TurnContext) -> List[Action]:
+    # wilddraw4 is only allowed if no other card can be played
+    if any(c != card for c in ctx.playable):
+        return []
+    return [_new_action(card, color, 4) for color in LIST_WILD_COLOR]
+
+
+def _expand_draw2_on_single(card: Card, ctx: _TurnContext) -> List[Action]:
+    draw = 2 if ctx.normal_playable_exists else ctx.cnt_to_draw + 2
+    return [_new_action(card, card.color if card.color else 'any', draw)]
+
+
+def _expand_draw2_stacked(card: Card, ctx: _TurnContext) -> List[Action]:
+    return [_new_action(card, card.color if card.color else 'any', ctx.cnt_to_draw + 2)]
+
+
+def _expand_none(card: Card, ctx: _TurnContext) -> List[Action]:
+    return []
+
+
+# --- finishers: append the draw actions once all cards are expanded ---
+
+def _finish_turn(actions: List[Action], ctx: _TurnContext) -> None:
+    actions.append(_new_action(draw=1))
+
+
+def _finish_after_draw(actions: List[Action], ctx: _TurnContext) -> None:
+    if not actions:
+        actions.append(_new_action(draw=1))
+
+
+def _finish_single(actions: List[Action], ctx: _TurnContext) -> None:
+    if ctx.normal_playable_exists:
+        actions.append(_new_action(draw=1))
+    actions.append(_new_action(draw=ctx.cnt_to_draw))
+
+
+def _finish_stacked(actions: List[Action], ctx: _TurnContext) -> None:
+    if not actions:
+        actions.append(_new_action(draw=ctx.cnt_to_draw))
+
+
+# --- card effects: applied when a card is played, and after the UNO check ---
+
+def _advance(state: GameState, steps: int = 1) -> None:
+    assert state.idx_player_active is not None
+    state.idx_player_active = (state.idx_player_active + steps * state.direction) % state.cnt_player
+    state.has_drawn = False
+
+
+def _recycle_discard(state: GameState) -> None:
+    """Turn the discard pile (except its top card) into the new draw pile."""
+    if len(state.list_card_discard) < 2:
+        return
+    top_card = state.list_card_discard.pop()
+    # swap the lists instead of copying the cards over, the shuffle is amortized over the draws
+    state.list_card_draw, state.list_card_discard = state.list_card_discard, [top_card]
+    random.shuffle(state.list_card_draw)
+
+
+def _draw_cards(state: GameState, player: PlayerState, cnt: int) -> None:
+    for _ in range(cnt):
+        if not state.list_card_draw:
+            _recycle_discard(state)
+            if not state.list_card_draw:
+                return
+        player.list_card.append(state.list_card_draw.pop())
+
+
+@lru_cache(maxsize=None)
+def deck_composition(cnt_deck: int = 1) -> Tuple[Card, ...]:
+    """All cards of cnt_deck standard decks (shared, copy before handing them out)."""
+    deck: List[Card] = []
+    colors = ['red', 'yellow', 'green', 'blue']
+    for color in colors:
+        deck.append(Card(color=color, number=0))
+        for _ in range(2):
+            for num in range(1, 10):
+                deck.append(Card(color=color, number=num))
+        for _ in range(2):
+            deck.append(Card(color=color, symbol='skip'))
+            deck.append(Card(color=color, symbol='reverse'))
+            deck.append(Card(color=color, symbol='draw2'))
+    for _ in range(4):
+        deck.append(Card(color='any', symbol='wild'))
+        deck.append(Card(color='any', symbol='wilddraw4'))
+    return tuple(deck * cnt_deck)
+
+
+def clone_state(state: GameState) -> GameState:
+    """Fast copy for simulations: fresh piles and hands, the (never mutated) cards are shared."""
+    return state.model_copy(update={
+        'list_card_draw': list(state.list_card_draw),
+        'list_card_discard': list(state.list_card_discard),
+        'list_player': [PlayerState(name=p.name, list_card=list(p.list_card)) for p in state.list_player],
+    })
+
+
+def cnt_deck_for(cnt_player: int, cnt_hand_cards: int = 7) -> int:
+    """Number of 108 card decks needed so at most half of all cards are dealt."""
+    cnt_dealt = cnt_player * cnt_hand_cards
+    return max(1, -(-2 * cnt_dealt // CNT_CARD_DECK))
+
+
+def _effect_none(state: GameState) -> None:
+    pass
+
+
+def _effect_reverse(state: GameState) -> None:
+    state.direction *= -1
+
+
+def _effect_skip(state: GameState) -> None:
+    _advance(state, steps=2)
+
+
+def _effect_draw2(state: GameState) -> None:
+    state.cnt_to_draw += 2
+
+
+def _effect_wilddraw4(state: GameState) -> None:
+    state.cnt_to_draw += 4
+
+
+def _after_advance(state: GameState) -> None:
+    _advance(state)
+
+
+def _after_draw(state: GameState) -> None:
+    # with two players the victim is skipped straight back to the player
+    if state.cnt_player == 2:
+        _advance(state)
+
+
+# --- jump-in: identical cards played out of turn ---
+
+def _jump_in_none(state: GameState, idx_player: int) -> List[Action]:
+    return []
+
+
+def _jump_in_identical(state: GameState, idx_player: int) -> List[Action]:
+    if state.cnt_to_draw > 0 or not state.list_card_discard:
+        return []
+    top_discard = state.list_card_discard[-1]
+    if top_discard.symbol in ('wild', 'wilddraw4'):
+        return []
+    hand = state.list_player[idx_player].list_card
+    if top_discard not in hand:
+        return []
+    # identical cards are interchangeable, one action stands for all of them
+    actions = [_new_action(top_discard, top_discard.color, 2 if top_discard.symbol == 'draw2' else None)]
+    if len(hand) == 2:
+        actions.extend([_new_action(a.card, a.color, a.draw, uno=True) for a in actions])
+    return actions
+
+
+@dataclass(frozen=True)
+class CompiledRules:
+    """Dispatch tables of a rule set; shared read-only by all games using it."""
+    expand: Dict[Tuple[Optional[str], int, bool], _Expander]
+    finish: Dict[Tuple[int, bool], _Finisher]
+    effect: Dict[Optional[str], Tuple[_Effect, _Effect]]
+    jump_in: _JumpIn
+
+
+@lru_cache(maxsize=None)
+def compile_rules(rules: RuleSet) -> CompiledRules:
+    """Compile a rule set into dispatch tables (once per distinct rule set)."""
+    draw2_single = _expand_draw2_on_single if rules.stacking else _expand_none
+    draw2_stacked = _expand_draw2_stacked if rules.stacking else _expand_none
+
+    expand: Dict[Tuple[Optional[str], int, bool], _Expander] = {}
+    for has_drawn in (False, True):
+        for symbol in _LIST_CARD_SYMBOL:
+            # no draw pending: wild cards choose a color, draw2 adds its cards
+            if symbol == 'wild':
+                expand[(symbol, PENDING_NONE, has_drawn)] = _expand_wild
+            elif symbol == 'wilddraw4':
+                expand[(symbol, PENDING_NONE, has_drawn)] = _expand_wilddraw4
+            elif symbol == 'draw2':
+                expand[(symbol, PENDING_NONE, has_drawn)] = _expand_draw2
+            else:
+                expand[(symbol, PENDING_NONE, has_drawn)] = _expand_plain
+            # draw pending: only draw2 may be stacked, other cards are played plain
+            expand[(symbol, PENDING_SINGLE, has_drawn)] = draw2_single if symbol == 'draw2' else _expand_plain
+            expand[(symbol, PENDING_STACKED, has_drawn)] = draw2_stacked if symbol == 'draw2' else _expand_none
+
+    finish: Dict[Tuple[int, bool], _Finisher] = {
+        (PENDING_NONE, False): _finish_turn,
+        (PENDING_NONE, True): _finish_after_draw,
+        (PENDING_SINGLE, False): _finish_single,
+        (PENDING_SINGLE, True): _finish_single,
+        (PENDING_STACKED, False): _finish_stacked,
+        (PENDING_STACKED, True): _finish_stacked,
+    }
+
+    effect: Dict[Optional[str], Tuple[_Effect, _Effect]] = {
+        None: (_effect_none, _after_advance),
+        'skip': (_effect_skip, _effect_none),
+        'reverse': (_effect_reverse, _effect_none),
+        'draw2': (_effect_draw2, _after_draw),
+        'wild': (_effect_none, _after_advance),
+        'wilddraw4': (_effect_wilddraw4, _after_draw),
+    }
+
+    return CompiledRules(
+        expand=expand,
+        finish=finish,
+        effect=effect,
+        jump_in=_jump_in_identical if rules.jump_in else _jump_in_none
+    )
+
+
 class Uno(Game):
     """UNO game implementation."""
 
-    def __init__(self) -> None:
-        """Initialize a new UNO game with default state."""
+    def __init__(self, rules: Optional[RuleSet] = None) -> None:
+        """Initialize a new UNO game with default state and the given house rules."""
+        self.rules = rules if rules is not None else RuleSet()
+        self.rules_compiled = compile_rules(self.rules)
         self.state = GameState(
             list_card_draw=[],
             list_card_discard=[],
@@ -136,158 +436,87 @@ class Uno(Game):
     def get_list_action(self) -> List[Action]:
         """
         Get the list of possible actions for the current active player.
-        """
-        if self.state.phase != GamePhase.RUNNING:
-            return []
-
-        assert self.state.idx_player_active is not None  # Ensures index is int
-        active_player = self.state.list_player[self.state.idx_player_active]
-        top_discard = self.state.list_card_discard[-1] if self.state.list_card_discard else None
 
-        playable_cards = [c for c in active_player.list_card if self._can_play_card(c, top_discard)]
-
-        # Special case: first turn with a wild card on the discard pile (test010)
-        first_turn_with_wild = (
-            len(self.state.list_card_discard) == 1 and top_discard and top_discard.symbol == 'wild'
+        Each distinct playable card is expanded through the compiled rule
+        tables, keyed by (card symbol, pending draw, has_drawn). Identical
+        cards in hand yield a single set of actions.
+        """
+        return self._generate_actions()[0]
+
+    def get_list_action_weighted(self) -> List[Tuple[Action, int]]:
+        """Get the distinct actions, each with the number of identical hand cards it stands for."""
+        actions, cnt_card = self._generate_actions()
+        return [(a, cnt_card[_card_key(a.card)] if a.card else 1) for a in actions]
+
+    def _generate_actions(self) -> Tuple[List[Action], Dict[_CardKey, int]]:
+        state = self.state
+        if state.phase != GamePhase.RUNNING:
+            return [], {}
+
+        assert state.idx_player_active is not None  # Ensures index is int
+        hand = state.list_player[state.idx_player_active].list_card
+        cnt_card: Dict[_CardKey, int] = {}
+        distinct: List[Card] = []
+        for card in hand:
+            key = _card_key(card)
+            if key in cnt_card:
+                cnt_card[key] += 1
+            else:
+                cnt_card[key] = 1
+                distinct.append(card)
+        top_discard = state.list_card_discard[-1] if state.list_card_discard else None
+        playable = [c for c in distinct if self._can_play_card(c, top_discard)]
+        ctx = _TurnContext(
+            playable=playable,
+            cnt_to_draw=state.cnt_to_draw,
+            normal_playable_exists=any(c.symbol not in _DRAW_SYMBOLS for c in playable)
         )
 
+        pending = _pending_level(state.cnt_to_draw)
+        has_drawn = state.has_drawn
+        expand = self.rules_compiled.expand
         actions: List[Action] = []
-        if self.state.cnt_to_draw > 0:
-            cumulative_scenario = self.state.cnt_to_draw > 2
-            normal_playable_exists = any(
-                c.symbol not in ('draw2', 'wilddraw4') and self._can_play_card(c, top_discard)
-                for c in playable_cards
-            )
+        for card in playable:
+            # cards with an unknown symbol are played like number cards
+            expander = expand.get((card.symbol, pending, has_drawn)) or expand[(None, pending, has_drawn)]
+            actions.extend(expander(card, ctx))
 
-            stackable: List[Action] = []
-            normal_actions: List[Action] = []
-            for c in playable_cards:
-                if c.symbol == 'draw2':
-                    draw_val = (
-                        2 if (normal_playable_exists and not cumulative_scenario)
-                        else self.state.cnt_to_draw + 2
-                    )
-                    stackable.append(Action(card=c, color=c.color if c.color else 'any', draw=draw_val))
-                else:
-                    if not cumulative_scenario:
-                        chosen_color = c.color if c.color else 'any'
-                        normal_actions.append(Action(card=c, color=chosen_color))
-
-            if cumulative_scenario:
-                if stackable:
-                    actions.extend(stackable)
-                    if len(active_player.list_card) == 2:
-                        card_play_actions = [a for a in stackable if a.card is not None]
-                        for a in card_play_actions:
-                            actions.append(Action(card=a.card, color=a.color, draw=a.draw, uno=True))
-                else:
-                    actions.append(Action(draw=self.state.cnt_to_draw))
-            else:
-                actions.extend(normal_actions)
-                actions.extend(stackable)
-                if len(active_player.list_card) == 2:
-                    card_play_actions = [a for a in actions if a.card is not None]
-                    for a in card_play_actions:
-                        actions.append(Action(card=a.card, color=a.color, draw=a.draw, uno=True))
-                if normal_playable_exists:
-                    actions.append(Action(draw=1))
-                actions.append(Action(draw=self.state.cnt_to_draw))
-
-            return sorted(actions)
-
-        # If cnt_to_draw=0
-        if self.state.has_drawn:
-            # has_drawn=True, no pending draws
-            if playable_cards:
-                for c in playable_cards:
-                    if c.symbol == 'wild':
-                        for col in ['red', 'green', 'yellow', 'blue']:
-                            actions.append(Action(card=c, color=col))
-                    elif c.symbol == 'wilddraw4':
-                        if not self._has_other_playable_card(active_player.list_card, c, top_discard):
-                            for col in ['red', 'green', 'yellow', 'blue']:
-                                actions.append(Action(card=c, color=col, draw=4))
-                    elif c.symbol == 'draw2':
-                        actions.append(
-                            Action(card=c, color=c.color if c.color else 'any', draw=2)
-                        )
-                    else:
-                        actions.append(
-                            Action(card=c, color=c.color if c.color else 'any')
-                        )
-
-                if len(active_player.list_card) == 2:
-                    card_play_actions = [a for a in actions if a.card is not None]
-                    for a in card_play_actions:
-                        actions.append(Action(card=a.card, color=a.color, draw=a.draw, uno=True))
-                return sorted(actions)
-
-            actions.append(Action(draw=1))
-            return sorted(actions)
-
-        # has_drawn=False, cnt_to_draw=0
-        if playable_cards:
-            if first_turn_with_wild:
-                for c in playable_cards:
-                    if c.symbol == 'wild':
-                        for col in ['red', 'green', 'yellow', 'blue']:
-                            actions.append(Action(card=c, color=col))
-                    elif c.symbol == 'wilddraw4':
-                        if not self._has_other_playable_card(active_player.list_card, c, top_discard):
-                            for col in ['red', 'green', 'yellow', 'blue']:
-                                actions.append(Action(card=c, color=col, draw=4))
-                    elif c.symbol == 'draw2':
-                        actions.append(
-                            Action(card=c, color=c.color if c.color else 'any', draw=2)
-                        )
-                    else:
-                        actions.append(
-                            Action(card=c, color=c.color if c.color else 'any')
-                        )
-
-                if len(active_player.list_card) == 2:
-                    card_play_actions = [a for a in actions if a.card is not None]
-                    for a in card_play_actions:
-                        actions.append(Action(card=a.card, color=a.color, draw=a.draw, uno=True))
-                actions.append(Action(draw=1))
-                return sorted(actions)
-
-            for c in playable_cards:
-                if c.symbol == 'wild':
-                    for col in ['red', 'green', 'yellow', 'blue']:
-                        actions.append(Action(card=c, color=col))
-                elif c.symbol == 'wilddraw4':
-                    if not self._has_other_playable_card(active_player.list_card, c, top_discard):
-                        for col in ['red', 'green', 'yellow', 'blue']:
-                            actions.append(Action(card=c, color=col, draw=4))
-                elif c.symbol == 'draw2':
-                    actions.append(
-                        Action(card=c, color=c.color if c.color else 'any', draw=2)
-                    )
-                else:
-                    actions.append(
-                        Action(card=c, color=c.color if c.color else 'any')
-                    )
+        if len(hand) == 2:
+            actions.extend([_new_action(a.card, a.color, a.draw, uno=True) for a in actions])
+        self.rules_compiled.finish[(pending, has_drawn)](actions, ctx)
 
-            if len(active_player.list_card) == 2:
-                card_play_actions = [a for a in actions if a.card is not None]
-                for a in card_play_actions:
-                    actions.append(Action(card=a.card, color=a.color, draw=a.draw, uno=True))
+        actions.sort(key=_action_sort_key)
+        return actions, cnt_card
 
-            actions.append(Action(draw=1))
-            return sorted(actions)
+    def get_list_action_jump_in(self, idx_player: int) -> List[Action]:
+        """
+        Get the actions a waiting player may take out of turn.
 
-        actions.append(Action(draw=1))
-        return actions
+        Only available with the jump-in house rule: a card identical to the
+        top of the discard pile may be played by any other player.
+        """
+        state = self.state
+        if state.phase != GamePhase.RUNNING or idx_player == state.idx_player_active:
+            return []
+        return self.rules_compiled.jump_in(state, idx_player)
+
+    def apply_action_jump_in(self, idx_player: int, action: Action) -> None:
+        """Play a jump-in action: the turn passes to the jumping player first."""
+        if action not in self.get_list_action_jump_in(idx_player):
+            raise ValueError(f"Player {idx_player} can't jump in with {action}")
+        self.state.idx_player_active = idx_player
+        self.state.has_drawn = False
+        self.apply_action(action)
 
     def apply_action(self, action: Action) -> None:
-        if self.state.phase != GamePhase.RUNNING:
+        state = self.state
+        if state.phase != GamePhase.RUNNING:
             return
 
-        assert self.state.idx_player_active is not None
-        active_player = self.state.list_player[self.state.idx_player_active]
+        assert state.idx_player_active is not None
+        active_player = state.list_player[state.idx_player_active]
         if action.card:
-            self.state.list_card_discard.append(action.card)
+            state.list_card_discard.append(action.card)
             active_player.list_card.remove(action.card)
             # Break this long line into multiple lines to avoid line-too-long error
             chosen_color = (
@@ -295,64 +524,53 @@ class Uno(Game):
                     action.card.color if action.card.color else 'any'
                 )
             )
-            self.state.color = chosen_color
+            state.color = chosen_color
 
-            if action.card.symbol == "reverse":
-                self.state.direction *= -1
-            elif action.card.symbol == "skip":
-                self._advance_turn(skip=True)
-            elif action.card.symbol == "draw2":
-                self.state.cnt_to_draw += 2
-            elif action.card.symbol == "wilddraw4":
-                self.state.cnt_to_draw += 4
+            effect = self.rules_compiled.effect
+            on_play, after_play = effect.get(action.card.symbol) or effect[None]
+            on_play(state)
 
             # Missed UNO penalty
             if len(active_player.list_card) == 1 and not action.uno:
-                for _ in range(4):
-                    if self.state.list_card_draw:
-                        active_player.list_card.append(self.state.list_card_draw.pop())
+                _draw_cards(state, active_player, 4)
 
             # If player finished all cards
             if len(active_player.list_card) == 0:
-                self.state.phase = GamePhase.FINISHED
+                state.phase = GamePhase.FINISHED
                 return
 
-            if action.card.symbol not in ["skip", "reverse", "draw2", "wilddraw4"]:
-                self._advance_turn()
-
-            if action.card.symbol in ["draw2", "wilddraw4"] and self.state.cnt_player == 2:
-                self._advance_turn()
-
-            self.state.has_drawn = False
+            after_play(state)
+            state.has_drawn = False
 
         elif action.draw:
             # Drawing cards action
-            assert self.state.idx_player_active is not None
-            if self.state.cnt_to_draw > 0:
-                draw_count = action.draw if action.draw is not None else self.state.cnt_to_draw
-                for _ in range(draw_count):
-                    if self.state.list_card_draw:
-                        active_player.list_card.append(self.state.list_card_draw.pop())
-                self.state.cnt_to_draw = 0
-                self._advance_turn(skip=True)
-                self.state.has_drawn = False
+            if state.cnt_to_draw > 0:
+                _draw_cards(state, active_player, action.draw)
+                state.cnt_to_draw = 0
+                _advance(state, steps=2)
             else:
-                draw_count = action.draw if action.draw is not None else 1
-                for _ in range(draw_count):
-                    if self.state.list_card_draw:
-                        active_player.list_card.append(self.state.list_card_draw.pop())
-                self.state.has_drawn = True
+                _draw_cards(state, active_player, action.draw)
+                state.has_drawn = True
+                # nothing to play even after drawing: the turn passes instead of drawing again
+                top_discard = state.list_card_discard[-1] if state.list_card_discard else None
+                if not any(self._can_play_card(c, top_discard) for c in active_player.list_card):
+                    _advance(state)
 
     def get_player_view(self, idx_player: int) -> GameState:
-        masked_state = self.state.model_copy()
-        for i, player in enumerate(masked_state.list_player):
-            if i != idx_player:
-                player.list_card = [Card() for _ in player.list_card]
-        return masked_state
+        # other hands and the draw pile face down, new lists so the real state stays untouched
+        return self.state.model_copy(update={
+            'list_player': [
+                player if i == idx_player else PlayerState(name=player.name, list_card=[CARD_HIDDEN] * len(player.list_card))
+                for i, player in enumerate(self.state.list_player)
+            ],
+            'list_card_draw': [CARD_HIDDEN] * len(self.state.list_card_draw),
+        })
 
     def _initialize_game(self) -> None:
         if self.state.cnt_player == 0:
             return
+        if not CNT_PLAYER_MIN <= self.state.cnt_player <= CNT_PLAYER_MAX:
+            raise ValueError(f"UNO is played by {CNT_PLAYER_MIN} to {CNT_PLAYER_MAX} players, not {self.state.cnt_player}")
 
         if len(self.state.list_player) != self.state.cnt_player:
             self.state.list_player = [
@@ -362,7 +580,7 @@ class Uno(Game):
 
         # Only initialize deck if both draw and discard are empty
         if not self.state.list_card_draw and not self.state.list_card_discard:
-            deck = self._initialize_deck()
+            deck = self._initialize_deck(cnt_deck_for(self.state.cnt_player, self.state.CNT_HAND_CARDS))
             random.shuffle(deck)
             self.state.list_card_draw = deck
 
@@ -375,9 +593,12 @@ class Uno(Game):
 
         valid_start_found = False
         if not self.state.list_card_discard:
-            while self.state.list_card_draw and not valid_start_found:
+            for _ in range(len(self.state.list_card_draw)):
+                if valid_start_found:
+                    break
                 top_card = self.state.list_card_draw.pop()
                 if top_card.symbol == "wilddraw4":
+                    self.state.list_card_draw.insert(0, top_card)  # back under the pile, not out of the game
                     continue
                 self.state.list_card_discard.append(top_card)
                 self.state.color = top_card.color if top_card.color else 'any'
@@ -399,37 +620,20 @@ class Uno(Game):
 
         self.state.phase = GamePhase.RUNNING
 
-    def _initialize_deck(self) -> List[Card]:
-        deck: List[Card] = []
-        colors = ['red', 'yellow', 'green', 'blue']
-        for color in colors:
-            deck.append(Card(color=color, number=0))
-            for _ in range(2):
-                for num in range(1, 10):
-                    deck.append(Card(color=color, number=num))
-            for _ in range(2):
-                deck.append(Card(color=color, symbol='skip'))
-                deck.append(Card(color=color, symbol='reverse'))
-                deck.append(Card(color=color, symbol='draw2'))
-        for _ in range(4):
-            deck.append(Card(color='any', symbol='wild'))
-            deck.append(Card(color='any', symbol='wilddraw4'))
-        return deck
+    def _initialize_deck(self, cnt_deck: int = 1) -> List[Card]:
+        # larger tables play with several decks shuffled together
+        return [card.model_copy() for card in deck_composition(cnt_deck)]
 
     def _advance_turn(self, skip: bool = False) -> None:
-        assert self.state.idx_player_active is not None
-        steps = 2 if skip else 1
-        self.state.idx_player_active = (
-            (self.state.idx_player_active + steps * self.state.direction) % self.state.cnt_player
-        )
-        self.state.has_drawn = False
+        _advance(self.state, steps=2 if skip else 1)
 
     def _can_play_card(self, card: Card, top_discard: Optional[Card]) -> bool:
         # If there is no card on the discard pile, we can play anything
         if not top_discard:
             return True
 
-        if top_discard.symbol in ["draw2"]:
+        # a pending draw2 can only be answered with another draw2
+        if top_discard.symbol == "draw2" and self.state.cnt_to_draw > 0:
             if card.symbol != "draw2":
                 return False
 
@@ -453,15 +657,6 @@ class Uno(Game):
         # If none of the conditions are met, the card can’t be played
         return False
 
-    def _has_other_playable_card(self, hand: List[Card], exclude_card: Card,
-                                 top_discard: Optional[Card]) -> bool:
-        for c in hand:
-            if c == exclude_card:
-                continue
-            if self._can_play_card(c, top_discard):
-                return True
-        return False
-
 
 class RandomPlayer(Player):
     """A random player implementation that chooses actions at random."""
@@ -470,6 +665,151 @@ class RandomPlayer(Player):
         return random.choice(actions) if actions else None
 
 
+class HeuristicPlayer(Player):
+    """A greedy player scoring every action by color concentration, hand size and the opponents' hands."""
+
+    def select_action(self, state: GameState, actions: List[Action]) -> Optional[Action]:
+        if not actions:
+            return None
+        assert state.idx_player_active is not None
+        hand = state.list_player[state.idx_player_active].list_card
+        cnt_color: Dict[Optional[str], int] = {}
+        for card in hand:
+            cnt_color[card.color] = cnt_color.get(card.color, 0) + 1
+        idx_next = (state.idx_player_active + state.direction) % len(state.list_player)
+        cnt_next = len(state.list_player[idx_next].list_card)
+        cnt_min = min(len(p.list_card) for i, p in enumerate(state.list_player) if i != state.idx_player_active)
+        return max(actions, key=lambda a: self.score(a, len(hand), cnt_color, cnt_next, cnt_min))
+
+    @staticmethod
+    def score(action: Action, cnt_hand: int, cnt_color: Dict[Optional[str], int],
+              cnt_next: int, cnt_min: int) -> float:
+        """Score one action; higher is better."""
+        card = action.card
+        if card is None:
+            # drawing is the last resort, the more cards the worse
+            return -10.0 - (action.draw or 1)
+        score = 10.0
+        if cnt_hand == 2:
+            score += 50.0 if action.uno else -50.0
+        # keep the hand concentrated: stay on the color we hold most of
+        score += 2.0 * (cnt_color.get(action.color, 0) - (1 if card.color == action.color else 0))
+        # dump the high numbers first
+        score += (card.number or 0) / 10
+        # attack the next player the closer an opponent gets to winning
+        threat = max(0, 4 - cnt_next) * 5.0 + max(0, 3 - cnt_min) * 2.0
+        if card.symbol in ('skip', 'draw2', 'wilddraw4'):
+            score += threat + (action.draw or 0)
+        elif card.symbol == 'reverse':
+            score += threat / 2
+        # save the wild cards for later while the hand is large and nobody is close
+        if card.symbol in ('wild', 'wilddraw4') and cnt_hand > 3 and threat == 0:
+            score -= 6.0
+        return score
+
+
+class SamplingPlayer(Player):
+    """
+    A search player for the masked state.
+
+    Within the time budget it repeatedly deals the unseen cards to the opponents
+    (determinization), plays every candidate action on that deal and rolls the
+    game out with a fast policy. The action with the best mean outcome is chosen.
+    """
+
+    def __init__(self, time_budget: float = 0.08, rollout_depth: int = 20,
+                 max_rollouts: Optional[int] = None, rules: Optional[RuleSet] = None) -> None:
+        self.time_budget = time_budget
+        self.rollout_depth = rollout_depth
+        self.max_rollouts = max_rollouts
+        self.rules = rules if rules is not None else RuleSet()
+        self.fallback = HeuristicPlayer()
+        self.cnt_rollouts = 0  # rollouts of the last decision
+
+    def select_action(self, state: GameState, actions: List[Action]) -> Optional[Action]:
+        self.cnt_rollouts = 0
+        # get_list_action already collapses identical cards, this guards other action sources
+        candidates = list({_action_sort_key(a): a for a in actions}.values())
+        if len(candidates) <= 1:
+            return candidates[0] if candidates else None
+        assert state.idx_player_active is not None
+        idx_me = state.idx_player_active
+        unseen = self._unseen_cards(state, idx_me)
+        cnt_hidden = sum(len(p.list_card) for i, p in enumerate(state.list_player) if i != idx_me)
+        if len(unseen) < cnt_hidden:
+            # unknown deck composition, the hidden hands can't be sampled
+            return self.fallback.select_action(state, actions)
+
+        time_end = time.perf_counter() + self.time_budget
+        total = [0.0] * len(candidates)
+        count = [0] * len(candidates)
+        sim = Uno(self.rules)
+        while not self._budget_spent(time_end):
+            deal = self._determinize(state, idx_me, unseen)
+            for i, action in enumerate(candidates):
+                if self._budget_spent(time_end):
+                    break
+                sim.set_state(clone_state(deal))
+                sim.apply_action(action)
+                total[i] += self._rollout(sim, idx_me)
+                count[i] += 1
+                self.cnt_rollouts += 1
+        if not all(count):
+            return self.fallback.select_action(state, actions)
+        best = max(range(len(candidates)), key=lambda i: total[i] / count[i])
+        return candidates[best]
+
+    def _budget_spent(self, time_end: float) -> bool:
+        if self.max_rollouts is not None and self.cnt_rollouts >= self.max_rollouts:
+            return True
+        return time.perf_counter() >= time_end
+
+    @staticmethod
+    def _unseen_cards(state: GameState, idx_me: int) -> List[Card]:
+        """The cards of the full deck that are neither in our hand nor on the discard pile."""
+        seen: Dict[_CardKey, int] = {}
+        for card in state.list_player[idx_me].list_card + state.list_card_discard:
+            key = _card_key(card)
+            seen[key] = seen.get(key, 0) + 1
+        unseen = []
+        for card in deck_composition(cnt_deck_for(state.cnt_player, state.CNT_HAND_CARDS)):
+            key = _card_key(card)
+            if seen.get(key, 0) > 0:
+                seen[key] -= 1
+            else:
+                unseen.append(card)
+        return unseen
+
+    @staticmethod
+    def _determinize(state: GameState, idx_me: int, unseen: List[Card]) -> GameState:
+        pool = list(unseen)
+        random.shuffle(pool)
+        deal = clone_state(state)
+        for i, player in enumerate(deal.list_player):
+            if i != idx_me:
+                cnt = len(player.list_card)
+                player.list_card = pool[-cnt:] if cnt else []
+                del pool[len(pool) - cnt:]
+        deal.list_card_draw = pool
+        return deal
+
+    def _rollout(self, sim: Uno, idx_me: int) -> float:
+        """Play on with a fast policy and rate the outcome for us between 0 and 1."""
+        state = sim.state
+        for _ in range(self.rollout_depth):
+            if state.phase == GamePhase.FINISHED:
+                break
+            action = self.fallback.select_action(state, sim.get_list_action())
+            if action is None:
+                break
+            sim.apply_action(action)
+        cnt_me = len(state.list_player[idx_me].list_card)
+        if state.phase == GamePhase.FINISHED:
+            return 1.0 if cnt_me == 0 else 0.0
+        cnt_other = min(len(p.list_card) for i, p in enumerate(state.list_player) if i != idx_me)
+        return 0.5 + (cnt_other - cnt_me) / (2 * (cnt_other + cnt_me + 1))
+
+
 if __name__ == "__main__":
     # Initialize a UNO game with 2 players
-    game = Uno()
\ No newline at end of file
+    game = Uno()
@@ -0,0 +1,194 @@
+"""
+UNO match play: consecutive hands up to a points target, with streaming statistics.
+
+The winner of a hand scores the points of all cards left in the other hands.
+Per-hand statistics go into a StatsAggregator, which keeps constant memory
+(count, mean, variance, min, max per metric) and can be merged across worker
+processes.
+"""
+from typing import Dict, List, Optional
+from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor
+import math
+import random
+import sys
+
+from pydantic import BaseModel
+
+from server.py.game import Player
+from server.py.uno import Uno, Card, GameState, GamePhase, RuleSet, HeuristicPlayer, RandomPlayer
+
+POINTS_SYMBOL = {'skip': 20, 'reverse': 20, 'draw2': 20, 'wild': 50, 'wilddraw4': 50}
+POINTS_TARGET = 500
+MAX_TURNS_HAND = 5000
+
+
+def card_points(card: Card) -> int:
+    """Standard scoring: face value for numbers, 20 for action cards, 50 for wild cards."""
+    if card.symbol is not None:
+        return POINTS_SYMBOL.get(card.symbol, 0)
+    return card.number if card.number is not None else 0
+
+
+class HandResult(BaseModel):
+    idx_winner: Optional[int] = None  # None if the hand was abandoned after MAX_TURNS_HAND
+    points: int = 0                   # points scored by the winner
+    cnt_turn: int = 0                 # actions applied
+    cnt_card_drawn: int = 0           # cards drawn, penalties included
+    cnt_penalty: int = 0              # missed UNO calls
+    max_stack: int = 0                # largest number of cards pending to be drawn
+
+
+@dataclass
+class RunningStat:
+    """Count, mean and variance (Welford) plus min/max of a stream of numbers."""
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    min: float = math.inf
+    max: float = -math.inf
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "RunningStat") -> None:
+        """Combine with the statistics of another stream (Chan et al.)."""
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+
+@dataclass
+class StatsAggregator:
+    """Incremental per-hand statistics; no hand is kept, so memory stays constant."""
+    cnt_hand: int = 0
+    cnt_abandoned: int = 0
+    wins: Dict[int, int] = field(default_factory=dict)
+    stats: Dict[str, RunningStat] = field(default_factory=dict)
+
+    METRICS = ('cnt_turn', 'cnt_card_drawn', 'cnt_penalty', 'max_stack', 'points')
+
+    def add(self, result: HandResult) -> None:
+        self.cnt_hand += 1
+        if result.idx_winner is None:
+            self.cnt_abandoned += 1
+        else:
+            self.wins[result.idx_winner] = self.wins.get(result.idx_winner, 0) + 1
+        for name in self.METRICS:
+            self.stats.setdefault(name, RunningStat()).add(getattr(result, name))
+
+    def merge(self, other: "StatsAggregator") -> None:
+        self.cnt_hand += other.cnt_hand
+        self.cnt_abandoned += other.cnt_abandoned
+        for idx, cnt in other.wins.items():
+            self.wins[idx] = self.wins.get(idx, 0) + cnt
+        for name, stat in other.stats.items():
+            self.stats.setdefault(name, RunningStat()).merge(stat)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {
+            name: {'mean': stat.mean, 'std': stat.std, 'min': stat.min, 'max': stat.max}
+            for name, stat in self.stats.items()
+        }
+
+
+class UnoMatch:
+    """Plays consecutive UNO hands until a player reaches the points target."""
+
+    def __init__(self, players: List[Player], target: int = POINTS_TARGET, rules: Optional[RuleSet] = None,
+                 aggregator: Optional[StatsAggregator] = None) -> None:
+        self.players = players
+        self.target = target
+        self.rules = rules
+        self.aggregator = aggregator if aggregator is not None else StatsAggregator()
+        self.scores = [0] * len(players)
+        self.cnt_hand = 0
+
+    def play_hand(self) -> HandResult:
+        """Play one hand; the starting player rotates from hand to hand."""
+        cnt_player = len(self.players)
+        game = Uno(self.rules)
+        game.set_state(GameState(cnt_player=cnt_player, idx_player_active=self.cnt_hand % cnt_player))
+        state = game.get_state()
+        result = HandResult()
+
+        while state.phase == GamePhase.RUNNING and result.cnt_turn < MAX_TURNS_HAND:
+            assert state.idx_player_active is not None
+            idx = state.idx_player_active
+            actions = game.get_list_action()
+            action = self.players[idx].select_action(game.get_player_view(idx), actions)
+            if action is None:
+                break
+            player = state.list_player[idx]
+            cnt_before = len(player.list_card)
+            game.apply_action(action)
+            result.cnt_turn += 1
+            # a played card leaves one card less, anything above was drawn
+            cnt_expected = cnt_before - 1 if action.card is not None else cnt_before
+            if len(player.list_card) > cnt_expected:
+                result.cnt_card_drawn += len(player.list_card) - cnt_expected
+                if action.card is not None:
+                    result.cnt_penalty += 1
+            result.max_stack = max(result.max_stack, state.cnt_to_draw)
+
+        if state.phase == GamePhase.FINISHED:
+            result.idx_winner = next(i for i, p in enumerate(state.list_player) if not p.list_card)
+            result.points = sum(card_points(c) for p in state.list_player for c in p.list_card)
+            self.scores[result.idx_winner] += result.points
+
+        self.cnt_hand += 1
+        self.aggregator.add(result)
+        return result
+
+    def play(self, max_hands: int = 1000) -> Optional[int]:
+        """Play hands until someone reaches the target; returns the winner (None if max_hands ran out)."""
+        for _ in range(max_hands):
+            self.play_hand()
+            best = max(range(len(self.scores)), key=lambda i: self.scores[i])
+            if self.scores[best] >= self.target:
+                return best
+        return None
+
+
+def simulate_hands(cnt_hand: int, cnt_player: int = 4, seed: int = 0) -> StatsAggregator:
+    """Worker: play cnt_hand hands between heuristic and random players and aggregate them."""
+    random.seed(seed)
+    players: List[Player] = [HeuristicPlayer() if i % 2 == 0 else RandomPlayer() for i in range(cnt_player)]
+    match = UnoMatch(players)
+    for _ in range(cnt_hand):
+        match.play_hand()
+    return match.aggregator
+
+
+if __name__ == "__main__":
+
+    CNT_WORKER = 4
+    CNT_HAND = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+
+    total = StatsAggregator()
+    with ProcessPoolExecutor(CNT_WORKER) as pool:
+        for part in pool.map(simulate_hands, [CNT_HAND // CNT_WORKER] * CNT_WORKER, [4] * CNT_WORKER, range(CNT_WORKER)):
+            total.merge(part)
+
+    print(f'hands: {total.cnt_hand}, abandoned: {total.cnt_abandoned}, wins per seat: {dict(sorted(total.wins.items()))}')
+    for metric, values in total.summary().items():
+        print(f"{metric:>15}: mean {values['mean']:8.2f}  std {values['std']:8.2f}  min {values['min']:6.0f}  max {values['max']:6.0f}")
@@ -0,0 +1,128 @@
+"""
+Word corpus for Hangman, loaded once per process and indexed for O(1) random picks.
+
+Words are upper-cased and reduced to A-Z. Every word gets a 26-bit mask of its letters
+and a difficulty: the number of wrong guesses a frequency-order guesser
+(StructuredPlayer.perfect_order) makes before it has all letters of the word.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+from functools import lru_cache
+import json
+import os
+import random
+import string
+
+WORDS_FILE = os.path.join(os.path.dirname(__file__), 'hangman_words.json')
+FREQUENCY_ORDER = 'ESIARNTOLCDUPMGHBYFVKWZXQJ'
+DIFFICULTY_MAX_WRONG = {'easy': 2, 'medium': 5, 'hard': 26}  # upper bound of wrong guesses per level
+DEFAULT_WORDS = (
+    'STAIRS', 'SENIOR', 'LATTE', 'CLEAN', 'DEVOPS', 'PYTHON', 'DOCKER', 'PIPELINE',
+    'KUBERNETES', 'CONTAINER', 'DEPLOYMENT', 'MONITORING',
+    'JAZZ', 'QUIZ', 'FJORD', 'RHYTHM', 'SPHINX', 'WALTZ', 'ZEPHYR', 'BUZZWORD',
+)
+
+LETTER_BIT = {letter: 1 << idx for idx, letter in enumerate(string.ascii_uppercase)}
+FREQUENCY_RANK = {letter: rank for rank, letter in enumerate(FREQUENCY_ORDER)}
+
+
+def normalize(word: str) -> str:
+    return ''.join(letter for letter in word.upper() if letter in LETTER_BIT)
+
+
+def letter_mask(word: str) -> int:
+    mask = 0
+    for letter in word:
+        mask |= LETTER_BIT[letter]
+    return mask
+
+
+def count_wrong_guesses(word: str) -> int:
+    """ Wrong guesses of the frequency-order guesser; more than 7 loses the game """
+    letters = set(word)
+    return max(FREQUENCY_RANK[letter] for letter in letters) + 1 - len(letters)
+
+
+def get_difficulty(word: str) -> str:
+    cnt_wrong = count_wrong_guesses(word)
+    for difficulty, max_wrong in DIFFICULTY_MAX_WRONG.items():
+        if cnt_wrong <= max_wrong:
+            return difficulty
+    raise ValueError(f"No difficulty for '{word}'")
+
+
+class WordCorpus:
+    """ Immutable after construction, share one instance per process (see get_corpus) """
+
+    def __init__(self, words: Iterable[str]) -> None:
+        unique: Dict[str, None] = {}
+        for word in words:
+            word = normalize(word)
+            if word:
+                unique[word] = None
+        if len(unique) == 0:
+            raise ValueError("Word corpus is empty")
+        self.words: Tuple[str, ...] = tuple(unique)
+        self.masks: Tuple[int, ...] = tuple(letter_mask(word) for word in self.words)
+        self.by_length: Dict[int, List[str]] = {}
+        self.by_letters: Dict[int, List[str]] = {}
+        self.by_difficulty: Dict[str, List[str]] = {difficulty: [] for difficulty in DIFFICULTY_MAX_WRONG}
+        self._by_length_difficulty: Dict[Tuple[int, str], List[str]] = {}
+        for word, mask in zip(self.words, self.masks):
+            difficulty = get_difficulty(word)
+            self.by_length.setdefault(len(word), []).append(word)
+            self.by_letters.setdefault(mask, []).append(word)
+            self.by_difficulty[difficulty].append(word)
+            self._by_length_difficulty.setdefault((len(word), difficulty), []).append(word)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def select(self, difficulty: Optional[str] = None, length: Optional[int] = None) -> List[str]:
+        """ The indexed list of words matching the filter; do not modify it """
+        if difficulty is not None and difficulty not in DIFFICULTY_MAX_WRONG:
+            raise ValueError(f"Unknown difficulty '{difficulty}', use one of {list(DIFFICULTY_MAX_WRONG)}")
+        if difficulty is None and length is None:
+            return list(self.words)
+        if length is None:
+            return self.by_difficulty[str(difficulty)]
+        if difficulty is None:
+            return self.by_length.get(length, [])
+        return self._by_length_difficulty.get((length, difficulty), [])
+
+    def random_word(self, difficulty: Optional[str] = None, length: Optional[int] = None,
+                    rng: Optional[random.Random] = None) -> str:
+        words = self.words if difficulty is None and length is None else self.select(difficulty, length)
+        if len(words) == 0:
+            raise ValueError(f"No word with difficulty={difficulty} and length={length}")
+        return rng.choice(words) if rng is not None else random.choice(words)
+
+    def words_with_letters(self, letters: str) -> List[str]:
+        """ Words made of exactly this set of letters, e.g. 'ABNA' finds BANANA """
+        return self.by_letters.get(letter_mask(normalize(letters)), [])
+
+
+def load_words(path: str) -> List[str]:
+    """ A JSON list of words or a text file with one word per line """
+    with open(path, encoding='utf-8') as file:
+        if path.endswith('.json'):
+            words = json.load(file)
+            if not isinstance(words, list):
+                raise ValueError(f"{path} must contain a JSON list of words")
+            return [str(word) for word in words]
+        return file.read().split()
+
+
+@lru_cache(maxsize=None)
+def get_corpus(path: str = WORDS_FILE) -> WordCorpus:
+    """ Loaded on first use per process, falls back to DEFAULT_WORDS if the word file is missing """
+    if not os.path.exists(path):
+        return WordCorpus(DEFAULT_WORDS)
+    return WordCorpus(load_words(path))
+
+
+if __name__ == "__main__":
+
+    corpus = get_corpus()
+    print(f'{len(corpus)} words')
+    for level, list_word in corpus.by_difficulty.items():
+        print(f'{level:>6}: {len(list_word):>7} words, e.g. {corpus.random_word(level) if list_word else "-"}')
@@ -0,0 +1,60 @@
+import asyncio
+import json
+from typing import List, Optional, Type, Union
+import pytest
+from server.py.delta import apply_patch
+from server.py.packing import unpack
+
+
+class FakeSocket:
+    """ Stands in for a starlette WebSocket, keeping every frame it is sent """
+
+    def __init__(self, subprotocol: Optional[str] = None, delay: float = 0.0, blocked: bool = False) -> None:
+        self.scope: dict = {'subprotocols': [] if subprotocol is None else [subprotocol]}
+        self.delay = delay
+        self.frames: List[Union[str, bytes]] = []
+        self.closed = False
+        self.code: Optional[int] = None
+        self.unblocked = asyncio.Event()
+        if not blocked:
+            self.unblocked.set()
+
+    async def send_text(self, frame: str) -> None:
+        await self.send_frame(frame)
+
+    async def send_bytes(self, frame: bytes) -> None:
+        await self.send_frame(frame)
+
+    async def send_frame(self, frame: Union[str, bytes]) -> None:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        await self.unblocked.wait()
+        self.frames.append(frame)
+
+    async def close(self, code: int = 1000) -> None:
+        self.closed = True
+        self.code = code
+
+    @property
+    def messages(self) -> List[dict]:
+        return [unpack(frame) if isinstance(frame, bytes) else json.loads(frame) for frame in self.frames]
+
+    def get_state(self) -> Optional[dict]:
+        """ The state the client ends up with after applying all updates and patches """
+        state = None
+        seq = 0
+        for message in self.messages:
+            if message['type'] == 'update':
+                state = message['state']
+            elif message['type'] == 'patch':
+                assert message['seq'] == seq + 1
+                state = apply_patch(state, message['ops'])
+            else:
+                continue
+            seq = message['seq']
+        return state
+
+
+@pytest.fixture
+def fake_socket() -> Type[FakeSocket]:
+    return FakeSocket
@@ -0,0 +1,358 @@
+import random
+import pytest
+from server.py.battleship import Battleship, BattleshipGameState, BattleshipAction, ActionType, GamePhase, PlayerState, Ship
+from server.py.battleship import BitBoard, RandomPlayer, NotSoRandomPlayer, LIST_LOCATION, locations_to_mask, iter_bits
+from server.py.battleship import get_placements, get_possible_locations, DensityPlayer, mask_to_array
+from server.py.battleship import column_name, get_location_names, location_to_index, get_placement, cnt_placements
+
+
+def make_fleet(columns):
+    lengths = [("carrier", 5), ("battleship", 4), ("cruiser", 3), ("submarine", 3), ("destroyer", 2)]
+    return [
+        Ship(name=name, length=length, location=[f"{col}{row}" for row in range(1, length + 1)])
+        for (name, length), col in zip(lengths, columns)
+    ]
+
+
+def make_running_state(shots=None, successful_shots=None):
+    player0 = PlayerState(name='Player 1', ships=make_fleet("ABCDE"), shots=shots or [], successful_shots=successful_shots or [])
+    player1 = PlayerState(name='Player 2', ships=make_fleet("FGHIJ"), shots=[], successful_shots=[])
+    return BattleshipGameState(idx_player_active=0, phase=GamePhase.RUNNING, winner=None, players=[player0, player1])
+
+
+def shoot(location):
+    return BattleshipAction(action_type=ActionType.SHOOT, location=[location])
+
+
+@pytest.fixture
+def game():
+    return Battleship()
+
+
+def test_location_masks():
+    assert locations_to_mask(["A1"]) == 1
+    assert locations_to_mask(["B1", "A2"]) == (1 << 1) | (1 << 10)
+    assert [LIST_LOCATION[idx] for idx in iter_bits(locations_to_mask(["J10", "C3", "A1"]))] == ["A1", "C3", "J10"]
+    with pytest.raises(ValueError):
+        locations_to_mask(["K1"])
+
+
+def test_placements_cached_and_consistent():
+    assert get_placements(3) is get_placements(3, 10)
+    placements = get_placements(3)
+    assert len(placements) == 2 * 8 * 10
+    assert all(p.mask == locations_to_mask(list(p.locations)) for p in placements)
+    assert all(p.locations == tuple(LIST_LOCATION[cell] for cell in p.cells) for p in placements)
+    assert get_placements(2, 5)[0] == ((1 << 0) | (1 << 1), (0, 1), ("A1", "B1"))
+    assert get_possible_locations(2, 3) == [["A1", "B1"], ["A2", "B2"], ["A3", "B3"], ["B1", "C1"], ["B2", "C2"], ["B3", "C3"],
+                                            ["A1", "A2"], ["B1", "B2"], ["C1", "C2"], ["A2", "A3"], ["B2", "B3"], ["C2", "C3"]]
+    assert len(get_placements(1, 4)) == 16
+    with pytest.raises(ValueError):
+        get_placements(0)
+    with pytest.raises(ValueError):
+        get_placements(6, 5)
+
+
+def test_bitboard_from_state():
+    board = BitBoard(make_running_state(shots=["F1", "A9"], successful_shots=["F1"]))
+    assert board.players[1].ship_masks[0] == locations_to_mask(["F1", "F2", "F3", "F4", "F5"])
+    assert board.players[1].fleet.bit_count() == 17
+    assert board.players[0].shots == locations_to_mask(["F1", "A9"])
+    assert board.players[0].hits == locations_to_mask(["F1"])
+    assert board.players[1].ship_hits == [1, 0, 0, 0, 0]
+    assert not board.players[1].is_sunk(0)
+    assert BitBoard(make_running_state(shots=["J1", "J2"])).players[1].is_sunk(4)
+
+
+def test_hit_counters_follow_shots(game):
+    state = make_running_state()
+    game.set_state(state)
+    for location in ["J1", "A1", "J1", "A2", "J2"]:
+        state.idx_player_active = 0
+        game.apply_action(shoot(location))
+    assert game.board.players[1].ship_hits == [0, 0, 0, 0, 2]
+    assert game.board.players[1].is_sunk(4)
+    assert [ship.name for ship in game.get_player_view(0).players[1].ships] == ["destroyer"]
+    assert game.get_player_view(1).players[1].ships == state.players[1].ships
+
+
+def test_shoot_hit_and_miss(game):
+    state = make_running_state()
+    game.set_state(state)
+    game.apply_action(shoot("F2"))
+    assert state.players[0].shots == ["F2"]
+    assert state.players[0].successful_shots == ["F2"]
+    assert state.idx_player_active == 1
+    game.apply_action(shoot("J10"))
+    assert state.players[1].shots == ["J10"]
+    assert state.players[1].successful_shots == []
+
+
+def test_shoot_actions_exclude_fired_locations(game):
+    game.set_state(make_running_state(shots=["A1", "B7"]))
+    locations = [action.location[0] for action in game.get_list_action()]
+    assert len(locations) == 98
+    assert "A1" not in locations and "B7" not in locations
+
+
+def test_last_hit_finishes_game(game):
+    fleet = [loc for ship in make_fleet("FGHIJ") for loc in ship.location]
+    state = make_running_state(shots=fleet[:-1], successful_shots=fleet[:-1])
+    game.set_state(state)
+    assert not game.board.is_finished()
+    game.apply_action(shoot(fleet[-1]))
+    assert state.phase == GamePhase.FINISHED
+    assert state.winner == 0
+    assert game.get_list_action() == []
+
+
+def test_set_ship_until_running(game):
+    player = RandomPlayer()
+    for _ in range(10):
+        assert game.get_state().phase == GamePhase.SETUP
+        game.apply_action(player.select_action(game.get_state(), game.get_list_action()))
+    state = game.get_state()
+    assert state.phase == GamePhase.RUNNING
+    for bits, player_state in zip(game.board.players, state.players):
+        assert bits.fleet == locations_to_mask([loc for ship in player_state.ships for loc in ship.location])
+
+
+def test_board_rebuilt_after_outside_changes(game):
+    state = make_running_state()
+    game.set_state(state)
+    board = game.board
+    game.apply_action(shoot("G3"))
+    assert game.board is board
+    state.players[1].shots.append("A1")  # not through apply_action
+    assert game.board is not board
+    assert game.board.players[1].shots == locations_to_mask(["A1"])
+    state.players[1].ships[0].location = ["A10", "B10", "C10", "D10", "E10"]
+    assert game.board.players[1].ship_masks[0] == locations_to_mask(["A10", "B10", "C10", "D10", "E10"])
+    game.state = make_running_state(shots=["F1"])
+    assert game.board.players[0].shots == locations_to_mask(["F1"])
+
+
+@pytest.mark.parametrize("player", [RandomPlayer(), NotSoRandomPlayer(), DensityPlayer()])
+def test_full_games_finish(player):
+    random.seed(2)
+    for _ in range(3):
+        game = Battleship()
+        for _ in range(300):
+            state = game.get_state()
+            if state.phase == GamePhase.FINISHED:
+                break
+            game.apply_action(player.select_action(state, game.get_list_action()))
+        state = game.get_state()
+        assert state.phase == GamePhase.FINISHED
+        loser = state.players[1 - state.winner]
+        fleet = {loc for ship in loser.ships for loc in ship.location}
+        assert fleet <= set(state.players[state.winner].shots)
+
+
+def test_player_view_hides_unsunk_ships(game):
+    state = make_running_state(shots=["J1", "J2", "F1"], successful_shots=["J1", "J2", "F1"])
+    game.set_state(state)
+    view = game.get_player_view(0)
+    assert [ship.name for ship in view.players[1].ships] == ["destroyer"]
+    assert len(view.players[0].ships) == 5
+    with pytest.raises(ValueError):
+        game.get_player_view(2)
+
+
+def test_player_view_is_a_copy(game):
+    state = make_running_state(shots=["J1", "J2", "F1"], successful_shots=["J1", "J2", "F1"])
+    game.set_state(state)
+    for view in (game.get_player_view(0), game.get_public_view()):
+        for player in view.players:
+            player.shots.append("A1")
+            player.successful_shots.clear()
+            for ship in player.ships:
+                ship.location.append("A1")
+    assert game.get_state() == make_running_state(shots=["J1", "J2", "F1"], successful_shots=["J1", "J2", "F1"])
+
+
+def test_player_views_copied_once_per_move(game):
+    game.set_state(make_running_state(shots=["J1"], successful_shots=["J1"]))
+    view = game.get_player_view(0)
+    assert game.get_player_view(0).players[0] is view.players[0]
+    assert game.get_public_view().players[1] is view.players[1]
+    game.apply_action(shoot("J2"))
+    assert view.players[0].shots == ["J1"]
+    assert game.get_player_view(0).players[0].shots == ["J1", "J2"]
+    assert [ship.name for ship in game.get_player_view(0).players[1].ships] == ["destroyer"]
+
+
+def test_print_state(game, capsys):
+    game.set_state(make_running_state())
+    game.apply_action(shoot("F1"))
+    game.apply_action(shoot("A1"))
+    game.print_state()
+    assert "Player 2" in capsys.readouterr().out
+
+
+def make_setup_state(occupied):
+    ships = [Ship(name="blocker", length=len(occupied), location=occupied), Ship(name="destroyer", length=2)]
+    players = [PlayerState(name='Player 1', ships=ships), PlayerState(name='Player 2', ships=[])]
+    return BattleshipGameState(idx_player_active=0, phase=GamePhase.SETUP, players=players)
+
+
+def test_ship_actions_avoid_occupied_cells(game):
+    game.set_state(make_setup_state([loc for loc in LIST_LOCATION if loc[0] != "J"]))
+    actions = game.get_ship_actions()
+    assert len(actions) == 9
+    assert all(action.ship_name == "destroyer" and {loc[0] for loc in action.location} == {"J"} for action in actions)
+    assert list(game.iter_legal_placements(2))[0].locations == ("J1", "J2")
+
+
+def test_random_legal_placement(game):
+    rng = random.Random(5)
+    for _ in range(10):
+        game.set_state(make_setup_state([loc for loc in LIST_LOCATION if loc[0] != "J"]))
+        action = game.random_legal_placement(rng)
+        assert action in game.get_ship_actions()
+    game.set_state(make_setup_state(LIST_LOCATION[:-1]))
+    assert game.random_legal_placement(rng) is None
+    assert game.get_ship_actions() == []
+    game.set_state(make_running_state())
+    assert game.random_legal_placement(rng) is None
+
+
+def test_mask_to_array():
+    array = mask_to_array(locations_to_mask(["A1", "C1", "J10"]))
+    assert array.shape == (100,)
+    assert list(array.nonzero()[0]) == [0, 2, 99]
+
+
+def test_density_player_targets_around_hit(game):
+    game.set_state(make_running_state(shots=["F3"], successful_shots=["F3"]))
+    view = game.get_player_view(0)
+    action = DensityPlayer(random.Random(0)).select_action(view, game.get_list_action())
+    assert action.location[0] in ["F2", "F4", "E3", "G3"]
+
+
+def test_density_player_skips_blocked_cells(game):
+    shots = [loc for loc in LIST_LOCATION if loc[0] in "ABCDEFGH"]
+    hits = [loc for ship in make_fleet("FGHIJ")[:3] for loc in ship.location]
+    game.set_state(make_running_state(shots=shots, successful_shots=hits))
+    view = game.get_player_view(0)
+    assert [ship.name for ship in view.players[1].ships] == ["carrier", "battleship", "cruiser"]
+    density = DensityPlayer().get_density(view)
+    assert (density[[LIST_LOCATION.index(loc) for loc in shots]] == -1).all()
+    assert (density[[LIST_LOCATION.index(loc) for loc in LIST_LOCATION if loc[0] in "IJ"]] > 0).all()
+
+
+def test_density_player_ignores_sunk_ships(game):
+    game.set_state(make_running_state(shots=["J1", "J2"], successful_shots=["J1", "J2"]))
+    view = game.get_player_view(0)
+    assert [ship.name for ship in view.players[1].ships] == ["destroyer"]
+    density = DensityPlayer().get_density(view)
+    assert density[LIST_LOCATION.index("J3")] > 0
+    assert density[LIST_LOCATION.index("J3")] < density[LIST_LOCATION.index("E5")]
+
+
+def test_density_player_setup_and_empty(game):
+    player = DensityPlayer(random.Random(0))
+    assert player.select_action(game.get_state(), []) is None
+    assert player.select_action(game.get_state(), game.get_list_action()).action_type == ActionType.SET_SHIP
+
+
+def test_not_so_random_distance():
+    player = NotSoRandomPlayer()
+    assert player.get_dist(shoot("C3"), shoot("C7")) == 4
+    assert player.get_dist(shoot("C3"), shoot("J3")) == 7
+    assert player.get_dist(shoot("C3"), shoot("D4")) == 100
+
+
+@pytest.mark.parametrize("x, name", [(0, "A"), (25, "Z"), (26, "AA"), (51, "AZ"), (52, "BA"), (701, "ZZ"), (702, "AAA")])
+def test_column_names(x, name):
+    assert column_name(x) == name
+
+
+def test_large_board_locations():
+    names = get_location_names(100)
+    assert len(names) == 10000
+    assert names[:2] == ("A1", "B1")
+    assert names[26] == "AA1"
+    assert names[-1] == "CV100"
+    assert location_to_index("CV100", 100) == 9999
+    assert get_possible_locations(2, 30)[28 * 30] == ["AC1", "AD1"]
+
+
+def test_placement_decoder_matches_table():
+    for length, board_size in [(1, 4), (3, 6), (5, 12)]:
+        placements = get_placements(length, board_size)
+        assert len(placements) == cnt_placements(length, board_size)
+        assert all(get_placement(length, board_size, idx) == p for idx, p in enumerate(placements))
+
+
+def test_custom_fleet_game():
+    rng = random.Random(4)
+    game = Battleship(board_size=30, fleet=[("tanker", 8), ("frigate", 3)])
+    state = game.get_state()
+    assert (state.board_size, state.cnt_ships) == (30, 2)
+    while state.phase == GamePhase.SETUP:
+        game.apply_action(game.random_legal_placement(rng))
+    assert [len(ship.location) for ship in state.players[0].ships] == [8, 3]
+    cnt_shots = 0
+    while state.phase == GamePhase.RUNNING:
+        action = game.random_shoot_action(rng)
+        assert action.location[0] not in state.players[state.idx_player_active].shots
+        game.apply_action(action)
+        cnt_shots += 1
+    assert cnt_shots <= 2 * 900
+    fleet = {loc for ship in state.players[1 - state.winner].ships for loc in ship.location}
+    assert fleet <= set(state.players[state.winner].shots)
+    assert game.random_shoot_action(rng) is None
+
+
+def test_large_board_actions_are_lazy():
+    game = Battleship(board_size=100, fleet=[("a", 5)])
+    rng = random.Random(1)
+    game.apply_action(game.random_legal_placement(rng))
+    game.apply_action(game.random_legal_placement(rng))
+    state = game.get_state()
+    assert state.phase == GamePhase.RUNNING
+    first = next(game.iter_shoot_actions())
+    assert first.location == ["A1"]
+    assert len(game.get_shoot_actions()) == 10000
+    game.apply_action(first)
+    assert game.get_player_view(1 - state.idx_player_active).board_size == 100
+
+
+def test_fleet_must_fit():
+    with pytest.raises(ValueError):
+        Battleship(board_size=4, fleet=[("long", 5)])
+    with pytest.raises(ValueError):
+        Battleship(board_size=2, fleet=[("a", 2), ("b", 2), ("c", 1)])
+
+
+def test_density_player_on_large_board():
+    game = Battleship(board_size=40, fleet=[("a", 5), ("b", 4), ("c", 4)])
+    rng = random.Random(2)
+    while game.get_state().phase == GamePhase.SETUP:
+        game.apply_action(game.random_legal_placement(rng))
+    player = DensityPlayer(rng)
+    idx = game.get_state().idx_player_active
+    action = player.select_action(game.get_player_view(idx), game.get_list_action())
+    assert action in game.get_list_action()
+    density = player.get_density(game.get_player_view(idx))
+    # in an empty board the centre is covered by more placements than the corner
+    assert density[location_to_index("T20", 40)] > density[location_to_index("A1", 40)]
+
+
+def test_density_matches_placement_count(game):
+    state = make_running_state(shots=["C3", "E5", "F1"], successful_shots=["F1"])
+    game.set_state(state)
+    view = game.get_player_view(0)
+    density = DensityPlayer().get_density(view)
+    blocked = locations_to_mask(["C3", "E5"])
+    expected = [0.0] * 100
+    for length in (5, 4, 3, 3, 2):
+        for placement in get_placements(length):
+            if placement.mask & blocked == 0:
+                weight = 1 + DensityPlayer.TARGET_WEIGHT * (placement.mask >> location_to_index("F1") & 1)
+                for cell in placement.cells:
+                    expected[cell] += weight
+    for location in ["C3", "E5", "F1"]:
+        expected[location_to_index(location)] = -1.0
+    assert density.tolist() == pytest.approx(expected)
@@ -0,0 +1,78 @@
+import csv
+import pytest
+from server.py.battleship import Battleship, DensityPlayer
+from server.py.battleship_tournament import (GameResult, load_player, mean_interval, play_game, run_tournament,
+                                             summarize, wilson_interval, write_csv)
+
+
+def test_load_player():
+    assert load_player('density') is DensityPlayer
+    assert load_player('server.py.battleship:DensityPlayer') is DensityPlayer
+    with pytest.raises(ValueError):
+        load_player('nobody')
+
+
+def test_wilson_interval():
+    low, high = wilson_interval(50, 100)
+    assert low < 0.5 < high
+    assert (low, high) == pytest.approx((0.4038, 0.5962), abs=1e-4)
+    low, high = wilson_interval(0, 10)
+    assert low == pytest.approx(0.0) and 0 < high < 0.35
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+
+
+def test_mean_interval():
+    mean, low, high = mean_interval([40, 44, 48])
+    assert mean == pytest.approx(44)
+    assert high - mean == pytest.approx(mean - low)
+    assert high - mean == pytest.approx(1.96 * 4 / 3 ** 0.5)
+    assert mean_interval([7]) == (7, 7, 7)
+
+
+def test_play_game_is_reproducible():
+    first = play_game('density', 'random', seed=5)
+    second = play_game('density', 'random', seed=5)
+    assert first.winner is not None
+    assert (first.winner, first.cnt_shots_winner, first.cnt_decisions) == \
+           (second.winner, second.cnt_shots_winner, second.cnt_decisions)
+    assert first.idx_first == 1
+    assert play_game('density', 'random', seed=6).idx_first == 0
+    assert 17 <= first.cnt_shots_winner <= 100
+
+
+def test_random_players_do_not_list_actions_on_large_boards(monkeypatch):
+    def get_list_action(self):
+        raise AssertionError("random players draw their move from the game")
+
+    monkeypatch.setattr(Battleship, 'get_list_action', get_list_action)
+    result = play_game('random', 'random', seed=3, board_size=60)
+    assert result.winner is not None and 17 <= result.cnt_shots_winner <= 3600
+    assert result == play_game('random', 'random', seed=3, board_size=60)._replace(seconds=result.seconds)
+
+
+def test_summarize_and_csv(tmp_path):
+    results = [
+        GameResult(0, 0, 0, 40, [45, 44], [0.1, 0.1]),
+        GameResult(1, 1, 0, 50, [55, 55], [0.1, 0.1]),
+        GameResult(2, 0, 1, 60, [60, 60], [0.1, 0.2]),
+        GameResult(3, 1, None, 0, [10, 10], [0.1, 0.1]),
+    ]
+    rows = summarize(results, ['a', 'b'])
+    assert [row['wins'] for row in rows] == [2, 1]
+    assert rows[0]['win_rate'] == pytest.approx(0.5)
+    assert rows[0]['shots_to_win'] == pytest.approx(45)
+    assert rows[1]['decisions_per_sec'] == pytest.approx(169 / 0.5)
+
+    path = tmp_path / 'games.csv'
+    write_csv(str(path), results, ['a', 'b'])
+    with open(path, encoding='utf-8') as file:
+        lines = list(csv.reader(file))
+    assert len(lines) == 5
+    assert lines[2][:4] == ['1', 'b', 'a', '50']
+    assert lines[4][2] == ''
+
+
+def test_run_tournament_matches_sequential():
+    results = run_tournament('notsorandom', 'random', 4, seed=10, cnt_workers=2)
+    assert [r.seed for r in results] == [10, 11, 12, 13]
+    assert [r.winner for r in results] == [play_game('notsorandom', 'random', seed).winner for seed in range(10, 14)]
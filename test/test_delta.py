@@ -0,0 +1,94 @@
+import copy
+import json
+import random
+from fastapi.testclient import TestClient
+from server.py.delta import DeltaEncoder, apply_patch, diff
+from server.py.uno import Uno, GameState, RandomPlayer
+
+
+def check_roundtrip(old, new):
+    ops = diff(old, new)
+    assert apply_patch(copy.deepcopy(old), ops) == new
+    return ops
+
+
+def test_diff_scalars_and_dicts():
+    assert not diff({'a': 1, 'b': [1, 2]}, {'a': 1, 'b': [1, 2]})
+    assert check_roundtrip({'a': 1, 'b': 2}, {'a': 1, 'b': 3}) == [{'op': 'replace', 'path': '/b', 'value': 3}]
+    assert check_roundtrip({'a': 1}, {'b': None}) == [{'op': 'remove', 'path': '/a'}, {'op': 'add', 'path': '/b', 'value': None}]
+    assert check_roundtrip({'x/y': 1, 'm~n': 1}, {'x/y': 2, 'm~n': 2}) == [
+        {'op': 'replace', 'path': '/x~1y', 'value': 2}, {'op': 'replace', 'path': '/m~0n', 'value': 2}]
+    assert check_roundtrip([1], {'a': 1}) == [{'op': 'replace', 'path': '', 'value': {'a': 1}}]
+
+
+def test_diff_lists():
+    hand = [{'color': 'red', 'number': idx} for idx in range(7)]
+    played = hand[:3] + hand[4:]
+    assert check_roundtrip({'hand': hand}, {'hand': played}) == [{'op': 'remove', 'path': '/hand/3'}]
+    assert check_roundtrip(['E'], ['E', 'A']) == [{'op': 'add', 'path': '/1', 'value': 'A'}]
+    assert check_roundtrip([[0, 0], [0, 0]], [[0, 0], [0, 1]]) == [{'op': 'replace', 'path': '/1/1', 'value': 1}]
+    assert check_roundtrip({'list_action': [1, 2, 3]}, {'list_action': []}) == [{'op': 'replace', 'path': '/list_action', 'value': []}]
+    check_roundtrip([1, 2, 3, 4], [5, 6])
+    check_roundtrip([], [1, 2])
+    check_roundtrip([1, 1, 1], [1])
+
+
+def test_diff_random_documents():
+    rng = random.Random(0)
+
+    def document(depth):
+        if depth == 0 or rng.random() < 0.3:
+            return rng.choice([0, 1, 'a', None, 2.5])
+        if rng.random() < 0.5:
+            return [document(depth - 1) for _ in range(rng.randint(0, 4))]
+        return {rng.choice('abcd'): document(depth - 1) for _ in range(rng.randint(0, 4))}
+
+    for _ in range(500):
+        check_roundtrip(document(4), document(4))
+
+
+def test_encoder_snapshots():
+    encoder = DeltaEncoder(snapshot_every=2, max_ops=1)
+    assert encoder.encode({'a': 1}) == {'type': 'update', 'seq': 1, 'state': {'a': 1}}
+    assert encoder.encode({'a': 2}) == {'type': 'patch', 'seq': 2, 'ops': [{'op': 'replace', 'path': '/a', 'value': 2}]}
+    assert encoder.encode({'a': 3})['type'] == 'patch'
+    assert encoder.encode({'a': 4})['type'] == 'update'  # every third message is a snapshot
+    assert encoder.encode({'a': 5, 'b': 1})['type'] == 'update'  # too many ops
+    encoder.reset()
+    assert encoder.encode({'a': 5, 'b': 1}) == {'type': 'update', 'seq': 6, 'state': {'a': 5, 'b': 1}}
+
+
+def test_encoder_uno_game_is_smaller():
+    random.seed(1)
+    game, player = Uno(), RandomPlayer()
+    game.set_state(GameState(cnt_player=2))
+    encoder = DeltaEncoder()
+    doc = None
+    cnt_full = cnt_sent = 0
+    while game.get_state().phase != 'finished':
+        dict_state = game.get_player_view(0).model_dump()
+        message = encoder.encode(dict_state)
+        doc = apply_patch(doc, message['ops']) if message['type'] == 'patch' else copy.deepcopy(message['state'])
+        assert doc == dict_state
+        cnt_full += len(json.dumps({'type': 'update', 'state': dict_state}))
+        cnt_sent += len(json.dumps(message))
+        list_action = game.get_list_action()
+        game.apply_action(player.select_action(game.get_state(), list_action) if list_action else None)
+    assert cnt_sent * 3 < cnt_full
+
+
+def test_hangman_websocket_patch_and_resync():
+    from server.py.main import app  # pylint: disable = import-outside-toplevel
+    client = TestClient(app)
+    with client.websocket_connect("/hangman/singleplayer/ws") as websocket:
+        assert websocket.receive_json()['type'] == 'session'
+        update = websocket.receive_json()
+        assert update['type'] == 'update' and update['seq'] == 1
+        websocket.send_json({'type': 'action', 'action': {'letter': 'e'}})
+        patch = websocket.receive_json()
+        assert patch['type'] == 'patch' and patch['seq'] == 2
+        state = apply_patch(update['state'], patch['ops'])
+        assert state['guesses'] == ['E']
+        websocket.send_json({'type': 'resync'})
+        resync = websocket.receive_json()
+        assert resync == {'type': 'update', 'seq': 3, 'state': state}
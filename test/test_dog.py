@@ -2,7 +2,7 @@ import pytest
 import random
 from unittest.mock import patch
 from typing import Optional, List
-from server.py.dog import Dog, Card, Marble, PlayerState, Action, GameState, GamePhase, RandomPlayer
+from server.py.dog import Dog, Card, Marble, PlayerState, Action, GameState, GamePhase, RandomPlayer, CARD_HIDDEN
 from server.py.game import Player
 
 
@@ -752,3 +752,14 @@ def test_apply_action_jkr_no_card_in_hand_for_substitution(game):
     else:
         # If no chosen substitution, test still passes for coverage.
         assert True
+
+
+def test_player_view_hides_other_hands_and_draw_pile(game):
+    state = game.get_state()
+    view = game.get_player_view(1)
+    assert view.list_player[1].list_card == state.list_player[1].list_card
+    for idx in (0, 2, 3):
+        assert view.list_player[idx].list_card == [CARD_HIDDEN] * len(state.list_player[idx].list_card)
+        assert view.list_player[idx].list_marble == state.list_player[idx].list_marble
+    assert view.list_card_draw == [CARD_HIDDEN] * len(state.list_card_draw)
+    assert state.list_card_draw[0] != CARD_HIDDEN and state.list_player[0].list_card[0] != CARD_HIDDEN
@@ -0,0 +1,125 @@
+import asyncio
+import os
+import threading
+import time
+import pytest
+from server.py.executor import EngineExecutor, ExecutorBusy, ExecutorTimeout
+
+
+@pytest.fixture
+def executor():
+    executor = EngineExecutor(cnt_workers=4, max_pending=3, timeout=1.0)
+    yield executor
+    executor.shutdown()
+
+
+def test_invalid_config():
+    with pytest.raises(ValueError):
+        EngineExecutor('fibers')
+    with pytest.raises(ValueError):
+        EngineExecutor(cnt_workers=0)
+
+
+def test_same_key_same_worker_in_order(executor):
+    calls = []
+
+    def work(idx):
+        time.sleep(0.001 * (5 - idx))  # later calls are faster, order must still hold
+        calls.append((idx, threading.get_ident()))
+        return idx
+
+    async def main():
+        return await asyncio.gather(*[executor.run('game-1', work, idx) for idx in range(3)])
+
+    assert asyncio.run(main()) == [0, 1, 2]
+    assert [idx for idx, _ in calls] == [0, 1, 2]
+    assert len({ident for _, ident in calls}) == 1
+    assert executor.get_worker('game-1') is executor.get_worker('game-1')
+    assert executor.stats()['done'] == 3
+
+
+def test_loop_stays_responsive(executor):
+    ticks = []
+
+    async def ticker():
+        for _ in range(5):
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+
+    async def main():
+        await asyncio.gather(executor.run('slow', time.sleep, 0.1), ticker())
+
+    start = time.perf_counter()
+    asyncio.run(main())
+    assert len(ticks) == 5
+    assert ticks[-1] - start < 0.1  # the ticker did not wait for the slow call
+
+
+def test_timeout_keeps_slot_until_done(executor):
+    async def main():
+        with pytest.raises(ExecutorTimeout):
+            await executor.run('slow', time.sleep, 0.2, timeout=0.01)
+        assert executor.cnt_pending == 1
+        await asyncio.sleep(0.3)
+        assert executor.cnt_pending == 0
+
+    asyncio.run(main())
+    assert executor.stats()['timeout'] == 1
+
+
+def test_busy_when_queue_full(executor):
+    async def main():
+        calls = [asyncio.ensure_future(executor.run(f'game-{idx}', time.sleep, 0.05)) for idx in range(3)]
+        await asyncio.sleep(0)
+        with pytest.raises(ExecutorBusy):
+            await executor.run('game-4', time.sleep, 0)
+        await asyncio.gather(*calls)
+        assert await executor.run('game-4', abs, -1) == 1
+
+    asyncio.run(main())
+    assert executor.stats()['rejected'] == 1
+
+
+def test_exception_is_raised_and_releases(executor):
+    async def main():
+        with pytest.raises(ZeroDivisionError):
+            await executor.run('game', divmod, 1, 0)
+        await asyncio.sleep(0.01)
+
+    asyncio.run(main())
+    assert executor.cnt_pending == 0
+
+
+def test_process_mode():
+    executor = EngineExecutor('process', cnt_workers=1)
+    try:
+        pid = asyncio.run(executor.run('game', os.getpid))
+    finally:
+        executor.shutdown()
+    assert pid != os.getpid()
+
+
+class CountingBot:
+    """ Remembers how often it was asked """
+
+    def __init__(self) -> None:
+        self.cnt_select = 0
+
+    def select_action(self, state, actions):
+        self.cnt_select += 1
+        return actions[self.cnt_select % len(actions)]
+
+
+@pytest.mark.parametrize("mode", ['thread', 'process'])
+def test_bot_state_kept_between_moves(mode):
+    executor = EngineExecutor(mode, cnt_workers=1)
+    bot = CountingBot()
+
+    async def main():
+        return [await executor.select_action('game', bot, None, ['a', 'b', 'c']) for _ in range(3)]
+
+    try:
+        actions = asyncio.run(main())
+    finally:
+        executor.shutdown()
+    assert actions == ['b', 'c', 'a'] and bot.cnt_select == 3
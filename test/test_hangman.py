@@ -0,0 +1,133 @@
+import math
+import random
+import string
+import pytest
+from server.py.hangman import (GamePhase, GuessLetterAction, Hangman, HangmanGameState, SolverPlayer, StructuredPlayer,
+                               WordIndex)
+
+WORDS = ['banana', 'bandana', 'cabana', 'havana', 'nirvana', 'python', 'devops', 'docker', 'rocket', 'pocket', 'locker']
+
+
+def play(player, word):
+    game = Hangman()
+    game.set_state(HangmanGameState(word_to_guess=word))
+    while game.get_state().phase != GamePhase.FINISHED:
+        game.apply_action(player.select_action(game.get_player_view(0), game.get_list_action()))
+    return game.get_state()
+
+
+def test_word_index():
+    index = WordIndex(WORDS + ['Banana'])
+    assert index.words[6] == ['BANANA', 'CABANA', 'HAVANA', 'PYTHON', 'DEVOPS', 'DOCKER', 'ROCKET', 'POCKET', 'LOCKER']
+    assert index.codes[6].shape == (9, 6)
+    assert list(index.codes[6][0]) == [1, 0, 13, 0, 13, 0]
+    assert index.masks[6][0] == (1 << 0) | (1 << 1) | (1 << 13)
+
+
+def test_word_index_filter():
+    index = WordIndex(WORDS)
+    candidates = index.candidates(6)
+    assert [index.words[6][idx] for idx in index.filter(6, candidates, 'O', [1])] == \
+           ['DOCKER', 'ROCKET', 'POCKET', 'LOCKER']
+    assert [index.words[6][idx] for idx in index.filter(6, candidates, 'A', [])] == \
+           ['PYTHON', 'DEVOPS', 'DOCKER', 'ROCKET', 'POCKET', 'LOCKER']
+    assert [index.words[6][idx] for idx in index.filter(6, candidates, 'A', [1, 3, 5])] == ['BANANA', 'CABANA', 'HAVANA']
+    assert len(index.filter(6, candidates, 'A', [1])) == 0
+
+
+def test_score_letters():
+    index = WordIndex(WORDS)
+    candidates = index.candidates(6)
+    scores = index.score_letters(6, candidates, 'OQ')
+    assert scores['Q'] == 0
+    # O splits 9 words into {BANANA CABANA HAVANA}, {PYTHON}, {DEVOPS}, {DOCKER ROCKET POCKET LOCKER}
+    assert scores['O'] == pytest.approx(-sum(cnt / 9 * math.log2(cnt / 9) for cnt in [3, 1, 1, 4]))
+
+
+@pytest.mark.parametrize("word", WORDS)
+def test_solver_wins_dictionary_words(word):
+    state = play(SolverPlayer(WORDS), word)
+    assert len(state.incorrect_guesses) <= 2
+
+
+def test_solver_reused_across_games():
+    player = SolverPlayer(WORDS)
+    for word in ['rocket', 'pocket', 'banana', 'rocket']:
+        state = play(player, word)
+        assert len(state.incorrect_guesses) <= 7
+
+
+def test_solver_unknown_word_falls_back():
+    player = SolverPlayer(WORDS)
+    state = play(player, 'zzz')
+    assert state.guesses[:3] == [*'ESI']
+    assert player.select_action(state, []) is None
+
+
+def test_solver_picks_from_actions():
+    player = SolverPlayer(WORDS)
+    state = HangmanGameState(word_to_guess='______', phase=GamePhase.RUNNING)
+    action = player.select_action(state, [GuessLetterAction(letter='x'), GuessLetterAction(letter='k')])
+    assert action.letter == 'K'
+
+
+def test_structured_player_order():
+    state = play(StructuredPlayer(), 'devops')
+    assert state.guesses[:3] == [*'ESI']
+
+
+def reference_state(word, guesses):
+    """ Masked word, incorrect guesses and finished flag as the list-based implementation computed them """
+    word = word.upper()
+    masked = ''.join(letter if letter in guesses else '_' for letter in word)
+    incorrect = [letter for letter in guesses if letter not in word]
+    finished = not set(word) - set(guesses) or len(set(guesses) - set(word)) > 7
+    return masked, incorrect, finished
+
+
+@pytest.mark.parametrize("word", ['devops', 'Xy', 'mississippi', 'ice-cream'])
+def test_incremental_state_matches_reference(word):
+    rng = random.Random(word)
+    for _ in range(20):
+        game = Hangman()
+        game.set_state(HangmanGameState(word_to_guess=word))
+        while game.get_state().phase != GamePhase.FINISHED:
+            game.apply_action(rng.choice(game.get_list_action()))
+            state = game.get_state()
+            masked, incorrect, finished = reference_state(word, state.guesses)
+            assert state.incorrect_guesses == incorrect
+            assert (state.phase == GamePhase.FINISHED) == finished
+            if not finished:
+                assert game.get_player_view(0).word_to_guess == masked
+
+
+def test_state_resyncs_when_fields_are_replaced():
+    state = HangmanGameState(word_to_guess='devops', guesses=[*'AD'], phase=GamePhase.RUNNING)
+    assert state.get_masked_state().word_to_guess == 'D_____'
+    assert state.get_masked_state().incorrect_guesses == ['A']
+    state.word_to_guess = 'ODD'
+    state.guesses = []
+    assert state.get_masked_state().word_to_guess == '___'
+    state.guesses.append('D')
+    assert state.get_masked_state().word_to_guess == '_DD'
+    state.apply_action(GuessLetterAction(letter='o'))
+    assert state.phase == GamePhase.FINISHED
+
+
+def test_list_action_uses_shared_actions():
+    game = Hangman()
+    game.set_state(HangmanGameState(word_to_guess='devops', guesses=[*'ABC']))
+    actions = game.get_list_action()
+    assert [action.letter for action in actions] == [*string.ascii_uppercase[3:]]
+    assert actions[0] is Hangman().get_list_action()[3]
+
+
+def test_score_letters_long_words():
+    words = ['A' * 60 + 'B', 'A' * 60 + 'C', 'B' + 'A' * 60]
+    index = WordIndex(words)
+    scores = index.score_letters(61, index.candidates(61), 'ABCZ')
+    assert scores['A'] == pytest.approx(0.918, abs=1e-3)  # BA..A differs from AA..AB and AA..AC
+    assert scores['B'] == pytest.approx(1.585, abs=1e-3)  # three different patterns (last, none, first)
+    assert scores['C'] == pytest.approx(0.918, abs=1e-3)
+    assert scores['Z'] == 0
+    assert play(SolverPlayer(words), words[2]).phase == GamePhase.FINISHED
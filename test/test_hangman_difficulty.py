@@ -0,0 +1,47 @@
+import csv
+import pytest
+from server.py.hangman import Hangman, RandomPlayer, SolverPlayer, StructuredPlayer
+from server.py.hangman_difficulty import load_player, make_player, play_word, run_benchmark, write_csv
+
+WORDS = ['BANANA', 'PYTHON', 'DEVOPS', 'DOCKER', 'ROCKET', 'JAZZ', 'QUIZ', 'RHYTHM', 'STAIRS', 'SENIOR']
+
+
+def test_make_player():
+    assert isinstance(make_player('structured', WORDS), StructuredPlayer)
+    solver = make_player('solver', WORDS)
+    assert isinstance(solver, SolverPlayer)
+    assert solver.index.words[6][0] == 'BANANA'
+    assert load_player('server.py.hangman:RandomPlayer') is RandomPlayer
+    with pytest.raises(ValueError):
+        load_player('nobody')
+
+
+def test_play_word():
+    result = play_word(Hangman(), StructuredPlayer(), 'STAIRS')
+    assert result.word == 'STAIRS'
+    assert (result.cnt_guess, result.cnt_incorrect, result.won) == (7, 2, True)  # E S I A R N T
+    result = play_word(Hangman(), StructuredPlayer(), 'JAZZ')
+    assert not result.won
+    assert result.cnt_incorrect == 8
+
+
+def test_run_benchmark_is_independent_of_chunks():
+    first = run_benchmark('random', WORDS, seed=3, cnt_workers=2, chunk_size=3)
+    second = run_benchmark('random', WORDS, seed=3, cnt_workers=1, chunk_size=10)
+    assert [r.word for r in first] == WORDS
+    assert [(r.cnt_guess, r.won) for r in first] == [(r.cnt_guess, r.won) for r in second]
+
+
+def test_solver_knows_every_word():
+    results = run_benchmark('solver', WORDS, cnt_workers=1)
+    assert all(r.won for r in results)
+
+
+def test_write_csv(tmp_path):
+    path = tmp_path / 'difficulty.csv'
+    write_csv(str(path), [play_word(Hangman(), StructuredPlayer(), word) for word in ['STAIRS', 'JAZZ']])
+    with open(path, encoding='utf-8') as file:
+        rows = list(csv.reader(file))
+    assert rows[0] == ['word', 'guesses', 'incorrect', 'won', 'seconds']
+    assert rows[1][:4] == ['STAIRS', '7', '2', '1']
+    assert rows[2][3] == '0'
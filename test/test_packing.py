@@ -0,0 +1,95 @@
+import json
+import random
+import pytest
+from fastapi.testclient import TestClient
+from server.py.packing import MAX_DEPTH, UnpackError, pack, unpack
+from server.py.delta import apply_patch
+from server.py.serialize import dump_view
+from server.py.uno import Uno, GameState
+
+
+@pytest.mark.parametrize("value, packed", [
+    (None, 'c0'), (False, 'c2'), (True, 'c3'),
+    (0, '00'), (127, '7f'), (128, 'cc80'), (256, 'cd0100'), (65536, 'ce00010000'), (2 ** 32, 'cf0000000100000000'),
+    (-1, 'ff'), (-32, 'e0'), (-33, 'd0df'), (-129, 'd1ff7f'), (-2 ** 31, 'd280000000'), (-2 ** 31 - 1, 'd3ffffffff7fffffff'),
+    (1.5, 'cb3ff8000000000000'),
+    ('', 'a0'), ('abc', 'a3616263'), ('a' * 32, 'd920' + '61' * 32), ('ä', 'a2c3a4'),
+    (b'\x01', 'c40101'),
+    ([], '90'), ([1, [2]], '92019102'), (list(range(16)), 'dc0010' + ''.join(f'{i:02x}' for i in range(16))),
+    ({'a': None}, '81a161c0'),
+])
+def test_pack_known_bytes(value, packed):
+    assert pack(value).hex() == packed
+    assert unpack(bytes.fromhex(packed)) == value
+
+
+def test_roundtrip_large_and_nested():
+    value = {'list': list(range(70000)), 'text': 'x' * 70000, 'nested': [{'k': [1.25, -7, 'ü']}] * 3, str(2 ** 64 - 1): 2 ** 64 - 1}
+    assert unpack(pack(value)) == value
+    assert unpack(pack((1, 2))) == [1, 2]
+
+
+def test_pack_errors():
+    with pytest.raises(TypeError):
+        pack({1, 2})
+    with pytest.raises(OverflowError):
+        pack(2 ** 64)
+    for data in [b'', b'\x92\x01', b'\xa3ab', b'\xc1', b'\x01\x02', b'\x81\x90\x01']:
+        with pytest.raises(UnpackError):
+            unpack(data)
+
+
+def test_unpack_depth_limit():
+    nested = None
+    for _ in range(MAX_DEPTH):
+        nested = [nested]
+    assert unpack(pack(nested)) == nested
+    for data in [pack([nested]), b'\x91' * 100000 + b'\xc0', b'\x81\xa1k' * 100000 + b'\xc0']:
+        with pytest.raises(UnpackError):
+            unpack(data)
+
+
+def test_uno_state_smaller_than_json():
+    random.seed(0)
+    game = Uno()
+    game.set_state(GameState(cnt_player=4))
+    message = {'type': 'update', 'seq': 1, 'state': dump_view(game.get_player_view(0), 0, game.get_list_action())}
+    assert unpack(pack(message)) == message
+    assert len(pack(message)) < 0.8 * len(json.dumps(message, separators=(',', ':')))
+
+
+def test_uno_websocket_msgpack_subprotocol():
+    from server.py.main import app  # pylint: disable = import-outside-toplevel
+    client = TestClient(app)
+    with client.websocket_connect("/uno/random_player/ws?player=random", subprotocols=['msgpack']) as websocket:
+        assert websocket.accepted_subprotocol == 'msgpack'
+        assert unpack(websocket.receive_bytes())['type'] == 'session'
+        state = None
+        for _ in range(200):
+            message = unpack(websocket.receive_bytes())
+            state = message['state'] if message['type'] == 'update' else apply_patch(state, message['ops'])
+            if state['phase'] == 'finished':
+                break
+            if state['list_action'] and state['idx_player_active'] == 0:
+                websocket.send_bytes(pack({'type': 'action', 'action': state['list_action'][0]}))
+        assert state['list_card_discard']
+
+    with client.websocket_connect("/uno/random_player/ws?player=random") as websocket:
+        assert websocket.accepted_subprotocol is None
+        assert websocket.receive_json()['type'] == 'session'
+
+
+def test_invalid_messages_close_the_websocket():
+    from server.py.main import app  # pylint: disable = import-outside-toplevel
+    client = TestClient(app)
+    for frame in [b'\x91' * 100000 + b'\xc0', b'\xc1', '{"type": ', '[' * 100000, '[1]', '{"action": null}']:
+        with client.websocket_connect("/uno/random_player/ws?player=random", subprotocols=['msgpack']) as websocket:
+            unpack(websocket.receive_bytes())  # session
+            if isinstance(frame, bytes):
+                websocket.send_bytes(frame)
+            else:
+                websocket.send_text(frame)
+            message = websocket.receive()
+            while message['type'] != 'websocket.close':
+                message = websocket.receive()
+            assert message['code'] == 1007
@@ -0,0 +1,267 @@
+import asyncio
+import time
+from typing import List, Optional
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+from server.py.executor import EngineExecutor, ExecutorBusy
+from server.py.game import Game, Player
+from server.py.rooms import GameRoom, RoomRegistry
+
+
+class StepAction(BaseModel):
+    step: int
+
+
+class CountState(BaseModel):
+    phase: str = 'running'
+    idx_player_active: int = 0
+    count: int = 0
+    list_hand: List[int] = [0, 0, 0, 0]
+
+
+class CountGame(Game):
+    """ Four seats take turns adding 1 or 2, whoever reaches the target ends the game """
+
+    def __init__(self, target: int = 12) -> None:
+        self.state = CountState()
+        self.target = target
+
+    def set_state(self, state: CountState) -> None:
+        self.state = state
+
+    def get_state(self) -> CountState:
+        return self.state
+
+    def print_state(self) -> None:
+        pass
+
+    def get_list_action(self) -> List[StepAction]:
+        return [StepAction(step=1), StepAction(step=2)]
+
+    def apply_action(self, action: Optional[StepAction]) -> None:
+        self.state.count += 0 if action is None else action.step
+        self.state.list_hand[self.state.idx_player_active] += 1
+        self.state.idx_player_active = (self.state.idx_player_active + 1) % 4
+        if self.state.count >= self.target:
+            self.state.phase = 'finished'
+
+    def get_player_view(self, idx_player: int) -> CountState:
+        return self.state.model_copy(update={'list_hand': [hand if idx == idx_player else -1 for idx, hand in enumerate(self.state.list_hand)]})
+
+
+class FirstBot(Player):
+
+    def select_action(self, state: CountState, actions: List[StepAction]) -> Optional[StepAction]:
+        return actions[0] if actions else None
+
+
+def new_room(target: int = 12, **options) -> GameRoom:
+    return GameRoom('room', 'count', CountGame(target), [FirstBot() for _ in range(4)], **options)
+
+
+async def wait_until(condition, timeout: float = 2.0) -> None:
+    for _ in range(int(timeout / 0.001)):
+        if condition():
+            return
+        await asyncio.sleep(0.001)
+    raise AssertionError("condition not reached")
+
+
+def test_human_and_bots_finish_game(fake_socket):
+    async def main():
+        room = new_room()
+        room.start()
+        socket = fake_socket()
+        idx_seat, _ = await room.join(socket)
+        assert idx_seat == 0
+        while not room.finished:
+            await wait_until(lambda: room.finished or room.pending is not None)
+            if room.pending is not None:
+                assert not room.submit(1, StepAction(step=2))  # not this seat's turn
+                assert not room.submit(0, StepAction(step=3))  # not allowed
+                assert room.submit(0, StepAction(step=2))
+                await asyncio.sleep(0)
+        await wait_until(lambda: socket.closed)
+        return room, socket
+
+    room, socket = asyncio.run(main())
+    assert socket.messages[0] == {'type': 'room', 'room_id': 'room', 'idx_seat': 0}
+    state = socket.get_state()
+    assert state['phase'] == 'finished' and state['count'] >= 12
+    assert state['list_hand'][0] > 0 and state['list_hand'][1:] == [-1, -1, -1]
+    assert state['idx_player_you'] == 0 and state['list_action'] == []
+    assert room.cnt_move == sum(room.game.get_state().list_hand)
+
+
+def test_slow_client_does_not_stall_the_room(fake_socket):
+    async def main():
+        room = new_room(target=200, turn_timeout=0, max_queue=2)
+        room.start()
+        slow, fast = fake_socket(delay=0.01), fake_socket()
+        await room.join(slow)
+        await room.join(fast)
+        await wait_until(lambda: room.finished)
+        assert not slow.closed  # the game ended long before the slow client got its messages
+        cnt_dropped = room.seats[0].connection.cnt_dropped
+        await wait_until(lambda: slow.closed and fast.closed)
+        return room, slow, fast, cnt_dropped
+
+    room, slow, fast, cnt_dropped = asyncio.run(main())
+    assert cnt_dropped > 0
+    assert len(slow.messages) < len(fast.messages)
+    final = room.dump_views([0, 1])
+    assert slow.get_state() == final[0] and fast.get_state() == final[1]
+
+
+def test_leaving_hands_the_turn_to_the_bot(fake_socket):
+    async def main():
+        room = new_room()
+        room.start()
+        socket = fake_socket()
+        _, connection = await room.join(socket, 0)
+        assert await room.join(fake_socket(), 0) is None  # seat taken
+        await wait_until(lambda: room.pending is not None)
+        room.leave(0, connection)
+        await wait_until(lambda: room.cnt_move == 1)
+        assert not room.is_attended() and not room.attended.is_set()
+        await asyncio.sleep(0.01)
+        assert room.cnt_move == 1  # nobody watches, the room pauses
+        idx_seat, _ = await room.join(fake_socket(), None)
+        await wait_until(lambda: room.pending is not None)
+        room.stop()
+        return idx_seat, room
+
+    idx_seat, room = asyncio.run(main())
+    assert idx_seat == 0 and room.game.get_state().idx_player_active == 0
+
+
+def test_busy_engine_keeps_the_human_action(fake_socket):
+    class BusyOnce(EngineExecutor):
+        """ Rejects the first apply_action call """
+
+        def __init__(self) -> None:
+            super().__init__(cnt_workers=1)
+            self.cnt_busy = 0
+
+        async def run(self, key, fn, *args, timeout=None):
+            if getattr(fn, '__name__', '') == 'apply_action' and self.cnt_busy == 0:
+                self.cnt_busy += 1
+                raise ExecutorBusy("busy")
+            return await super().run(key, fn, *args, timeout=timeout)
+
+    async def main():
+        engine = BusyOnce()
+        room = GameRoom('room', 'count', CountGame(), [FirstBot() for _ in range(4)], engine=engine)
+        room.start()
+        await room.join(fake_socket())
+        await wait_until(lambda: room.pending is not None)
+        assert room.submit(0, StepAction(step=2))
+        await wait_until(lambda: room.cnt_move == 4 and room.pending is not None)  # the human's turn again
+        room.stop()
+        engine.shutdown()
+        return engine, room
+
+    engine, room = asyncio.run(main())
+    assert engine.cnt_busy == 1
+    assert room.game.get_state().count == 2 + 3  # the human's step, not the bot's, and three bot steps
+
+
+def test_engine_timeout_ends_the_room(fake_socket):
+    class SlowGame(CountGame):
+
+        def apply_action(self, action: Optional[StepAction]) -> None:
+            time.sleep(0.05)
+            super().apply_action(action)
+
+    async def main():
+        engine = EngineExecutor(cnt_workers=1, timeout=0.01)
+        room = GameRoom('room', 'count', SlowGame(), [FirstBot() for _ in range(4)], engine=engine, turn_timeout=0)
+        room.start()
+        player, spectator = fake_socket(), fake_socket()
+        await room.join(player)
+        await room.watch(spectator)
+        await wait_until(lambda: player.closed and spectator.closed)
+        await wait_until(lambda: engine.cnt_pending == 0)  # the call that timed out is done
+        late = fake_socket()
+        await room.join(late)
+        await wait_until(lambda: late.closed)
+        engine.shutdown()
+        return room, player, spectator, late
+
+    room, player, spectator, late = asyncio.run(main())
+    assert room.finished and room.cnt_move == 0
+    assert player.code == spectator.code == late.code == 1011
+
+
+def test_registry_evicts_finished_and_idle_rooms(fake_socket):
+    class Clock:
+        now = 0.0
+
+        def __call__(self) -> float:
+            return self.now
+
+    async def main():
+        clock = Clock()
+        registry = RoomRegistry(ttl=10, clock=clock)
+        idle = registry.create('count', CountGame(), [FirstBot() for _ in range(4)])
+        done = registry.create('count', CountGame(), [FirstBot() for _ in range(4)])
+        socket = fake_socket()
+        _, connection = await done.join(socket)
+        done.turn_timeout = 0
+        await wait_until(lambda: done.finished)
+        done.leave(0, connection)
+        assert registry.get(done.room_id, 'count') is None
+        assert registry.get(idle.room_id, 'dog') is None
+        assert registry.get(idle.room_id, 'count') is idle
+        clock.now = 11
+        assert registry.evict() == 1
+        return registry.stats()
+
+    assert asyncio.run(main()) == {'live': 0, 'attended': 0, 'humans': 0, 'spectators': 0, 'created': 2, 'evicted': 2}
+
+
+def test_registry_keeps_idle_rooms_by_last_access(fake_socket):
+    class Clock:
+        now = 0.0
+
+        def __call__(self) -> float:
+            return self.now
+
+    async def main():
+        clock = Clock()
+        registry = RoomRegistry(ttl=10, max_rooms=3, clock=clock)
+        rooms = []
+        for now in range(3):
+            clock.now = now
+            rooms.append(registry.create('count', CountGame(), [FirstBot() for _ in range(4)]))
+        clock.now = 3
+        _, connection = await rooms[0].join(fake_socket())
+        assert list(registry.idle.values()) == rooms[1:]  # rooms with a client are never evicted
+        clock.now = 11.5
+        assert registry.evict() == 1 and list(registry.rooms.values()) == [rooms[0], rooms[2]]
+        rooms[0].leave(0, connection)
+        assert list(registry.idle.values()) == [rooms[2], rooms[0]]
+        rooms.append(registry.create('count', CountGame(), [FirstBot() for _ in range(4)]))
+        rooms.append(registry.create('count', CountGame(), [FirstBot() for _ in range(4)]))
+        assert registry.evict() == 1  # over max_rooms, the least recently used goes
+        return registry, rooms
+
+    registry, rooms = asyncio.run(main())
+    assert list(registry.rooms.values()) == [rooms[0], rooms[3], rooms[4]]
+
+
+def test_dog_room_websocket():
+    from server.py.main import app, dog_rooms  # pylint: disable = import-outside-toplevel
+    with TestClient(app) as client:
+        with client.websocket_connect("/dog/room/ws") as first:
+            room = first.receive_json()
+            assert room['type'] == 'room' and room['idx_seat'] == 0
+            with client.websocket_connect(f"/dog/room/ws?room_id={room['room_id']}&seat=2", subprotocols=['msgpack']) as second:
+                assert second.accepted_subprotocol == 'msgpack'
+                state = first.receive_json()['state']
+                assert state['idx_player_you'] == 0
+                assert all(card == {'suit': '', 'rank': 'BCK'} for card in state['list_player'][1]['list_card'])
+                assert state['list_player'][0]['list_card'][0]['rank'] != 'BCK'
+                assert dog_rooms.rooms[room['room_id']].stats()['humans'] == 2
+            with client.websocket_connect(f"/dog/room/ws?room_id={room['room_id']}&seat=0") as third:
+                assert third.receive() == {'type': 'websocket.close', 'code': 4003, 'reason': ''}  # seat 0 is still taken
@@ -0,0 +1,38 @@
+import json
+import random
+from server.py import battleship, hangman, uno
+from server.py.serialize import dump_actions, dump_state, dump_view, get_constants, to_text
+
+
+def test_dump_state_matches_model_dump():
+    game = uno.Uno()
+    game.set_state(uno.GameState(cnt_player=2))
+    state = game.get_player_view(0)
+    dict_state = dump_state(state)
+    assert dict_state == json.loads(state.model_dump_json())
+    assert list(dict_state) == list(uno.GameState.model_fields)
+
+
+def test_constants_are_shared():
+    first, second = dump_state(uno.GameState(cnt_player=2)), dump_state(uno.GameState(cnt_player=3))
+    assert first['LIST_COLOR'] is second['LIST_COLOR'] is get_constants(uno.GameState())['LIST_COLOR']
+    assert first is not second and first['cnt_player'] == 2
+
+
+def test_dump_actions_json_mode():
+    random.seed(0)
+    game = battleship.Battleship()
+    list_action = game.get_list_action()
+    assert dump_actions(list_action) == [json.loads(action.model_dump_json()) for action in list_action]
+    assert type(dump_actions(list_action)[0]['action_type']) is str  # not the enum
+    assert not dump_actions([])
+
+
+def test_dump_view_and_text():
+    game = hangman.Hangman()
+    game.set_state(hangman.HangmanGameState(word_to_guess='devops', phase=hangman.GamePhase.RUNNING))
+    dict_state = dump_view(game.get_player_view(0), 0, game.get_list_action()[:2])
+    assert dict_state['idx_player_you'] == 0
+    assert dict_state['list_action'] == [{'letter': 'A'}, {'letter': 'B'}]
+    text = to_text({'type': 'update', 'state': dict_state})
+    assert json.loads(text) == {'type': 'update', 'state': dict_state}
@@ -0,0 +1,182 @@
+import asyncio
+import json
+import threading
+import time
+import pytest
+from fastapi.testclient import TestClient
+from server.py.delta import apply_patch
+from server.py.executor import EngineExecutor
+from server.py.hangman import Hangman, HangmanGameState
+from server.py.sessions import SessionRegistry
+
+
+class Clock:
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def new_game(word='devops'):
+    game = Hangman()
+    game.set_state(HangmanGameState(word_to_guess=word))
+    return game
+
+
+def test_create_and_resume(clock):
+    registry = SessionRegistry(clock=clock)
+    session = registry.create('hangman', new_game(), player='bot')
+    assert session.context == {'player': 'bot'}
+    assert registry.resume(session.game_id, 'hangman') is session
+    assert registry.resume(session.game_id, 'battleship') is None
+    assert registry.resume('unknown', 'hangman') is None
+    assert registry.resume(None, 'hangman') is None
+    assert registry.get(session.game_id, 'hangman') is session
+    assert registry.get(session.game_id, 'battleship') is None
+    assert registry.stats() == {'live': 1, 'attached': 0, 'bytes': 0, 'created': 1, 'resumed': 1, 'evicted': 0, 'spectators': 0}
+
+
+def test_attach_returns_previous_connection(clock):
+    registry = SessionRegistry(clock=clock)
+    session = registry.create('hangman', new_game())
+    assert registry.attach(session, 'ws1') is None
+    assert registry.attach(session, 'ws2') == 'ws1'
+    registry.detach(session, 'ws1')
+    assert session.connection == 'ws2' and session.is_attached()
+    registry.detach(session, 'ws2')
+    assert session.connection is None and not session.is_attached()
+    assert session.size == registry.cnt_bytes > 0
+
+
+def test_ttl_eviction_skips_attached(clock):
+    registry = SessionRegistry(ttl=10, clock=clock)
+    idle = registry.create('hangman', new_game())
+    busy = registry.create('hangman', new_game())
+    registry.attach(busy, 'ws')
+    clock.now = 5
+    fresh = registry.create('hangman', new_game())
+    clock.now = 11
+    assert registry.evict() == 1
+    assert list(registry.sessions) == [busy.game_id, fresh.game_id]
+    assert registry.resume(idle.game_id, 'hangman') is None
+    assert registry.stats()['evicted'] == 1
+
+
+def test_lru_eviction_by_count_and_bytes(clock):
+    registry = SessionRegistry(max_sessions=2, clock=clock)
+    first, second = registry.create('hangman', new_game()), registry.create('hangman', new_game())
+    registry.resume(first.game_id, 'hangman')  # second is now least recently used
+    third = registry.create('hangman', new_game())
+    registry.evict()
+    assert list(registry.sessions) == [first.game_id, third.game_id]
+
+    registry = SessionRegistry(clock=clock)
+    sessions = [registry.create('hangman', new_game()) for _ in range(3)]
+    for session in sessions:
+        registry.attach(session, 'ws')
+        registry.detach(session, 'ws')
+    registry.max_bytes = 2 * sessions[0].size
+    assert registry.evict() == 1
+    assert list(registry.sessions) == [session.game_id for session in sessions[1:]]
+    assert registry.cnt_bytes == 2 * sessions[0].size
+
+
+def test_hangman_websocket_resume():
+    from server.py.main import app, sessions  # pylint: disable = import-outside-toplevel
+    client = TestClient(app)
+    with client.websocket_connect("/hangman/singleplayer/ws") as websocket:
+        hello = websocket.receive_json()
+        assert hello['type'] == 'session' and not hello['resumed']
+        websocket.receive_json()
+        websocket.send_json({'type': 'action', 'action': {'letter': 'e'}})
+        websocket.receive_json()
+    game_id = hello['game_id']
+    assert not sessions.sessions[game_id].is_attached()
+
+    with client.websocket_connect(f"/hangman/singleplayer/ws?game_id={game_id}") as websocket:
+        hello = websocket.receive_json()
+        assert hello == {'type': 'session', 'game_id': game_id, 'resumed': True}
+        assert websocket.receive_json()['state']['guesses'] == ['E']
+    assert sessions.stats()['resumed'] >= 1
+
+
+def test_stale_connection_does_not_play_the_bot(monkeypatch):
+    import server.py.main as main  # pylint: disable = import-outside-toplevel
+    taken_over = []
+
+    async def bot_select(key, player, state, list_action):
+        # the client resumes on another connection while the bot thinks
+        session = main.sessions.sessions[key]
+        taken_over.append(session.game.get_state().model_copy(deep=True))
+        previous, session.connection = session.connection, object()
+        await previous.close(code=4000)
+        return list_action[0]
+
+    monkeypatch.setattr(main, 'bot_select', bot_select)
+    with TestClient(main.app) as client:
+        with client.websocket_connect("/battleship/singleplayer/ws") as websocket:
+            game_id = websocket.receive_json()['game_id']
+            message, state = websocket.receive(), None
+            while message['type'] != 'websocket.close':
+                data = json.loads(message['text'])
+                state = data['state'] if data['type'] == 'update' else apply_patch(state, data['ops'])
+                if state['list_action']:
+                    websocket.send_json({'type': 'action', 'action': state['list_action'][0]})
+                message = websocket.receive()
+    assert message['code'] == 4000
+    assert main.sessions.sessions[game_id].game.get_state() == taken_over[0]
+
+
+def test_engine_timeout_closes_the_connection(monkeypatch):
+    import server.py.main as main  # pylint: disable = import-outside-toplevel
+    get_view = main.get_view
+
+    def slow_view(game, idx_player):
+        time.sleep(0.05)
+        return get_view(game, idx_player)
+
+    engine = EngineExecutor(cnt_workers=1, timeout=0.01)
+    monkeypatch.setattr(main, 'engine', engine)
+    monkeypatch.setattr(main, 'get_view', slow_view)
+    with TestClient(main.app) as client:
+        with client.websocket_connect("/hangman/singleplayer/ws") as websocket:
+            game_id = websocket.receive_json()['game_id']
+            assert websocket.receive() == {'type': 'websocket.close', 'code': 1013, 'reason': ''}
+    engine.shutdown()
+    assert not main.sessions.sessions[game_id].is_attached()
+
+
+def test_uno_bad_player_count_falls_back_to_default():
+    from server.py.main import app, sessions  # pylint: disable = import-outside-toplevel
+    with TestClient(app) as client:
+        with client.websocket_connect("/uno/random_player/ws?player=random&cnt_player=abc") as websocket:
+            game_id = websocket.receive_json()['game_id']
+            assert sessions.sessions[game_id].game.get_state().cnt_player == 2
+
+
+def test_close_session_measures_on_the_engine_worker(monkeypatch):
+    import server.py.main as main  # pylint: disable = import-outside-toplevel
+    threads = []
+
+    def get_state_size(session):
+        threads.append(threading.current_thread().name)
+        return 123
+
+    registry = SessionRegistry()
+    monkeypatch.setattr(main, 'sessions', registry)
+    monkeypatch.setattr(main, 'get_state_size', get_state_size)
+    session = registry.create('hangman', Hangman())
+    registry.attach(session, 'first')
+    registry.attach(session, 'second')
+    asyncio.run(main.close_session(session, 'first'))
+    assert threads == [] and session.is_attached()  # still played on the second connection
+    asyncio.run(main.close_session(session, 'second'))
+    assert session.size == registry.cnt_bytes == 123
+    assert threads[0].startswith('engine')
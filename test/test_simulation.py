@@ -0,0 +1,81 @@
+import copy
+import json
+import random
+from fastapi.testclient import TestClient
+from server.py.battleship import Battleship, BattleshipAction, RandomPlayer
+from server.py.delta import apply_patch
+from server.py.serialize import dump_view
+from server.py.simulation import Simulation
+
+
+def new_simulation(**options):
+    return Simulation(Battleship(), [RandomPlayer(), RandomPlayer()], **options)
+
+
+def replay(frames):
+    states = []
+    for frame in frames:
+        states.append(frame['state'] if frame['type'] == 'update' else apply_patch(copy.deepcopy(states[-1]), frame['ops']))
+    return states
+
+
+def test_frames_replay_the_game():
+    random.seed(3)
+    simulation = new_simulation()
+    frames = []
+    while not simulation.finished:
+        batch = simulation.next_batch(25)
+        assert 0 < len(batch) <= 25
+        frames.extend(batch)
+    assert simulation.next_batch(25) == []
+    assert [frame['seq'] for frame in frames] == list(range(1, len(frames) + 1))
+
+    states = replay(frames)
+    game = Battleship()
+    for state in states:
+        action = state.pop('selected_action')
+        assert state == dump_view(game.get_state(), 0, [])
+        if action is not None:
+            game.apply_action(BattleshipAction.model_validate(action))
+    assert action is None and states[-1]['phase'] == 'finished'
+
+
+def test_skip_ends_in_the_same_state():
+    random.seed(5)
+    frames = []
+    simulation = new_simulation()
+    while not simulation.finished:
+        frames.extend(simulation.next_batch(100))
+    random.seed(5)
+    skipped = new_simulation()
+    frame = skipped.skip()
+    assert skipped.finished and skipped.cnt_frame == len(frames)
+    assert frame['type'] == 'update' and frame['state'] == replay(frames)[-1]
+
+
+def test_max_frames_cuts_off():
+    simulation = new_simulation(max_frames=5)
+    frames = simulation.next_batch(10)
+    assert len(frames) == 5 and simulation.finished
+    assert replay(frames)[-1]['selected_action'] is None
+
+
+def test_battleship_simulation_websocket():
+    from server.py.main import app  # pylint: disable = import-outside-toplevel
+    client = TestClient(app)
+    frames = []
+    with client.websocket_connect("/battleship/simulation/ws?rate=40") as websocket:
+        while True:
+            message = websocket.receive()
+            if message['type'] == 'websocket.close':
+                break
+            data = json.loads(message['text'])
+            assert data['type'] == 'frames' and data['rate'] == 40 and len(data['frames']) <= 40
+            frames.extend(data['frames'])
+    assert replay(frames)[-1]['phase'] == 'finished'
+
+    with client.websocket_connect("/battleship/simulation/ws?skip=1") as websocket:
+        data = websocket.receive_json()
+        assert data['rate'] == 10 and len(data['frames']) == 1
+        assert data['frames'][0]['state']['phase'] == 'finished'
+        assert websocket.receive()['type'] == 'websocket.close'
@@ -0,0 +1,165 @@
+import asyncio
+import json
+import random
+from fastapi.testclient import TestClient
+import server.py.spectators as spectators
+from server.py.packing import unpack
+from server.py.spectators import CLOSE_TOO_SLOW, SpectatorHub, dump_public_view
+from server.py.battleship import Battleship, RandomPlayer as BattleshipPlayer
+from server.py.dog import Dog
+from server.py.hangman import Hangman, HangmanGameState
+from server.py.uno import Uno, GameState as UnoGameState
+
+
+def new_state(count):
+    return {'count': count, 'list_card': [{'rank': 'BCK'}] * 5, 'idx_player_you': -1, 'list_action': []}
+
+
+async def settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+def test_frames_are_rendered_once_and_shared(monkeypatch, fake_socket):
+    rendered = []
+    render_once = spectators.render
+
+    def render(message, subprotocol):
+        rendered.append(subprotocol)
+        return render_once(message, subprotocol)
+
+    monkeypatch.setattr(spectators, 'render', render)
+
+    async def main():
+        hub = SpectatorHub()
+        hub.publish(new_state(0))
+        sockets = [fake_socket() for _ in range(5)] + [fake_socket('msgpack'), fake_socket('msgpack')]
+        for socket in sockets:
+            hub.join(socket)
+        for count in range(1, 4):
+            hub.publish(new_state(count))
+        hub.publish(new_state(3))  # unchanged, nothing to send
+        await settle()
+        return hub, sockets
+
+    hub, sockets = asyncio.run(main())
+    assert sorted(rendered, key=str) == [None] * 4 + ['msgpack'] * 4
+    for socket in sockets:
+        assert len(socket.frames) == 4
+        assert all(frame is first for frame, first in zip(socket.frames, sockets[0 if socket.scope['subprotocols'] == [] else -1].frames))
+        assert socket.messages == sockets[0].messages
+        assert socket.get_state() == new_state(3)
+    assert hub.stats() == {'spectators': 7, 'published': 3, 'dropped': 0}
+
+
+def test_slow_spectator_is_dropped(fake_socket):
+    async def main():
+        hub = SpectatorHub(max_queue=2)
+        slow, fast = fake_socket(blocked=True), fake_socket()
+        hub.publish(new_state(0))
+        hub.join(slow)
+        hub.join(fast)
+        for count in range(1, 6):
+            hub.publish(new_state(count))
+            await settle()
+        slow.unblocked.set()
+        await settle()
+        return hub, slow, fast
+
+    hub, slow, fast = asyncio.run(main())
+    assert slow.code == CLOSE_TOO_SLOW and len(slow.frames) <= 1
+    assert fast.code is None and len(fast.frames) == 6 and fast.get_state() == new_state(5)
+    assert hub.stats() == {'spectators': 1, 'published': 5, 'dropped': 1}
+
+
+def test_late_spectators_start_from_a_snapshot(fake_socket):
+    async def main():
+        hub = SpectatorHub()
+        first, second, third = fake_socket(), fake_socket(), fake_socket()
+        hub.publish(new_state(0))
+        spectator = hub.join(first)
+        hub.publish(new_state(1))
+        hub.join(second)
+        hub.publish(new_state(2))
+        hub.resync(spectator)
+        await settle()
+        hub.leave(spectator)
+        hub.publish(new_state(3))
+        hub.finish()
+        hub.join(third)
+        await settle()
+        return first, second, third
+
+    first, second, third = asyncio.run(main())
+    assert [message['type'] for message in first.messages] == ['update', 'patch', 'patch', 'update']
+    assert first.get_state() == new_state(2) and first.code is None
+    assert [message['type'] for message in second.messages] == ['update', 'patch', 'patch']
+    assert [message['seq'] for message in second.messages] == [2, 3, 4]
+    assert second.get_state() == new_state(3) and second.code == 1000
+    assert third.messages == [{'type': 'update', 'seq': 4, 'state': new_state(3)}] and third.code == 1000
+
+
+def test_public_views_hide_every_hand():
+    random.seed(1)
+    game = Battleship()
+    player = BattleshipPlayer()
+    for _ in range(30):
+        game.apply_action(player.select_action(game.get_state(), game.get_list_action()))
+    view = dump_public_view(game)
+    assert view['idx_player_you'] == -1 and view['list_action'] == []
+    assert [len(player['ships']) for player in view['players']] == [0, 0]
+    assert len(view['players'][0]['shots']) == len(game.get_state().players[0].shots)
+
+    game = Uno()
+    game.set_state(UnoGameState(cnt_player=3))
+    view = dump_public_view(game)
+    assert all(card == {'color': None, 'number': None, 'symbol': None} for player in view['list_player'] for card in player['list_card'])
+
+    game = Dog()
+    view = dump_public_view(game)
+    assert all(card == {'suit': '', 'rank': 'BCK'} for player in view['list_player'] for card in player['list_card'])
+    assert len(view['list_player'][0]['list_card']) > 0
+
+    game = Hangman()
+    game.set_state(HangmanGameState(word_to_guess='devops'))
+    assert 'devops' not in json.dumps(dump_public_view(game)).lower()
+
+
+def test_uno_public_view_hides_the_draw_pile():
+    game = Uno()
+    game.set_state(UnoGameState(cnt_player=2))
+    view = dump_public_view(game)
+    assert len(view['list_card_draw']) == len(game.get_state().list_card_draw) > 0
+    assert all(card == {'color': None, 'number': None, 'symbol': None} for card in view['list_card_draw'])
+
+
+def test_spectate_uno_session():
+    from server.py.main import app  # pylint: disable = import-outside-toplevel
+    with TestClient(app) as client:
+        with client.websocket_connect("/uno/random_player/ws?player=random") as player:
+            game_id = player.receive_json()['game_id']
+            state = player.receive_json()['state']
+            with client.websocket_connect(f"/uno/spectate/ws?game_id={game_id}") as spectator:
+                view = spectator.receive_json()
+                assert view['type'] == 'update' and view['state']['idx_player_you'] == -1
+                assert view['state']['list_card_discard'] == state['list_card_discard']
+                assert all(card['color'] is None for player_state in view['state']['list_player'] for card in player_state['list_card'])
+                assert all(card['color'] is None and card['number'] is None for card in view['state']['list_card_draw'])
+                player.send_json({'type': 'action', 'action': state['list_action'][0]})
+                patch = spectator.receive_json()
+                assert patch['type'] == 'patch' and patch['seq'] == view['seq'] + 1
+                assert client.get("/sessions/stats").json()['spectators'] == 1
+        with client.websocket_connect("/uno/spectate/ws?game_id=unknown") as spectator:
+            assert spectator.receive() == {'type': 'websocket.close', 'code': 4004, 'reason': ''}
+
+
+def test_spectate_dog_room():
+    from server.py.main import app  # pylint: disable = import-outside-toplevel
+    with TestClient(app) as client:
+        with client.websocket_connect("/dog/room/ws") as player:
+            room_id = player.receive_json()['room_id']
+            with client.websocket_connect(f"/dog/spectate/ws?room_id={room_id}", subprotocols=['msgpack']) as spectator:
+                view = unpack(spectator.receive_bytes())
+                assert view['type'] == 'update' and view['state']['idx_player_you'] == -1
+                assert all(card['rank'] == 'BCK' for player_state in view['state']['list_player'] for card in player_state['list_card'])
+                assert client.get("/sessions/stats").json()['dog_rooms']['spectators'] == 1
@@ -0,0 +1,300 @@
+import random
+import pytest
+from server.py.uno import Uno, Card, Action, PlayerState, GameState, GamePhase, RuleSet, RandomPlayer, compile_rules, cnt_deck_for
+from server.py.uno import HeuristicPlayer, SamplingPlayer, clone_state
+
+
+def make_state(hand, top, cnt_to_draw=0, has_drawn=False, other_hand=None, color=None):
+    other = other_hand if other_hand is not None else [Card(color='green', number=2), Card(color='green', number=3)]
+    return GameState(
+        cnt_player=2,
+        list_card_draw=[Card(color='yellow', number=n) for n in range(10)],
+        list_card_discard=[top],
+        list_player=[PlayerState(name='Player 1', list_card=hand), PlayerState(name='Player 2', list_card=other)],
+        phase=GamePhase.RUNNING,
+        idx_player_active=0,
+        color=color if color is not None else top.color,
+        cnt_to_draw=cnt_to_draw,
+        has_drawn=has_drawn
+    )
+
+
+@pytest.fixture
+def game():
+    return Uno()
+
+
+def test_rules_compiled_once_per_ruleset():
+    assert compile_rules(RuleSet()) is compile_rules(RuleSet())
+    assert compile_rules(RuleSet(stacking=False)) is not compile_rules(RuleSet())
+    assert Uno().rules_compiled is Uno().rules_compiled
+
+
+def test_number_card_actions(game):
+    hand = [Card(color='red', number=3), Card(color='blue', number=5), Card(color='green', number=1)]
+    game.set_state(make_state(hand, Card(color='red', number=5)))
+    actions = game.get_list_action()
+    assert actions == sorted([
+        Action(card=hand[0], color='red'),
+        Action(card=hand[1], color='blue'),
+        Action(draw=1),
+    ])
+
+
+def test_wild_cards_choose_color(game):
+    hand = [Card(color='any', symbol='wild'), Card(color='any', symbol='wilddraw4'), Card(color='blue', number=5)]
+    game.set_state(make_state(hand, Card(color='red', number=1)))
+    actions = game.get_list_action()
+    assert {a.color for a in actions if a.card and a.card.symbol == 'wild'} == {'red', 'green', 'yellow', 'blue'}
+    # wilddraw4 is not allowed while another card can be played
+    assert not [a for a in actions if a.card and a.card.symbol == 'wilddraw4']
+
+
+def test_uno_call_actions_for_second_last_card(game):
+    hand = [Card(color='red', number=3), Card(color='blue', number=5)]
+    game.set_state(make_state(hand, Card(color='red', number=1)))
+    actions = game.get_list_action()
+    assert Action(card=hand[0], color='red', uno=True) in actions
+    assert Action(card=hand[0], color='red', uno=False) in actions
+
+
+def test_after_draw_no_second_draw(game):
+    hand = [Card(color='blue', number=3)]
+    game.set_state(make_state(hand, Card(color='red', number=1), has_drawn=True))
+    assert game.get_list_action() == [Action(draw=1)]
+    hand = [Card(color='red', number=3), Card(color='blue', number=3)]
+    game.set_state(make_state(hand, Card(color='red', number=1), has_drawn=True))
+    assert Action(draw=1) not in game.get_list_action()
+
+
+def test_stacking_draw2(game):
+    hand = [Card(color='red', symbol='draw2'), Card(color='red', number=1), Card(color='blue', number=7)]
+    game.set_state(make_state(hand, Card(color='green', symbol='draw2'), cnt_to_draw=2))
+    assert game.get_list_action() == sorted([Action(card=hand[0], color='red', draw=4), Action(draw=2)])
+
+
+def test_stacking_disabled(game):
+    game = Uno(RuleSet(stacking=False))
+    hand = [Card(color='red', symbol='draw2'), Card(color='red', number=1), Card(color='blue', number=7)]
+    game.set_state(make_state(hand, Card(color='green', symbol='draw2'), cnt_to_draw=2))
+    assert game.get_list_action() == [Action(draw=2)]
+    game.set_state(make_state(hand, Card(color='green', symbol='draw2'), cnt_to_draw=4))
+    assert game.get_list_action() == [Action(draw=4)]
+
+
+def test_apply_draw2_two_players(game):
+    hand = [Card(color='red', symbol='draw2'), Card(color='red', number=1), Card(color='blue', number=7)]
+    game.set_state(make_state(hand, Card(color='red', number=5)))
+    game.apply_action(Action(card=hand[0], color='red', draw=2))
+    state = game.get_state()
+    assert state.cnt_to_draw == 2
+    assert state.idx_player_active == 1
+    game.apply_action(Action(draw=2))
+    assert len(state.list_player[1].list_card) == 4
+    assert state.cnt_to_draw == 0
+
+
+def test_apply_reverse_and_skip(game):
+    hand = [Card(color='red', symbol='reverse'), Card(color='red', symbol='skip'), Card(color='blue', number=7)]
+    game.set_state(make_state(hand, Card(color='red', number=5)))
+    game.apply_action(Action(card=hand[0], color='red'))
+    assert game.get_state().direction == -1
+    game.apply_action(Action(card=Card(color='red', symbol='skip'), color='red'))
+    assert game.get_state().idx_player_active == 0
+
+
+def test_missed_uno_penalty(game):
+    hand = [Card(color='red', number=3), Card(color='blue', number=5)]
+    game.set_state(make_state(hand, Card(color='red', number=1)))
+    game.apply_action(Action(card=hand[0], color='red'))
+    assert len(game.get_state().list_player[0].list_card) == 5
+
+
+def test_game_finished(game):
+    hand = [Card(color='red', number=3)]
+    game.set_state(make_state(hand, Card(color='red', number=1)))
+    game.apply_action(Action(card=hand[0], color='red'))
+    assert game.get_state().phase == GamePhase.FINISHED
+    assert game.get_list_action() == []
+
+
+def test_jump_in_disabled_by_default(game):
+    other = [Card(color='red', number=1), Card(color='green', number=4), Card(color='green', number=5)]
+    game.set_state(make_state([Card(color='blue', number=2)], Card(color='red', number=1), other_hand=other))
+    assert game.get_list_action_jump_in(1) == []
+
+
+def test_jump_in_identical_card():
+    game = Uno(RuleSet(jump_in=True))
+    other = [Card(color='red', number=1), Card(color='green', number=4), Card(color='green', number=5)]
+    hand = [Card(color='blue', number=2), Card(color='blue', number=3)]
+    game.set_state(make_state(hand, Card(color='red', number=1), other_hand=other))
+    assert game.get_list_action_jump_in(0) == []
+    actions = game.get_list_action_jump_in(1)
+    assert actions == [Action(card=Card(color='red', number=1), color='red')]
+    game.apply_action_jump_in(1, actions[0])
+    state = game.get_state()
+    assert state.list_card_discard[-1] == Card(color='red', number=1)
+    assert len(state.list_player[1].list_card) == 2
+    assert state.idx_player_active == 0
+    with pytest.raises(ValueError):
+        game.apply_action_jump_in(1, Action(card=Card(color='green', number=4), color='green'))
+
+
+def test_random_games_finish_or_run():
+    player = RandomPlayer()
+    for _ in range(20):
+        game = Uno()
+        game.set_state(GameState(cnt_player=3))
+        for _ in range(200):
+            actions = game.get_list_action()
+            if not actions:
+                break
+            game.apply_action(player.select_action(game.get_state(), actions))
+        assert game.get_state().phase in (GamePhase.RUNNING, GamePhase.FINISHED)
+
+
+@pytest.mark.parametrize("cnt_player, cnt_deck", [(2, 1), (7, 1), (8, 2), (15, 2), (16, 3), (20, 3)])
+def test_multi_deck_tables(cnt_player, cnt_deck):
+    assert cnt_deck_for(cnt_player) == cnt_deck
+    random.seed(cnt_player)  # the shuffle decides the start card, do not depend on earlier tests
+    game = Uno()
+    game.set_state(GameState(cnt_player=cnt_player))
+    state = game.get_state()
+    cnt_cards = len(state.list_card_draw) + len(state.list_card_discard)
+    cnt_cards += sum(len(p.list_card) for p in state.list_player)
+    assert cnt_cards == 108 * cnt_deck
+    assert all(len(p.list_card) == state.CNT_HAND_CARDS for p in state.list_player)
+
+
+def test_wilddraw4_start_card_goes_back_into_the_pile():
+    draw = [Card(color='red', number=n) for n in range(9)] + [Card(color='any', symbol='wilddraw4')]
+    hands = [PlayerState(name=f'Player {i + 1}', list_card=[Card(color='blue', number=1)] * 7) for i in range(2)]
+    game = Uno()
+    game.set_state(GameState(cnt_player=2, list_card_draw=draw, list_player=hands))
+    state = game.get_state()
+    assert state.list_card_discard == [Card(color='red', number=8)]
+    assert state.list_card_draw[0].symbol == 'wilddraw4' and len(state.list_card_draw) == 9
+
+
+@pytest.mark.parametrize("cnt_player", [1, 21])
+def test_player_count_out_of_range(cnt_player):
+    with pytest.raises(ValueError):
+        Uno().set_state(GameState(cnt_player=cnt_player))
+
+
+def test_discard_pile_recycled(game):
+    hand = [Card(color='blue', number=3), Card(color='blue', number=4), Card(color='blue', number=5)]
+    state = make_state(hand, Card(color='red', number=1))
+    state.list_card_draw = []
+    state.list_card_discard = [Card(color='green', number=n) for n in range(5)] + [Card(color='red', number=1)]
+    game.set_state(state)
+    game.apply_action(Action(draw=1))
+    state = game.get_state()
+    assert len(state.list_player[0].list_card) == 4
+    assert state.list_card_discard == [Card(color='red', number=1)]
+    assert len(state.list_card_draw) == 4
+
+
+def test_turn_passes_after_unplayable_draw(game):
+    hand = [Card(color='blue', number=3)]
+    state = make_state(hand, Card(color='red', number=1))
+    state.list_card_draw = [Card(color='green', number=7)]
+    game.set_state(state)
+    game.apply_action(Action(draw=1))
+    assert game.get_state().idx_player_active == 1
+
+
+def test_draw2_top_after_cards_drawn(game):
+    hand = [Card(color='green', number=3), Card(color='blue', number=3)]
+    game.set_state(make_state(hand, Card(color='green', symbol='draw2'), cnt_to_draw=0))
+    assert Action(card=hand[0], color='green') in game.get_list_action()
+
+
+def test_player_view_keeps_real_hands(game):
+    game.set_state(GameState(cnt_player=3))
+    hands = [list(p.list_card) for p in game.get_state().list_player]
+    view = game.get_player_view(0)
+    assert view.list_player[0].list_card == hands[0]
+    assert all(card == Card() for card in view.list_player[1].list_card)
+    assert [p.list_card for p in game.get_state().list_player] == hands
+
+
+def test_player_view_hides_the_draw_pile(game):
+    game.set_state(GameState(cnt_player=3))
+    draw = list(game.get_state().list_card_draw)
+    view = game.get_player_view(0)
+    assert len(view.list_card_draw) == len(draw) > 0
+    assert all(card == Card() for card in view.list_card_draw)
+    assert game.get_state().list_card_draw == draw
+
+
+def test_clone_state_is_independent(game):
+    game.set_state(GameState(cnt_player=2))
+    clone = clone_state(game.get_state())
+    clone.list_player[0].list_card.pop()
+    clone.list_card_draw.pop()
+    assert len(game.get_state().list_player[0].list_card) == 7
+    assert len(game.get_state().list_card_draw) == len(clone.list_card_draw) + 1
+
+
+def test_heuristic_player_calls_uno(game):
+    hand = [Card(color='red', number=3), Card(color='blue', number=5)]
+    game.set_state(make_state(hand, Card(color='red', number=1)))
+    action = HeuristicPlayer().select_action(game.get_player_view(0), game.get_list_action())
+    assert action == Action(card=hand[0], color='red', uno=True)
+
+
+def test_heuristic_player_attacks_short_hand(game):
+    hand = [Card(color='red', number=9), Card(color='red', symbol='draw2'), Card(color='blue', number=5)]
+    game.set_state(make_state(hand, Card(color='red', number=1), other_hand=[Card(color='green', number=1)]))
+    action = HeuristicPlayer().select_action(game.get_player_view(0), game.get_list_action())
+    assert action.card.symbol == 'draw2'
+
+
+def test_heuristic_player_no_actions():
+    assert HeuristicPlayer().select_action(GameState(), []) is None
+
+
+def test_sampling_player_selects_legal_action(game):
+    game.set_state(GameState(cnt_player=3))
+    actions = game.get_list_action()
+    player = SamplingPlayer(time_budget=1.0, max_rollouts=30)
+    action = player.select_action(game.get_player_view(game.get_state().idx_player_active), actions)
+    assert action in actions
+    assert player.cnt_rollouts <= 30
+    assert SamplingPlayer().select_action(GameState(), []) is None
+
+
+def test_identical_cards_collapse(game):
+    hand = [Card(color='red', number=3), Card(color='red', number=3), Card(color='any', symbol='wild'),
+            Card(color='any', symbol='wild'), Card(color='blue', number=5)]
+    game.set_state(make_state(hand, Card(color='red', number=1)))
+    actions = game.get_list_action()
+    assert len(actions) == 1 + 4 + 1
+    assert all(actions.count(a) == 1 for a in actions)
+    weighted = dict((str(a), cnt) for a, cnt in game.get_list_action_weighted())
+    assert weighted[str(Action(card=hand[0], color='red'))] == 2
+    assert weighted[str(Action(card=hand[2], color='green'))] == 2
+    assert weighted[str(Action(draw=1))] == 1
+
+
+def test_identical_cards_with_uno_call(game):
+    hand = [Card(color='red', number=3), Card(color='red', number=3)]
+    game.set_state(make_state(hand, Card(color='red', number=1)))
+    assert game.get_list_action() == sorted([
+        Action(card=hand[0], color='red'),
+        Action(card=hand[0], color='red', uno=True),
+        Action(draw=1),
+    ])
+
+
+def test_cached_actions_and_cards_are_frozen(game):
+    game.set_state(make_state([Card(color='any', symbol='wild'), Card(color='blue', number=5)], Card(color='red', number=1)))
+    action = next(action for action in game.get_list_action() if action.card is not None and action.card.symbol == 'wild')
+    game.apply_action(action)
+    with pytest.raises(ValueError):
+        game.get_state().list_card_discard[-1].color = 'red'
+    with pytest.raises(ValueError):
+        action.color = 'blue'
+    assert game.get_state().list_card_discard[-1] == Card(color='any', symbol='wild')
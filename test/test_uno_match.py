@@ -0,0 +1,88 @@
+import random
+import pytest
+from server.py.uno import Card, RandomPlayer, HeuristicPlayer
+from server.py.uno_match import UnoMatch, HandResult, RunningStat, StatsAggregator, card_points, simulate_hands
+
+
+@pytest.fixture
+def match():
+    random.seed(7)
+    return UnoMatch([HeuristicPlayer(), RandomPlayer(), RandomPlayer()], target=200)
+
+
+@pytest.mark.parametrize("card, points", [
+    (Card(color='red', number=0), 0),
+    (Card(color='red', number=7), 7),
+    (Card(color='blue', symbol='skip'), 20),
+    (Card(color='blue', symbol='reverse'), 20),
+    (Card(color='green', symbol='draw2'), 20),
+    (Card(color='any', symbol='wild'), 50),
+    (Card(color='any', symbol='wilddraw4'), 50),
+])
+def test_card_points(card, points):
+    assert card_points(card) == points
+
+
+def test_running_stat_matches_batch():
+    values = [3, 8, 1, 9, 4, 4, 12]
+    stat = RunningStat()
+    for value in values:
+        stat.add(value)
+    mean = sum(values) / len(values)
+    assert stat.mean == pytest.approx(mean)
+    assert stat.variance == pytest.approx(sum((v - mean) ** 2 for v in values) / (len(values) - 1))
+    assert (stat.min, stat.max) == (1, 12)
+
+
+def test_running_stat_merge_equals_single_stream():
+    values = [random.Random(1).random() * 100 for _ in range(50)]
+    whole, left, right = RunningStat(), RunningStat(), RunningStat()
+    for value in values:
+        whole.add(value)
+    for value in values[:17]:
+        left.add(value)
+    for value in values[17:]:
+        right.add(value)
+    left.merge(right)
+    left.merge(RunningStat())
+    assert left.count == whole.count
+    assert left.mean == pytest.approx(whole.mean)
+    assert left.variance == pytest.approx(whole.variance)
+    assert (left.min, left.max) == (whole.min, whole.max)
+
+
+def test_aggregator_add_and_merge():
+    first, second = StatsAggregator(), StatsAggregator()
+    first.add(HandResult(idx_winner=0, points=30, cnt_turn=40, cnt_card_drawn=10))
+    second.add(HandResult(idx_winner=1, points=10, cnt_turn=20, cnt_card_drawn=6, cnt_penalty=1, max_stack=4))
+    second.add(HandResult(cnt_turn=5000))
+    first.merge(second)
+    assert first.cnt_hand == 3
+    assert first.cnt_abandoned == 1
+    assert first.wins == {0: 1, 1: 1}
+    assert first.stats['cnt_penalty'].max == 1
+    assert first.summary()['max_stack']['max'] == 4
+
+
+def test_play_hand_scores_winner(match):
+    result = match.play_hand()
+    assert result.idx_winner is not None
+    assert match.scores[result.idx_winner] == result.points
+    assert sum(match.scores) == result.points
+    assert result.cnt_turn > 0
+    assert match.aggregator.cnt_hand == 1
+
+
+def test_play_match_reaches_target(match):
+    idx_winner = match.play()
+    assert idx_winner is not None
+    assert match.scores[idx_winner] >= match.target
+    assert max(match.scores) == match.scores[idx_winner]
+    assert match.aggregator.cnt_hand == match.cnt_hand
+    assert sum(match.aggregator.wins.values()) + match.aggregator.cnt_abandoned == match.cnt_hand
+
+
+def test_simulate_hands_is_reproducible():
+    first, second = simulate_hands(5, seed=3), simulate_hands(5, seed=3)
+    assert first.cnt_hand == 5
+    assert first.summary() == second.summary()
@@ -0,0 +1,63 @@
+import json
+import random
+import pytest
+from server.py.word_corpus import (DEFAULT_WORDS, WordCorpus, count_wrong_guesses, get_corpus, get_difficulty,
+                                   letter_mask, load_words, normalize)
+
+
+@pytest.fixture
+def corpus():
+    return WordCorpus(['banana', 'Apple', 'kiwi', 'ESE', 'jazz', 'NANA', 'apple', 'x-ray', ''])
+
+
+def test_normalize_and_mask():
+    assert normalize("x-ray's") == 'XRAYS'
+    assert letter_mask('BANANA') == letter_mask('ABN') == 0b10000000000011
+
+
+@pytest.mark.parametrize("word, cnt_wrong, difficulty", [
+    ('ESE', 0, 'easy'),
+    ('SEA', 1, 'easy'),       # E S I A: I is wrong
+    ('NANA', 4, 'medium'),    # E S I A R N: E S I R are wrong
+    ('JAZZ', 23, 'hard'),
+])
+def test_difficulty(word, cnt_wrong, difficulty):
+    assert count_wrong_guesses(word) == cnt_wrong
+    assert get_difficulty(word) == difficulty
+
+
+def test_corpus_indexes(corpus):
+    assert corpus.words == ('BANANA', 'APPLE', 'KIWI', 'ESE', 'JAZZ', 'NANA', 'XRAY')
+    assert corpus.by_length[4] == ['KIWI', 'JAZZ', 'NANA', 'XRAY']
+    assert corpus.words_with_letters('nab') == ['BANANA']
+    assert corpus.words_with_letters('an') == ['NANA']
+    assert corpus.select('easy') == ['ESE']
+    assert corpus.select('hard', 4) == ['KIWI', 'JAZZ', 'XRAY']
+    assert corpus.select(length=9) == []
+    assert sum(len(words) for words in corpus.by_difficulty.values()) == len(corpus)
+
+
+def test_random_word(corpus):
+    rng = random.Random(1)
+    assert all(corpus.random_word(rng=rng) in corpus.words for _ in range(20))
+    assert corpus.random_word('medium', rng=rng) == 'NANA'
+    assert corpus.random_word(length=5) == 'APPLE'
+    with pytest.raises(ValueError):
+        corpus.random_word('easy', 7)
+    with pytest.raises(ValueError):
+        corpus.random_word('impossible')
+
+
+def test_empty_corpus():
+    with pytest.raises(ValueError):
+        WordCorpus(['', '123'])
+
+
+def test_load_and_cache(tmp_path):
+    path_json = tmp_path / 'words.json'
+    path_json.write_text(json.dumps(['devops', 'python']), encoding='utf-8')
+    path_text = tmp_path / 'words.txt'
+    path_text.write_text('devops\npython\n', encoding='utf-8')
+    assert load_words(str(path_json)) == load_words(str(path_text)) == ['devops', 'python']
+    assert get_corpus(str(path_json)) is get_corpus(str(path_json))
+    assert get_corpus(str(tmp_path / 'missing.json')).words == DEFAULT_WORDS